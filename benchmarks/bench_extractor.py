@@ -0,0 +1,91 @@
+"""Micro-benchmark backend ekstraksi kode pos (scripts/nomor_extract.py).
+
+Menjalankan setiap backend terhadap korpus halaman nomor.net tersimpan di fixtures/nomor_net/,
+lalu melaporkan waktu parse (median) dan alokasi memori puncak (tracemalloc) per halaman.
+Hasil tiap backend juga dicek sama dengan backend "bs4" (logika asli).
+Fixture edge_*.html berisi kasus yang dulu membuat jalur cepat berbeda dengan bs4 (entity bernama yang
+menjadi angka, "class" di dalam nilai atribut lain, atribut class ganda, tag <a class="ktw"/> tertutup sendiri).
+
+Pemakaian:
+    python benchmarks/bench_extractor.py
+    python benchmarks/bench_extractor.py --repeat 50 --backends bs4 fast
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "../scripts"))
+
+from nomor_extract import BACKENDS, LXML_AVAILABLE, extract_postal_code  # noqa: E402
+
+DEFAULT_FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures", "nomor_net")
+URL_TYPES = ("kodewil", "detail")
+VILLAGE_NAME = "Lamtui"  # Nama desa pada halaman fixture (konteks fallback untuk url_type "detail")
+
+
+def measure(html, url_type, backend, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extract_postal_code(html, url_type=url_type, village_name=VILLAGE_NAME, backend=backend)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    result = extract_postal_code(html, url_type=url_type, village_name=VILLAGE_NAME, backend=backend)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, statistics.median(timings), peak_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backend ekstraksi kode pos nomor.net")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES_DIR, help="Folder berisi halaman *.html")
+    parser.add_argument("--repeat", type=int, default=20, help="Jumlah ulangan per halaman (median diambil)")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    args = parser.parse_args()
+
+    backends = [b for b in args.backends if b != "lxml" or LXML_AVAILABLE]
+    if len(backends) < len(args.backends):
+        print("⚠️ lxml tidak terinstal, backend 'lxml' dilewati.")
+    pages = sorted(glob.glob(os.path.join(args.fixtures, "*.html")))
+    if not pages:
+        print(f"❌ Tidak ada fixture *.html di {args.fixtures}")
+        return 1
+
+    mismatches = 0
+    totals = {backend: 0.0 for backend in backends}
+    header = f"{'halaman':<32} {'url_type':<8} {'backend':<6} {'median ms':>10} {'peak KiB':>9}  hasil"
+    print(header)
+    print("-" * len(header))
+    for page in pages:
+        with open(page, encoding="utf-8") as f:
+            html = f.read()
+        name = os.path.basename(page)
+        for url_type in URL_TYPES:
+            reference = extract_postal_code(html, url_type=url_type, village_name=VILLAGE_NAME, backend="bs4")
+            for backend in backends:
+                result, median_s, peak_bytes = measure(html, url_type, backend, args.repeat)
+                totals[backend] += median_s
+                flag = ""
+                if result != reference:
+                    mismatches += 1
+                    flag = f"  ❌ beda dengan bs4: {reference}"
+                print(f"{name:<32} {url_type:<8} {backend:<6} {median_s * 1000:>10.3f} {peak_bytes / 1024:>9.1f}  "
+                      f"{result}{flag}")
+    print("-" * len(header))
+    for backend in backends:
+        speedup = totals["bs4"] / totals[backend] if "bs4" in totals and totals[backend] else float("nan")
+        print(f"Total {backend:<6}: {totals[backend] * 1000:.2f} ms (x{speedup:.1f} vs bs4)")
+    if mismatches:
+        print(f"❌ {mismatches} hasil berbeda dengan backend bs4")
+        return 1
+    print("✅ Semua backend memberi hasil yang sama dengan bs4")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Benchmark pembacaan file input: pd.read_excel penuh per shard vs village_input (cache kolumnar).
+
+Membuat workbook desa sintetis (default 80 ribu baris + beberapa kolom tambahan seperti file aslinya),
+lalu mensimulasikan N shard/worker yang masing-masing butuh satu rentang baris:
+- cara lama : setiap shard pd.read_excel(sheet penuh).iloc[start:end]
+- cache     : shard pertama membangun cache (parse XLSX sekali), shard lain membaca rentangnya dari cache
+Hasil setiap rentang dicek identik dengan cara lama (semua kolom sheet, seperti yang dibaca scraper).
+
+Pemakaian:
+    python benchmarks/bench_input_reader.py
+    python benchmarks/bench_input_reader.py --rows 20000 --shards 4 --legacy-shards 1
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "../scripts"))
+
+from bench_url_generation import make_villages  # noqa: E402
+from village_input import VillageInput  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pembacaan file input (read_excel vs cache kolumnar)")
+    parser.add_argument("--rows", type=int, default=80000)
+    parser.add_argument("--shards", type=int, default=10)
+    parser.add_argument("--legacy-shards", type=int, default=2,
+                        help="Jumlah shard yang benar-benar diukur untuk cara lama (sisanya dianggap sama)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    work_dir = tempfile.mkdtemp(prefix="bench_input_")
+    input_path = os.path.join(work_dir, "villages.xlsx")
+    df = make_villages(args.rows, args.seed)
+    df["Provinsi (Province)"] = "Aceh"
+    df["Keterangan"] = [f"Catatan {n}" for n in range(args.rows)]
+    df.to_excel(input_path, sheet_name="villages", index=False)
+    cache_dir = os.path.join(work_dir, "input_cache")
+    bounds = [(n * args.rows // args.shards, (n + 1) * args.rows // args.shards) for n in range(args.shards)]
+
+    legacy_times, expected = [], {}
+    for start, end in bounds[:max(1, args.legacy_shards)]:
+        t0 = time.perf_counter()
+        expected[start] = pd.read_excel(input_path, sheet_name="villages").iloc[start:end].reset_index(drop=True)
+        legacy_times.append(time.perf_counter() - t0)
+    legacy_per_shard = sum(legacy_times) / len(legacy_times)
+
+    cache_times, mismatches = [], 0
+    for start, end in bounds:
+        t0 = time.perf_counter()
+        chunk = VillageInput(input_path, cache_dir=cache_dir).read(start, end)
+        cache_times.append(time.perf_counter() - t0)
+        if start in expected and not chunk.equals(expected[start]):
+            mismatches += 1
+
+    print(f"ℹ️ {args.rows} baris, {args.shards} shard @ {args.rows // args.shards} baris")
+    print(f"read_excel penuh per shard : {legacy_per_shard:7.2f} dtk/shard -> {legacy_per_shard * args.shards:7.2f} dtk total")
+    print(f"cache: shard pertama (bangun): {cache_times[0]:7.2f} dtk")
+    if len(cache_times) > 1:
+        warm = sum(cache_times[1:]) / len(cache_times[1:])
+        print(f"cache: shard berikutnya      : {warm * 1000:7.1f} ms/shard -> {sum(cache_times):7.2f} dtk total")
+    shutil.rmtree(work_dir, ignore_errors=True)
+    if mismatches:
+        print(f"❌ {mismatches} rentang berbeda dengan pd.read_excel")
+        return 1
+    print("✅ Rentang dari cache identik dengan pd.read_excel")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Benchmark penulisan file hasil: output_writer (streaming + conditional formatting) vs df.style.to_excel lama.
+
+Membuat tabel hasil sintetis (kolom input, dua kolom URL, kolom kode pos dengan sebagian nilai tidak valid),
+lalu mengukur waktu tiap format output_writer dan, untuk perbandingan, cara lama
+`df.style.apply(highlight_invalid_rows, axis=1).to_excel(...)` pada sebagian baris (--legacy-rows, 0 = lewati).
+Setiap penulisan dijalankan di proses anak supaya RSS puncaknya terukur terpisah.
+
+Pemakaian:
+    python benchmarks/bench_output_writer.py
+    python benchmarks/bench_output_writer.py --rows 100000 --formats xlsx,csv --legacy-rows 10000
+"""
+import argparse
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "../scripts"))
+
+import postal_code_generator as pcg  # noqa: E402
+import output_writer  # noqa: E402
+from bench_url_generation import make_villages  # noqa: E402
+
+POSTAL_CODE_VALUES = ["23111", "23373", "24415", "", "Error", "2341", "Tidak Ditemukan"]
+
+
+def make_results(n_rows, seed):
+    pcg.ENABLE_DETAILED_DEBUG = False
+    df = make_villages(n_rows, seed)
+    df[pcg.URL_NOMOR_COL_DETAIL], df[pcg.URL_NOMOR_COL_KODEWIL] = pcg.generate_nomor_urls(df)
+    rng = random.Random(seed)
+    df[pcg.KODE_POS_RESULT_COL] = [rng.choice(POSTAL_CODE_VALUES) for _ in range(n_rows)]
+    return df
+
+
+def legacy_write(df, path):
+    def highlight_invalid_rows(row_series):
+        kode_pos_value = str(row_series.get(pcg.KODE_POS_RESULT_COL, ""))
+        is_invalid = not (kode_pos_value.isdigit() and len(kode_pos_value) == 5)
+        return ['background-color: yellow' if is_invalid else ''] * len(row_series)
+
+    df.style.apply(highlight_invalid_rows, axis=1).to_excel(path, index=False, engine='openpyxl')
+
+
+def run_child(args):
+    """Dipanggil di proses anak: tulis satu format, cetak detik & RSS puncak (MiB)."""
+    import pandas as pd
+
+    df = pd.read_pickle(args.child_input)
+    if args.child_format == "legacy":
+        df = df.head(args.legacy_rows)
+    start = time.perf_counter()
+    if args.child_format == "legacy":
+        legacy_write(df, args.child_output)
+    else:
+        error = output_writer.write_output(df, args.child_output, [args.child_format],
+                                           postal_code_col=pcg.KODE_POS_RESULT_COL)
+        error = next(iter(error.values()))
+        if error: raise error
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed:.3f} {peak_rss_mib():.1f}")
+
+
+def peak_rss_mib():
+    # ru_maxrss ikut terbawa dari proses induk saat fork; VmHWM (Linux) dihitung ulang sejak exec
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmHWM:"): return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark penulisan file hasil (output_writer vs cara lama)")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--formats", default="xlsx,csv,parquet")
+    parser.add_argument("--legacy-rows", type=int, default=10000, help="Baris untuk cara lama (0 = lewati)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--child-format", help=argparse.SUPPRESS)
+    parser.add_argument("--child-input", help=argparse.SUPPRESS)
+    parser.add_argument("--child-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child_format:
+        return run_child(args)
+
+    work_dir = tempfile.mkdtemp(prefix="bench_output_")
+    input_pickle = os.path.join(work_dir, "results.pkl")
+    make_results(args.rows, args.seed).to_pickle(input_pickle)
+    print(f"ℹ️ {args.rows} baris, xlsxwriter {'terinstal' if output_writer.XLSXWRITER_AVAILABLE else 'tidak ada (openpyxl write-only)'}")
+
+    jobs = [f.strip() for f in args.formats.split(",") if f.strip()] + (["legacy"] if args.legacy_rows else [])
+    for job in jobs:
+        output_path = os.path.join(work_dir, f"out_{job}.xlsx")
+        command = [sys.executable, os.path.abspath(__file__), "--child-format", job, "--child-input", input_pickle,
+                   "--child-output", output_path, "--legacy-rows", str(args.legacy_rows)]
+        proc = subprocess.run(command, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"{job:<8} ❌ gagal: {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else proc.returncode}")
+            continue
+        elapsed, peak_rss = (float(v) for v in proc.stdout.split()[-2:])
+        n_rows = min(args.rows, args.legacy_rows) if job == "legacy" else args.rows
+        print(f"{job:<8} {n_rows:>7} baris: {elapsed:7.2f} dtk ({n_rows / elapsed:9.0f} baris/dtk), "
+              f"RSS puncak {peak_rss:6.1f} MiB")
+    import shutil
+    shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
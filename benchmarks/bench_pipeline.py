@@ -0,0 +1,181 @@
+"""Benchmark end-to-end postal_code_generator.py terhadap server tiruan nomor.net.
+
+Membuat workbook desa sintetis di folder sementara, menjalankan mock_nomor_server.py di thread,
+lalu menjalankan scraper sungguhan (subprocess, cache & journal kosong) dengan --base-url ke mock.
+Melaporkan throughput (baris/detik), latensi per baris p50/p95 (kolom `elapsed_s` di journal),
+RSS puncak proses scraper, jumlah request ke mock dan kecocokan hasil dengan data mock.
+
+Pemakaian:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --rows 500 --concurrency 8 --latency-ms 80 --p403 0.01
+    python benchmarks/bench_pipeline.py --json hasil.json   # simpan hasil untuk dibandingkan antar commit
+    python benchmarks/bench_pipeline.py --p-missing-ktw 0.3 --scraper-args="--no-hedge"
+    # Hedged lookup tidak boleh menurunkan throughput saat antrian rate controller penuh (default: jeda 1 dtk)
+    python benchmarks/bench_pipeline.py --compare-hedge --rows 24 --villages-per-district 1 --missing-id-ratio 0 \\
+        --rate-delay 1.0
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(BENCH_DIR, "../scripts/postal_code_generator.py")
+
+from mock_nomor_server import (COL_ID_DESA, COL_KABUPATEN, COL_KECAMATAN, COL_NAMA_DESA,  # noqa: E402
+                               MockNomorData, start_in_thread, strip_regency_prefix)
+
+SYLLABLES = ["lam", "ba", "ro", "teu", "ue", "kuta", "blang", "cot", "glie", "me", "ra", "sa", "ri", "jaya", "mu"]
+
+
+def make_villages(n_rows, villages_per_district, missing_id_ratio, seed):
+    """Desa sintetis; sebagian tanpa ID Desa supaya jalur URL detail & daftar kecamatan ikut teruji."""
+    rng = random.Random(seed)
+    rows = []
+    for n in range(n_rows):
+        district_no, village_no = divmod(n, villages_per_district)
+        regency_no = district_no // 10
+        name = " ".join(rng.choice(SYLLABLES).capitalize() for _ in range(2)) + f" {village_no + 1}"
+        id_desa = f"11{regency_no + 1:02d}{district_no % 10 + 1:02d}2{village_no + 1:03d}"
+        rows.append({
+            COL_ID_DESA: None if rng.random() < missing_id_ratio else id_desa,
+            COL_NAMA_DESA: name,
+            COL_KECAMATAN: f"Kecamatan {district_no + 1}",
+            COL_KABUPATEN: f"Kab. Kabupaten {regency_no + 1}",
+        })
+    return rows
+
+
+def expected_code(data, row):
+    query = {"_i": ["desa-kodepos"], "jobs": [row[COL_NAMA_DESA]],
+             "daerah": [f"Desa-{row[COL_KECAMATAN]}-Kab.-{strip_regency_prefix(row[COL_KABUPATEN])}"]}
+    return data.lookup(query)[0]["postal_code"]
+
+
+def percentile(values, q):
+    if not values: return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+def run_pipeline(args, villages, extra_scraper_args=()):
+    """Satu run scraper terhadap mock baru (state mock & folder kerja kosong); mengembalikan dict hasil."""
+    import pandas as pd
+
+    work_dir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    input_path = os.path.join(work_dir, "villages.xlsx")
+    pd.DataFrame(villages).to_excel(input_path, sheet_name="villages", index=False)
+
+    data = MockNomorData(villages)
+    server = start_in_thread(data, latency_ms=args.latency_ms, latency_jitter_ms=args.latency_jitter_ms,
+                             p403=args.p403, p404=args.p404, p_missing_ktw=args.p_missing_ktw, seed=args.seed)
+    command = [sys.executable, SCRIPT, "--mode", "manual", "--process-id", "bench", "--input", input_path,
+               "--data-dir", work_dir, "--start-row", "0", "--end-row", str(args.rows),
+               "--base-url", server.base_url, "--concurrency", str(args.concurrency),
+               "--rate-initial-delay", str(args.rate_delay), "--rate-min-delay", str(args.rate_delay)]
+    command += shlex.split(args.scraper_args) + list(extra_scraper_args)
+    log_path = os.path.join(work_dir, "scraper.log")
+    print(f"ℹ️ Mock di {server.base_url}, {args.rows} baris, folder kerja {work_dir}"
+          + (f", argumen {' '.join(extra_scraper_args)}" if extra_scraper_args else ""))
+    start = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        return_code = subprocess.call(command, stdout=log, stderr=subprocess.STDOUT)
+    wall_s = time.perf_counter() - start
+    server.shutdown()
+    server.server_close()
+    # ru_maxrss: KiB di Linux, byte di macOS. Maksimum semua proses anak yang sudah selesai, jadi dengan
+    # --compare-hedge angka run kedua termasuk run pertama
+    peak_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    peak_rss_mib = peak_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+    journal_path = os.path.join(work_dir, f"journal_v15_part_bench_1-{args.rows}.jsonl")
+    records = {}
+    if os.path.exists(journal_path):
+        with open(journal_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    records[record["row"]] = record
+    latencies = [r["elapsed_s"] for r in records.values() if r.get("elapsed_s") is not None]
+    correct = sum(1 for row_no, record in records.items()
+                  if record["result"] == expected_code(data, villages[row_no]))
+
+    result = {
+        "rows": args.rows, "concurrency": args.concurrency, "return_code": return_code,
+        "scraper_args": " ".join(shlex.split(args.scraper_args) + list(extra_scraper_args)),
+        "wall_s": round(wall_s, 3), "rows_per_s": round(len(records) / wall_s, 2) if wall_s else None,
+        "row_latency_p50_s": round(percentile(latencies, 0.50), 3),
+        "row_latency_p95_s": round(percentile(latencies, 0.95), 3),
+        "peak_rss_mib": round(peak_rss_mib, 1), "rows_done": len(records), "rows_correct": correct,
+        "mock_requests": dict(sorted(server.counts.items())),
+    }
+    print(f"Selesai (exit {return_code}) dalam {wall_s:.1f} dtk: {result['rows_per_s']} baris/dtk")
+    print(f"Latensi per baris: p50 {result['row_latency_p50_s']} dtk, p95 {result['row_latency_p95_s']} dtk")
+    print(f"RSS puncak scraper: {result['peak_rss_mib']} MiB")
+    print(f"Hasil benar: {correct}/{args.rows} (journal berisi {len(records)} baris)")
+    print(f"Request ke mock: {result['mock_requests']}")
+    if args.keep:
+        print(f"ℹ️ Folder kerja disimpan: {work_dir} (log scraper: {log_path})")
+    else:
+        import shutil
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end scraper kode pos vs server tiruan")
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--villages-per-district", type=int, default=8)
+    parser.add_argument("--missing-id-ratio", type=float, default=0.2, help="Porsi baris tanpa ID Desa")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate-delay", type=float, default=0.0, help="Jeda awal & minimum rate controller")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=20.0)
+    parser.add_argument("--p403", type=float, default=0.0)
+    parser.add_argument("--p404", type=float, default=0.0)
+    parser.add_argument("--p-missing-ktw", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--scraper-args", default="",
+                        help="Argumen tambahan untuk scraper, mis. --scraper-args='--no-hedge'")
+    parser.add_argument("--compare-hedge", action="store_true",
+                        help="Jalankan dua kali (hedged lookup aktif vs --no-hedge) dan gagal jika hedge menurunkan "
+                             "throughput lebih dari --hedge-tolerance")
+    parser.add_argument("--hedge-tolerance", type=float, default=0.10,
+                        help="(compare-hedge) Penurunan throughput maksimum yang masih diterima (0.10 = 10%%)")
+    parser.add_argument("--keep", action="store_true", help="Jangan hapus folder kerja (output, journal, log)")
+    parser.add_argument("--json", default=None, help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    villages = make_villages(args.rows, args.villages_per_district, args.missing_id_ratio, args.seed)
+    faults_injected = args.p403 or args.p404 or args.p_missing_ktw
+    if not args.compare_hedge:
+        result = run_pipeline(args, villages)
+        ok = result["return_code"] == 0 and (faults_injected or result["rows_correct"] == args.rows)
+    else:
+        hedged = run_pipeline(args, villages)
+        unhedged = run_pipeline(args, villages, ["--no-hedge"])
+        ratio = hedged["rows_per_s"] / unhedged["rows_per_s"] if unhedged["rows_per_s"] else float("nan")
+        result = {"hedged": hedged, "no_hedge": unhedged, "throughput_ratio": round(ratio, 3)}
+        print(f"Hedge vs --no-hedge: {hedged['rows_per_s']} vs {unhedged['rows_per_s']} baris/dtk (x{ratio:.2f}), "
+              f"p95 {hedged['row_latency_p95_s']} vs {unhedged['row_latency_p95_s']} dtk")
+        ok = all(r["return_code"] == 0 and (faults_injected or r["rows_correct"] == args.rows)
+                 for r in (hedged, unhedged))
+        if ratio < 1 - args.hedge_tolerance:
+            print(f"❌ Hedged lookup menurunkan throughput lebih dari {args.hedge_tolerance:.0%}")
+            ok = False
+        elif ok:
+            print("✅ Hedged lookup tidak menurunkan throughput")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Benchmark & cek jawaban indeks kode pos offline (scripts/postal_index.py).
+
+Membangun indeks dari desa sintetis yang kode posnya sudah diketahui, lalu mengukur waktu infer() per baris
+untuk desa yang belum diketahui (langkah nama desa mirip & konsensus kecamatan ikut berjalan).
+Selain itu kasus tetap dicek: desa bernomor ("Sukamaju I"/"Sukamaju II", "Kampung Baru 1"/"Kampung Baru 2")
+yang kodenya berbeda tidak boleh saling mengisi lewat nama mirip, sedangkan variasi tulis tetap dikenali.
+Desa yang tercatat dengan dua kode berbeda ("Tanjung") tidak dijawab, baik lewat nama persis maupun nama mirip.
+
+Pemakaian:
+    python benchmarks/bench_postal_index.py
+    python benchmarks/bench_postal_index.py --known 50000 --queries 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "../scripts"))
+
+from postal_index import PROVENANCE_NAMA_DESA_MIRIP, PostalCodeIndex  # noqa: E402
+
+DISTRICT, REGENCY = "Kec. Contoh", "Kab. Contoh"
+# (nama desa yang diketahui, kode pos)
+KNOWN_VILLAGES = [("Sukamaju I", "11111"), ("Sukamaju II", "11112"), ("Kampung Baru 1", "22221"),
+                  ("Sukamaju Utara", "33331"), ("Lamtui", "23373"), ("Mekarsari", "44441"),
+                  ("Tanjung", "55551"), ("Tanjung", "55552")]
+# (nama desa yang dicari, kode pos yang boleh dijawab indeks; None = indeks harus tidak menjawab)
+EXPECTED_ANSWERS = [
+    ("Sukamaju III", None),
+    ("Kampung Baru 2", None),
+    ("Kampung Baru", None),
+    ("Sukamaju", None),
+    ("Sukamaju Timur", None),
+    ("Lam Tui", "23373"),
+    ("Mekarsarii", "44441"),
+    ("Sukamaju Utar", "33331"),
+    ("Tanjung", None),
+    ("Tanjungg", None),
+]
+
+
+def check_fixed_cases():
+    index = PostalCodeIndex(min_support=3, min_agreement=1.0, fuzzy_cutoff=0.92)
+    for village, code in KNOWN_VILLAGES:
+        index.add(code, village=village, district=DISTRICT, regency=REGENCY)
+    failures = 0
+    for village, expected in EXPECTED_ANSWERS:
+        code, provenance = index.infer(village=village, district=DISTRICT, regency=REGENCY)
+        ok = code == expected and (expected is None or provenance == PROVENANCE_NAMA_DESA_MIRIP)
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {village:<18} -> {code} ({provenance}), diharapkan {expected}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark & cek indeks kode pos offline")
+    parser.add_argument("--known", type=int, default=20000, help="Jumlah desa yang kode posnya sudah diketahui")
+    parser.add_argument("--queries", type=int, default=5000, help="Jumlah desa yang dicari")
+    parser.add_argument("--villages-per-district", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    syllables = ["su", "ka", "ma", "ju", "ba", "ru", "lam", "tui", "me", "kar", "sa", "ri", "jaya", "wa", "ngi"]
+    index = PostalCodeIndex()
+    t0 = time.perf_counter()
+    for n in range(args.known):
+        district_no = n // args.villages_per_district
+        name = "".join(rng.choice(syllables) for _ in range(3)).capitalize() + f" {rng.randint(1, 3)}"
+        index.add(str(20000 + district_no % 70000), kode_wilayah=f"11.{district_no // 100 % 100:02d}."
+                  f"{district_no % 100:02d}.{2000 + n % args.villages_per_district}", village=name,
+                  district=f"Kecamatan {district_no}", regency="Kab. Sintetis")
+    build_s = time.perf_counter() - t0
+
+    n_districts = max(1, args.known // args.villages_per_district)
+    t0 = time.perf_counter()
+    answered = 0
+    for _ in range(args.queries):
+        district_no = rng.randrange(n_districts)
+        name = "".join(rng.choice(syllables) for _ in range(3)).capitalize() + f" {rng.randint(1, 3)}"
+        code, _ = index.infer(village=name, district=f"Kecamatan {district_no}", regency="Kab. Sintetis")
+        answered += code is not None
+    infer_s = time.perf_counter() - t0
+    print(f"ℹ️ Indeks {args.known} desa dibangun dalam {build_s:.2f} dtk; {args.queries} infer() dalam "
+          f"{infer_s:.2f} dtk ({infer_s / args.queries * 1e6:.0f} µs/baris), {answered} terjawab")
+    print(f"ℹ️ {index.stats()}")
+
+    failures = check_fixed_cases()
+    if failures:
+        print(f"❌ {failures} jawaban indeks salah")
+        return 1
+    print("✅ Semua jawaban indeks sesuai")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Benchmark pembuatan URL nomor.net: df.apply per baris vs versi vektor (generate_nomor_urls).
+
+Membuat daftar desa sintetis (default ~80 ribu baris, seukuran daftar desa nasional) berisi juga nilai-nilai
+sulit (ID kosong/rusak, digit non-ASCII, nama beraksen/berkurung, alias kecamatan, prefix Kab./Kota),
+lalu mengecek kedua cara menghasilkan URL yang identik byte-per-byte dan melaporkan waktunya.
+
+Pemakaian:
+    python benchmarks/bench_url_generation.py
+    python benchmarks/bench_url_generation.py --rows 10000 --repeat 5
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "../scripts"))
+
+import postal_code_generator as pcg  # noqa: E402
+
+TRICKY_IDS = [None, float("nan"), "", "  ", "abc", "1108012001.0", " 1108012001 ", "11.08.01.2001", "11.08.01.200",
+              "110801200", "11080120011", "١١٠٨٠١٢٠٠١", "11080120²1", "11.08.01.2001.0", 1108012001, 1108012001.0]
+TRICKY_VILLAGES = [None, float("nan"), "", "   ", "Lam Ara Cut", "Ie Seu'um", "Gampong (Baru)", "Désa Ümlaut",
+                   "50% Jaya", "Kp. Baru/Lama", "Sungai  Dua", "ᮞᮥᮔ᮪ᮓ", "A&B", "Lam~Kuta"]
+TRICKY_DISTRICTS = [None, "", "Kuta Cot Glie", " kuta cot glie ", "KUTA COT GLIE", "Kuta Cot Glie (Kota Cot Glie)",
+                    "Kec. Baru", "Mesjid Raya"]
+TRICKY_REGENCIES = [None, "", "Kab. Aceh Besar", "KAB. Aceh Besar", "Kota Banda Aceh", "kota  Sabang", "Kab.Pidie",
+                    "Kota", "Kab. ", "Aceh Jaya", "Kabupaten Bireuen"]
+
+
+def make_villages(n_rows, seed):
+    import pandas as pd
+
+    rng = random.Random(seed)
+    rows = []
+    for n in range(n_rows):
+        tricky = rng.random() < 0.05
+        rows.append({
+            pcg.COL_ID_DESA: rng.choice(TRICKY_IDS) if tricky else f"{1101000000 + n * 7:010d}",
+            pcg.COL_NAMA_DESA: rng.choice(TRICKY_VILLAGES) if tricky else f"Desa {rng.choice('ABCDEFGH')}{n}",
+            pcg.COL_KECAMATAN: rng.choice(TRICKY_DISTRICTS) if tricky else f"Kecamatan {n // 12}",
+            pcg.COL_KABUPATEN: rng.choice(TRICKY_REGENCIES) if tricky else f"Kab. Kabupaten {n // 150}",
+        })
+    return pd.DataFrame(rows)
+
+
+def time_call(func, repeat):
+    timings, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pembuatan URL nomor.net (per baris vs vektor)")
+    parser.add_argument("--rows", type=int, default=80000)
+    parser.add_argument("--repeat", type=int, default=3, help="Jumlah ulangan (median diambil)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    pcg.ENABLE_DETAILED_DEBUG = False
+    df = make_villages(args.rows, args.seed)
+    numeric_ids = df.copy()
+    numeric_ids[pcg.COL_ID_DESA] = pd.to_numeric(df[pcg.COL_ID_DESA].map(str).str.strip(), errors="coerce")
+
+    mismatches = 0
+    for label, frame in (("ID teks/campuran", df), ("ID angka (float)", numeric_ids)):
+        (detail_rows, kodewil_rows), apply_s = time_call(
+            lambda: (frame.apply(pcg.generate_nomor_url_detailed, axis=1),
+                     frame.apply(pcg.generate_nomor_url_by_kode_wilayah, axis=1)), args.repeat)
+        (detail_vec, kodewil_vec), vector_s = time_call(lambda: pcg.generate_nomor_urls(frame), args.repeat)
+        bad = int((detail_rows != detail_vec).sum() + (kodewil_rows != kodewil_vec).sum())
+        mismatches += bad
+        print(f"{label:<18} {len(frame)} baris: df.apply {apply_s * 1000:9.1f} ms, vektor {vector_s * 1000:7.1f} ms "
+              f"(x{apply_s / vector_s:.0f}){'' if not bad else f'  ❌ {bad} URL berbeda'}")
+        if bad:
+            diff = frame[(detail_rows != detail_vec) | (kodewil_rows != kodewil_vec)].head(5).index
+            for idx in diff:
+                print(f"   baris {idx}: {frame.loc[idx].to_dict()}")
+                print(f"      per baris: {detail_rows[idx]} | {kodewil_rows[idx]}")
+                print(f"      vektor   : {detail_vec[idx]} | {kodewil_vec[idx]}")
+    if mismatches:
+        print(f"❌ {mismatches} URL berbeda antara df.apply dan versi vektor")
+        return 1
+    print("✅ URL versi vektor identik dengan versi per baris")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
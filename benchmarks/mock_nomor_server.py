@@ -0,0 +1,243 @@
+"""Server tiruan nomor.net untuk benchmark & uji regresi tanpa menyentuh situs asli.
+
+Melayani `/_kodepos.php` untuk dua bentuk URL yang dipakai scraper:
+- `_i=cari-kodepos&jobs=<kode wilayah>`                  (URL kodewil)
+- `_i=desa-kodepos&daerah=Desa-<Kec>-Kab.-<Kab>[&jobs=<desa>]` (URL detail / daftar kecamatan)
+
+Data desa diambil dari file Excel input yang sama dengan scraper (sheet `villages`); kode pos tiap
+desa diturunkan secara deterministik dari kode wilayah kecamatannya. Halaman dirender memakai
+header/footer halaman rekaman di fixtures/nomor_net/. Gangguan bisa disuntikkan: latensi,
+403 (Cloudflare), 404 dan halaman tanpa tag <a class="ktw">.
+
+Pemakaian mandiri:
+    python benchmarks/mock_nomor_server.py --input data/villages.xlsx --port 8765 --latency-ms 80 --p403 0.02
+lalu jalankan scraper dengan `--base-url http://127.0.0.1:8765` dan folder data terpisah, mis.:
+    python scripts/postal_code_generator.py --base-url http://127.0.0.1:8765 --data-dir /tmp/nomor_mock \
+        --input data/villages.xlsx
+Tanpa `--data-dir` sendiri, journal & file output berisi kode pos tiruan masuk ke folder data utama dan ikut
+dibaca indeks kode pos offline run berikutnya (cache SQLite sudah memisahkan kode wilayah per host).
+"""
+import argparse
+import html
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_FILE = os.path.join(BENCH_DIR, "fixtures", "nomor_net", "district_listing.html")
+
+COL_ID_DESA = 'ID Desa (Village ID)'
+COL_NAMA_DESA = 'Nama Desa (Village Name)'
+COL_KECAMATAN = 'Kecamatan (District)'
+COL_KABUPATEN = 'Kabupaten (Regency)'
+
+CLOUDFLARE_403_PAGE = ("<!DOCTYPE html><html><head><title>Attention Required! | Cloudflare</title></head>"
+                       "<body><h1>Sorry, you have been blocked</h1></body></html>")
+
+
+def normalize_name(value):
+    return " ".join(str(value).lower().split())
+
+
+def kode_wilayah_of(id_desa_val):
+    id_desa_str = str(id_desa_val).strip()
+    if id_desa_str.endswith(".0"): id_desa_str = id_desa_str[:-2]
+    if len(id_desa_str) == 10 and id_desa_str.isdigit():
+        return f"{id_desa_str[:2]}.{id_desa_str[2:4]}.{id_desa_str[4:6]}.{id_desa_str[6:]}"
+    if re.fullmatch(r"\d{2}\.\d{2}\.\d{2}\.\d{4}", id_desa_str):
+        return id_desa_str
+    return None
+
+
+def postal_code_for(kecamatan_key):
+    """Kode pos tiruan: sama untuk semua desa dalam satu kecamatan (seperti pola aslinya)."""
+    return str(20000 + zlib.crc32(kecamatan_key.encode("utf-8")) % 79999)
+
+
+def strip_regency_prefix(regency):
+    lowered = regency.lower()
+    return regency[5:].strip() if lowered.startswith("kab. ") or lowered.startswith("kota ") else regency
+
+
+class MockNomorData:
+    def __init__(self, villages):
+        """villages: list of dict dengan kunci kolom input (ID Desa, Nama Desa, Kecamatan, Kabupaten)."""
+        self.by_kode_wilayah = {}
+        self.by_district = {}
+        for village in villages:
+            name = str(village.get(COL_NAMA_DESA, "")).strip()
+            district = str(village.get(COL_KECAMATAN, "")).strip()
+            regency = strip_regency_prefix(str(village.get(COL_KABUPATEN, "")).strip())
+            kode_wilayah = kode_wilayah_of(village.get(COL_ID_DESA))
+            district_key = (normalize_name(district), normalize_name(regency))
+            entry = {"name": name, "district": district, "regency": regency, "kode_wilayah": kode_wilayah or "",
+                     "postal_code": postal_code_for(kode_wilayah[:8] if kode_wilayah else "|".join(district_key))}
+            if kode_wilayah: self.by_kode_wilayah[kode_wilayah] = entry
+            self.by_district.setdefault(district_key, []).append(entry)
+        # Semua desa satu kecamatan harus berbagi satu kode (dipakai juga oleh desa tanpa ID)
+        for entries in self.by_district.values():
+            for entry in entries:
+                entry["postal_code"] = entries[0]["postal_code"]
+
+    @classmethod
+    def from_excel(cls, path):
+        import pandas as pd
+        return cls(pd.read_excel(path, sheet_name="villages").to_dict("records"))
+
+    def lookup(self, query):
+        kind = query.get("_i", [""])[0]
+        jobs = query.get("jobs", [""])[0].strip()
+        if kind == "cari-kodepos":
+            entry = self.by_kode_wilayah.get(jobs)
+            return [entry] if entry else []
+        if kind == "desa-kodepos":
+            daerah = query.get("daerah", [""])[0]
+            match = re.fullmatch(r"Desa-(.+)-Kab\.-(.+)", daerah)
+            if not match: return []
+            district = re.sub(r"\s*\(.*\)$", "", match.group(1))  # Alias "Kuta Cot Glie (Kota Cot Glie)"
+            entries = self.by_district.get((normalize_name(district), normalize_name(match.group(2))), [])
+            if "jobs" in query:
+                entries = [e for e in entries if normalize_name(e["name"]) == normalize_name(jobs)]
+            return entries
+        return []
+
+
+class PageRenderer:
+    def __init__(self, template_path=TEMPLATE_FILE):
+        with open(template_path, encoding="utf-8") as f:
+            template = f.read()
+        table_start = template.index('<table border="1"')
+        self.head = template[:template.index("<p>")]
+        header_row_end = template.index("</tr>", table_start) + len("</tr>")
+        self.table_head = template[table_start:header_row_end]
+        self.foot = template[template.index("</table>", header_row_end) + len("</table>"):]
+
+    @staticmethod
+    def _row(n, entry, with_ktw):
+        code = entry["postal_code"]
+        code_cell = (f'<a href="/_kodepos.php?_i=cari-kodepos&amp;jobs={code}" class="ktw" title="Kode Pos {code}">'
+                     f'{code}</a>' if with_ktw else "-")
+        return (f'<tr bgcolor="{"#ccffff" if n % 2 else "#ffffff"}"><td class="tb">{n}</td>'
+                f'<td class="tb">{code_cell}</td><td class="tb">{html.escape(entry["name"])}</td>'
+                f'<td class="tb">{html.escape(entry["district"])}</td><td class="tb">Kab.</td>'
+                f'<td class="tb">{html.escape(entry["regency"])}</td><td class="tb">{entry["kode_wilayah"]}</td>'
+                f'<td class="tb">-</td></tr>\n')
+
+    def render(self, entries, with_ktw=True):
+        if not entries:
+            body = "<p>Data tidak ditemukan. Silakan ulangi pencarian dengan kata kunci lain.</p>"
+        else:
+            rows = "".join(self._row(n, entry, with_ktw) for n, entry in enumerate(entries, 1))
+            body = f"<p>Hasil pencarian:</p>{self.table_head}\n{rows}</table>"
+        return self.head + body + self.foot
+
+
+class MockNomorServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, data, latency_ms=0.0, latency_jitter_ms=0.0, p403=0.0, p404=0.0,
+                 p_missing_ktw=0.0, seed=0):
+        super().__init__(address, MockNomorHandler)
+        self.data = data
+        self.renderer = PageRenderer()
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.p403 = p403
+        self.p404 = p404
+        self.p_missing_ktw = p_missing_ktw
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counts = Counter()
+
+    @property
+    def base_url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def draw(self):
+        with self._lock:
+            return self._random.random(), self._random.random(), self._random.random(), self._random.random()
+
+    def count(self, key):
+        with self._lock:
+            self.counts[key] += 1
+
+
+class MockNomorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, supaya pool sesi scraper ikut teruji
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=UTF-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        server = self.server
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query, keep_blank_values=True)
+        kind = query.get("_i", ["?"])[0]
+        if "daerah" in query and "jobs" not in query: kind = "daftar-kecamatan"
+        server.count(f"request:{kind}")
+        r_latency, r_403, r_404, r_ktw = server.draw()
+        latency = server.latency_ms + (r_latency * 2 - 1) * server.latency_jitter_ms
+        if latency > 0: time.sleep(latency / 1000)
+        if parsed.path != "/_kodepos.php":
+            server.count("status:404")
+            return self._send(404, "Not Found")
+        if r_403 < server.p403:
+            server.count("status:403")
+            return self._send(403, CLOUDFLARE_403_PAGE)
+        if r_404 < server.p404:
+            server.count("status:404")
+            return self._send(404, "Not Found")
+        with_ktw = r_ktw >= server.p_missing_ktw
+        if not with_ktw: server.count("missing_ktw")
+        server.count("status:200")
+        self._send(200, server.renderer.render(server.data.lookup(query), with_ktw=with_ktw))
+
+
+def start_in_thread(data, host="127.0.0.1", port=0, **fault_options):
+    server = MockNomorServer((host, port), data, **fault_options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server tiruan nomor.net")
+    parser.add_argument("--input", required=True, help="File Excel input scraper (sheet 'villages')")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--p403", type=float, default=0.0, help="Peluang respons 403 (Cloudflare)")
+    parser.add_argument("--p404", type=float, default=0.0, help="Peluang respons 404")
+    parser.add_argument("--p-missing-ktw", type=float, default=0.0, help="Peluang halaman tanpa <a class='ktw'>")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockNomorServer((args.host, args.port), MockNomorData.from_excel(args.input),
+                             latency_ms=args.latency_ms, latency_jitter_ms=args.latency_jitter_ms,
+                             p403=args.p403, p404=args.p404, p_missing_ktw=args.p_missing_ktw, seed=args.seed)
+    print(f"ℹ️ Server tiruan nomor.net berjalan di {server.base_url} (Ctrl+C untuk berhenti)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"ℹ️ Statistik: {dict(server.counts)}")
+
+
+if __name__ == "__main__":
+    main()
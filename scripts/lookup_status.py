@@ -0,0 +1,73 @@
+"""Status hasil lookup kode pos per URL / per baris.
+
+Kolom hasil tetap berisi kode pos atau pesan gagal yang bisa dibaca manusia; kolom status berisi kode tetap:
+- success       : kode pos valid ditemukan
+- not_found     : halaman tidak ada (404)                          -> permanen, di-cache negatif
+- parse_miss    : halaman ada tapi tanpa kode pos                   -> permanen, di-cache negatif
+- invalid_input : URL tidak bisa dibuat (ID Desa/nama kosong)       -> permanen, tanpa request
+- blocked       : 403/429/challenge Cloudflare                      -> sementara, boleh diulang
+- timeout       : request timeout                                   -> sementara, boleh diulang
+- error         : error jaringan/HTTP lain (5xx, koneksi putus, ...) -> sementara, boleh diulang
+
+classify_result_text() memetakan pesan bebas dari output/journal lama (sebelum ada kolom status) ke kode di atas.
+"""
+
+STATUS_SUCCESS = "success"
+STATUS_NOT_FOUND = "not_found"
+STATUS_PARSE_MISS = "parse_miss"
+STATUS_INVALID_INPUT = "invalid_input"
+STATUS_BLOCKED = "blocked"
+STATUS_TIMEOUT = "timeout"
+STATUS_ERROR = "error"
+
+ALL_STATUSES = (STATUS_SUCCESS, STATUS_NOT_FOUND, STATUS_PARSE_MISS, STATUS_INVALID_INPUT, STATUS_BLOCKED,
+                STATUS_TIMEOUT, STATUS_ERROR)
+RETRYABLE_STATUSES = (STATUS_BLOCKED, STATUS_TIMEOUT, STATUS_ERROR)
+NEGATIVE_CACHE_STATUSES = (STATUS_NOT_FOUND, STATUS_PARSE_MISS)
+
+# Jumlah percobaan maksimum satu URL per status (dihitung per status, dalam satu pemanggilan scrape_nomor)
+DEFAULT_RETRY_BUDGETS = {
+    STATUS_BLOCKED: 3,
+    STATUS_TIMEOUT: 3,
+    STATUS_ERROR: 2,
+    STATUS_PARSE_MISS: 1,
+    STATUS_NOT_FOUND: 1,
+}
+
+# Status baris dari dua URL (kodewil & detail) yang sama-sama gagal: yang masih bisa berhasil jika diulang menang
+_FAILURE_PRIORITY = (STATUS_BLOCKED, STATUS_TIMEOUT, STATUS_ERROR, STATUS_PARSE_MISS, STATUS_NOT_FOUND,
+                     STATUS_INVALID_INPUT)
+
+
+def status_from_http(status_code):
+    if status_code in (403, 429): return STATUS_BLOCKED
+    if status_code == 404: return STATUS_NOT_FOUND
+    if status_code >= 400: return STATUS_ERROR
+    return STATUS_SUCCESS
+
+
+def combine_statuses(*statuses):
+    """Status satu baris dari status tiap URL yang dicoba (None = URL tidak dicoba)."""
+    statuses = [s for s in statuses if s]
+    if STATUS_SUCCESS in statuses: return STATUS_SUCCESS
+    for status in _FAILURE_PRIORITY:
+        if status in statuses: return status
+    return STATUS_INVALID_INPUT
+
+
+def is_retryable(status):
+    return status in RETRYABLE_STATUSES
+
+
+def classify_result_text(text):
+    """Status dari isi kolom hasil versi lama; None jika kosong (baris belum pernah diproses)."""
+    if text is None or (isinstance(text, float) and text != text): return None
+    text = str(text).strip()
+    if not text: return None
+    if text.isdigit() and len(text) == 5: return STATUS_SUCCESS
+    if "(404)" in text: return STATUS_NOT_FOUND
+    if "403" in text or "429" in text or "Cloudflare" in text: return STATUS_BLOCKED
+    if "timeout" in text.lower(): return STATUS_TIMEOUT
+    if text.startswith("Tidak ditemukan kode pos"): return STATUS_PARSE_MISS
+    if text.startswith("Invalid Data") or "tidak dibuat" in text: return STATUS_INVALID_INPUT
+    return STATUS_ERROR
@@ -0,0 +1,242 @@
+"""Cache lokal (SQLite) untuk hasil scraping nomor.net.
+
+Menyimpan kode pos yang sudah berhasil ditemukan, dengan dua jenis kunci:
+- kode wilayah (hasil format_id_desa_to_kode_wilayah, mis. 11.08.01.2001)
+- URL nomor.net yang dipakai (kodewil / detail)
+Opsional juga menyimpan HTML respons (dikompres zlib).
+Kunci URL sudah memuat host. Kunci kode wilayah diberi awalan "<host>|" jika cache dibuka untuk host selain
+nomor.net asli (mis. server tiruan benchmarks/mock_nomor_server.py), supaya kode pos tiruan tidak pernah
+terbaca sebagai hasil situs asli.
+Cache negatif: URL yang hasilnya pasti gagal (404, halaman tanpa kode pos) dengan TTL sendiri, supaya
+run berikutnya tidak meminta halaman yang sama lagi.
+
+Invalidasi manual dari command line:
+    python nomor_cache.py invalidate --all
+    python nomor_cache.py invalidate --expired
+    python nomor_cache.py invalidate --negative
+    python nomor_cache.py invalidate --kode-wilayah 11.08.01.2001
+    python nomor_cache.py invalidate --url "https://www.nomor.net/_kodepos.php?..."
+    python nomor_cache.py stats
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import urlparse
+
+DEFAULT_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../data/nomor_cache.sqlite3")
+DEFAULT_TTL_DAYS = 30
+DEFAULT_NEGATIVE_TTL_DAYS = 7
+REAL_HOST = "www.nomor.net"  # Kunci kode wilayah host ini tanpa awalan (sama dengan cache versi lama)
+
+KEY_KODE_WILAYAH = "kode_wilayah"
+KEY_URL = "url"
+
+
+class NomorCache:
+    def __init__(self, path, ttl_days=DEFAULT_TTL_DAYS, store_html=False, negative_ttl_days=DEFAULT_NEGATIVE_TTL_DAYS,
+                 host=None):
+        self.path = path
+        self.host = host  # Host nomor.net yang dipakai run ini; None = tanpa penyaringan (CLI)
+        self._key_prefix = f"{host}|" if host and host != REAL_HOST else ""
+        self.ttl_seconds = ttl_days * 24 * 3600 if ttl_days else None
+        self.negative_ttl_seconds = negative_ttl_days * 24 * 3600 if negative_ttl_days else None
+        self.store_html = store_html
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self._lock = threading.Lock()
+        # Satu koneksi dipakai bersama oleh thread pool (dijaga _lock); timeout untuk proses lain (worker lain).
+        # Rollback journal + BEGIN IMMEDIATE, bukan WAL: WAL butuh shared memory di satu host, sedangkan file cache
+        # boleh dipakai worker di host lain lewat folder bersama (NFS/SMB)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level="IMMEDIATE")
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=DELETE")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS postal_codes ("
+                "key_type TEXT NOT NULL, key TEXT NOT NULL, postal_code TEXT NOT NULL, fetched_at REAL NOT NULL, "
+                "PRIMARY KEY (key_type, key))")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, status_code INTEGER, html BLOB, fetched_at REAL NOT NULL)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS negative_results ("
+                "url TEXT PRIMARY KEY, status TEXT NOT NULL, message TEXT, fetched_at REAL NOT NULL)")
+            self._conn.commit()
+
+    def _min_fetched_at(self):
+        return time.time() - self.ttl_seconds if self.ttl_seconds else 0
+
+    def get_postal_code(self, key_type, key):
+        if not key:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT postal_code FROM postal_codes WHERE key_type = ? AND key = ? AND fetched_at >= ?",
+                (key_type, key, self._min_fetched_at())).fetchone()
+            if row:
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def _kode_wilayah_key(self, kode_wilayah):
+        return self._key_prefix + kode_wilayah if kode_wilayah else kode_wilayah
+
+    def get_by_kode_wilayah(self, kode_wilayah):
+        return self.get_postal_code(KEY_KODE_WILAYAH, self._kode_wilayah_key(kode_wilayah))
+
+    def get_by_url(self, url):
+        return self.get_postal_code(KEY_URL, url)
+
+    def put_postal_code(self, postal_code, kode_wilayah=None, url=None):
+        now = time.time()
+        entries = [(key_type, key, postal_code, now) for key_type, key in
+                   ((KEY_KODE_WILAYAH, self._kode_wilayah_key(kode_wilayah)), (KEY_URL, url)) if key]
+        if not entries:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO postal_codes VALUES (?, ?, ?, ?)", entries)
+            self._conn.commit()
+
+    def put_response(self, url, status_code, html):
+        if not self.store_html or not url or html is None:
+            return
+        compressed = zlib.compress(html.encode("utf-8"), 6)
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                               (url, status_code, compressed, time.time()))
+            self._conn.commit()
+
+    def get_response(self, url):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status_code, html FROM responses WHERE url = ? AND fetched_at >= ?",
+                (url, self._min_fetched_at())).fetchone()
+        if not row:
+            return None
+        return row[0], zlib.decompress(row[1]).decode("utf-8")
+
+    def _min_negative_fetched_at(self):
+        return time.time() - self.negative_ttl_seconds if self.negative_ttl_seconds else 0
+
+    def get_negative(self, url):
+        """(status, pesan) jika URL ini sebelumnya pasti gagal dan belum kedaluwarsa, selain itu None."""
+        if not url:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, message FROM negative_results WHERE url = ? AND fetched_at >= ?",
+                (url, self._min_negative_fetched_at())).fetchone()
+            if row:
+                self.negative_hits += 1
+            return row
+
+    def put_negative(self, url, status, message=None):
+        if not url:
+            return
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO negative_results VALUES (?, ?, ?, ?)",
+                               (url, status, message, time.time()))
+            self._conn.commit()
+
+    def iter_postal_codes(self):
+        """Entri kode pos yang belum kedaluwarsa milik host cache ini: list (key_type, key, postal_code).
+
+        Kunci kode wilayah dikembalikan tanpa awalan host.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key_type, key, postal_code FROM postal_codes WHERE fetched_at >= ?",
+                (self._min_fetched_at(),)).fetchall()
+        if self.host is None: return rows
+        entries = []
+        for key_type, key, postal_code in rows:
+            if key_type == KEY_KODE_WILAYAH:
+                prefix, _, kode_wilayah = key.rpartition("|")
+                if prefix + ("|" if prefix else "") == self._key_prefix:
+                    entries.append((key_type, kode_wilayah, postal_code))
+            elif urlparse(key).netloc == self.host:
+                entries.append((key_type, key, postal_code))
+        return entries
+
+    def invalidate(self, kode_wilayah=None, url=None, expired_only=False, everything=False, negative_only=False):
+        """Hapus entri cache; mengembalikan jumlah baris yang dihapus."""
+        with self._lock:
+            deleted = 0
+            if everything:
+                deleted += self._conn.execute("DELETE FROM postal_codes").rowcount
+                deleted += self._conn.execute("DELETE FROM responses").rowcount
+                deleted += self._conn.execute("DELETE FROM negative_results").rowcount
+            elif negative_only:
+                deleted += self._conn.execute("DELETE FROM negative_results").rowcount
+            elif expired_only:
+                min_fetched_at = self._min_fetched_at()
+                deleted += self._conn.execute("DELETE FROM postal_codes WHERE fetched_at < ?",
+                                              (min_fetched_at,)).rowcount
+                deleted += self._conn.execute("DELETE FROM responses WHERE fetched_at < ?",
+                                              (min_fetched_at,)).rowcount
+                deleted += self._conn.execute("DELETE FROM negative_results WHERE fetched_at < ?",
+                                              (self._min_negative_fetched_at(),)).rowcount
+            else:
+                if kode_wilayah:
+                    deleted += self._conn.execute("DELETE FROM postal_codes WHERE key_type = ? AND key = ?",
+                                                  (KEY_KODE_WILAYAH, self._kode_wilayah_key(kode_wilayah))).rowcount
+                if url:
+                    deleted += self._conn.execute("DELETE FROM postal_codes WHERE key_type = ? AND key = ?",
+                                                  (KEY_URL, url)).rowcount
+                    deleted += self._conn.execute("DELETE FROM responses WHERE url = ?", (url,)).rowcount
+                    deleted += self._conn.execute("DELETE FROM negative_results WHERE url = ?", (url,)).rowcount
+            self._conn.commit()
+            return deleted
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT key_type, COUNT(*) FROM postal_codes GROUP BY key_type").fetchall())
+            n_responses = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            n_negative = self._conn.execute("SELECT COUNT(*) FROM negative_results").fetchone()[0]
+            total = self.hits + self.misses
+            hit_rate = (self.hits / total * 100) if total else 0.0
+        return (f"entri kode wilayah: {counts.get(KEY_KODE_WILAYAH, 0)}, entri URL: {counts.get(KEY_URL, 0)}, "
+                f"HTML tersimpan: {n_responses}, negatif: {n_negative}, hit: {self.hits}, miss: {self.misses}, "
+                f"hit rate: {hit_rate:.1f}%, hit negatif: {self.negative_hits}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kelola cache hasil scraping nomor.net")
+    parser.add_argument("--cache-file", default=DEFAULT_CACHE_FILE)
+    parser.add_argument("--ttl-days", type=float, default=DEFAULT_TTL_DAYS)
+    parser.add_argument("--negative-ttl-days", type=float, default=DEFAULT_NEGATIVE_TTL_DAYS)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    invalidate_parser = subparsers.add_parser("invalidate", help="Hapus entri cache")
+    group = invalidate_parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--all", action="store_true", help="Hapus seluruh isi cache")
+    group.add_argument("--expired", action="store_true", help="Hapus entri yang lebih tua dari TTL")
+    group.add_argument("--negative", action="store_true", help="Hapus semua cache negatif (404 / tanpa kode pos)")
+    group.add_argument("--kode-wilayah", help="Hapus entri untuk satu kode wilayah (XX.XX.XX.XXXX)")
+    group.add_argument("--url", help="Hapus entri untuk satu URL nomor.net")
+    subparsers.add_parser("stats", help="Tampilkan jumlah entri cache")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.cache_file):
+        print(f"⚠️ File cache tidak ditemukan: {args.cache_file}")
+        return
+    cache = NomorCache(args.cache_file, ttl_days=args.ttl_days, negative_ttl_days=args.negative_ttl_days)
+    if args.command == "invalidate":
+        deleted = cache.invalidate(kode_wilayah=args.kode_wilayah, url=args.url,
+                                   expired_only=args.expired, everything=args.all, negative_only=args.negative)
+        print(f"✅ {deleted} entri cache dihapus dari {args.cache_file}")
+    else:
+        print(f"ℹ️ {cache.stats()}")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
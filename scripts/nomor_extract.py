@@ -0,0 +1,119 @@
+"""Ekstraksi kode pos dari HTML halaman nomor.net.
+
+Backend yang tersedia (EXTRACTOR_BACKEND di postal_code_generator.py):
+- "bs4"  : logika asli, seluruh halaman di-parse BeautifulSoup (html.parser).
+- "fast" : scan regex untuk tag <a class="ktw"> pertama dan berhenti di situ. Kalau tag tsb tidak
+           berisi kode 5 digit yang jelas, jatuh ke logika "bs4" sehingga hasilnya selalu sama.
+- "lxml" : sama dengan "fast", tapi fallback-nya BeautifulSoup dengan parser lxml (lebih cepat,
+           butuh `pip install lxml`; pada HTML yang rusak hasil parse bisa sedikit berbeda).
+
+extract_postal_code mengembalikan (kode_pos, metode); metode: "ktw", "fallback" atau None.
+"""
+import html as html_lib
+import re
+from functools import lru_cache
+
+try:
+    import lxml  # noqa: F401
+
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+BACKENDS = ("bs4", "fast", "lxml")
+DEFAULT_BACKEND = "fast"
+
+# Tag <a ...> lengkap; nilai atribut boleh berisi ">" selama di dalam tanda kutip
+_A_TAG_RE = re.compile(r"""<a(?=[\s>/])(?:[^>"']|"[^"]*"|'[^']*')*>""", re.IGNORECASE)
+# Satu atribut, aturan yang sama dengan html.parser (attrfind_tolerant): nama, lalu nilai opsional
+_ATTR_RE = re.compile(r"""((?<=['"\s/])[^\s/>][^\s/=>]*)(\s*=+\s*('[^']*'|"[^"]*"|(?!['"])[^>\s]*))?(?:\s|/(?!>))*""")
+_TAG_NAME_RE = re.compile(r"""<[a-zA-Z][^\t\n\r\f />\x00]*(?:\s|/(?!>))*""")
+# Entity (&sup2;, &#178;, ...) bisa menjadi angka setelah di-decode parser: tidak bisa dinilai dari sumber HTML
+_ENTITY_RE = re.compile(r"&[#A-Za-z]")
+_A_CLOSE_RE = re.compile(r"</a\s*>", re.IGNORECASE)
+# Bagian yang oleh html.parser tidak dibaca sebagai tag: <a> di dalamnya bukan tag sungguhan
+_RAW_SECTION_RE = re.compile(r"<!--.*?(?:-->|\Z)|<(script|style)\b.*?(?:</\1\s*>|\Z)", re.IGNORECASE | re.DOTALL)
+_FIVE_DIGITS_RE = re.compile(r"(?<!\d)\d{5}(?!\d)")
+
+
+@lru_cache(maxsize=1)
+def _non_decimal_digits_re():
+    # Karakter yang lolos str.isdigit() tapi tidak cocok dengan \d (mis. superscript "²")
+    chars = "".join(c for c in map(chr, range(0x110000)) if c.isdigit() and not c.isdecimal())
+    return re.compile("[" + re.escape(chars) + "]")
+
+
+def _is_postal_code(text):
+    return text.isdigit() and len(text) == 5
+
+
+def _has_class_ktw(a_tag_html):
+    # Atribut dibaca satu per satu seperti html.parser: "class" di dalam nilai atribut lain tidak dihitung,
+    # dan untuk atribut class ganda yang terakhir menang (perilaku default BeautifulSoup)
+    class_value = None
+    pos = _TAG_NAME_RE.match(a_tag_html).end()
+    while pos < len(a_tag_html):
+        match = _ATTR_RE.match(a_tag_html, pos)
+        if not match or match.end() == pos: break
+        if match.group(1).lower() == "class":
+            value = match.group(3) or ""
+            if value[:1] in ("'", '"') and value[:1] == value[-1:]: value = value[1:-1]
+            class_value = html_lib.unescape(value) if "&" in value else value
+        pos = match.end()
+    if class_value is None: return False
+    return "ktw" in class_value.split() or class_value == "ktw"
+
+
+def _scan_first_ktw(html):
+    """Isi tag <a class="ktw"> pertama jika isinya teks polos; None kalau tidak ada/tidak pasti."""
+    for tag_match in _A_TAG_RE.finditer(html):
+        if not _has_class_ktw(tag_match.group(0)): continue
+        raw_sections = _RAW_SECTION_RE.finditer(html, 0, tag_match.end())
+        if any(m.start() <= tag_match.start() < m.end() for m in raw_sections): continue
+        # <a class="ktw"/> bagi parser adalah tag kosong: teks sesudahnya bukan isinya, serahkan ke parser penuh
+        if tag_match.group(0).endswith("/>"): return None
+        close_match = _A_CLOSE_RE.search(html, tag_match.end())
+        if not close_match: return None
+        inner = html[tag_match.end():close_match.start()]
+        if "<" in inner or "&" in inner: return None  # Ada tag/entity di dalamnya: serahkan ke parser penuh
+        return inner
+    return None
+
+
+def _extract_from_soup(soup, url_type, village_name):
+    postal_code_tag = soup.find("a", class_="ktw")
+    if postal_code_tag and postal_code_tag.string:
+        code = postal_code_tag.string.strip()
+        if _is_postal_code(code): return code, "ktw"
+    village_name_lower = village_name.lower()
+    for text_node in soup.find_all(string=True):
+        stripped_text = str(text_node).strip()
+        if not _is_postal_code(stripped_text): continue
+        if url_type == "detail":
+            parent_context = text_node.parent.get_text(separator=" ", strip=True).lower() if text_node.parent else ""
+            if not (village_name_lower in parent_context or "kodepos" in parent_context or "kode pos" in parent_context):
+                continue
+        return stripped_text, "fallback"
+    return None, None
+
+
+def _fallback_cannot_match(html):
+    # Tanpa deretan 5 digit di sumber HTML, fallback teks tidak mungkin menemukan apa-apa
+    return not _FIVE_DIGITS_RE.search(html) and not _ENTITY_RE.search(html) and not _non_decimal_digits_re().search(html)
+
+
+def extract_postal_code(html, url_type="detail", village_name="", backend=DEFAULT_BACKEND):
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend ekstraksi tidak dikenal: {backend} (pilihan: {', '.join(BACKENDS)})")
+    if backend == "bs4":
+        from bs4 import BeautifulSoup
+        return _extract_from_soup(BeautifulSoup(html, "html.parser"), url_type, village_name)
+
+    ktw_text = _scan_first_ktw(html)
+    if ktw_text is not None and _is_postal_code(ktw_text.strip()):
+        return ktw_text.strip(), "ktw"
+    if _fallback_cannot_match(html):
+        return None, None
+    from bs4 import BeautifulSoup  # Diimpor saat perlu: jalur scan regex tidak butuh parser penuh
+    parser = "lxml" if backend == "lxml" and LXML_AVAILABLE else "html.parser"
+    return _extract_from_soup(BeautifulSoup(html, parser), url_type, village_name)
@@ -0,0 +1,161 @@
+"""Penulisan file hasil scraping: Excel (streaming), Parquet dan CSV.
+
+Excel ditulis secara streaming (xlsxwriter mode constant_memory jika terinstal, kalau tidak openpyxl mode
+write-only): baris langsung dialirkan ke file sehingga memori tidak ikut membesar dengan jumlah sel, dan
+tidak ada objek style per sel. Sorotan kuning untuk
+baris dengan kode pos tidak valid dinyatakan sebagai SATU aturan conditional formatting (rumus Excel)
+atas seluruh tabel, menggantikan df.style.apply(highlight_invalid_rows).to_excel(...).
+
+Format lain untuk job hilir:
+- "parquet": df.to_parquet, butuh `pip install pyarrow` (atau fastparquet)
+- "csv"    : df.to_csv (UTF-8, tanpa index)
+
+    write_output(df, "hasil.xlsx", ["xlsx", "parquet"], postal_code_col="Kode Pos (Postal Code)")
+    -> {"hasil.xlsx": None, "hasil.parquet": None}   # None = berhasil, selain itu exception-nya
+"""
+import os
+from importlib.util import find_spec
+
+# xlsxwriter (opsional, `pip install xlsxwriter`) lebih cepat; tanpa itu dipakai openpyxl mode write-only
+XLSXWRITER_AVAILABLE = find_spec("xlsxwriter") is not None
+
+OUTPUT_FORMATS = ("xlsx", "parquet", "csv")
+DEFAULT_SHEET_NAME = "Sheet1"  # Sama dengan default pandas to_excel
+INVALID_FILL_COLOR = "FFFF00"  # Kuning, seperti 'background-color: yellow' versi lama
+
+
+def column_letter(col_index):
+    """Huruf kolom Excel untuk indeks 0-based (0 -> A, 26 -> AA)."""
+    letters = ""
+    col_index += 1
+    while col_index:
+        col_index, rem = divmod(col_index - 1, 26)
+        letters = chr(ord("A") + rem) + letters
+    return letters
+
+
+def invalid_postal_code_formula(postal_code_cell):
+    """Rumus Excel: TRUE jika isi sel bukan tepat 5 digit 0-9 (padanan is_valid_postal_code).
+
+    postal_code_cell ditulis relatif terhadap baris pertama range, mis. "$K2".
+    """
+    digit_checks = ",".join(f'ISNUMBER(FIND(MID({postal_code_cell},{n},1),"0123456789"))' for n in range(1, 6))
+    return f"NOT(AND(LEN({postal_code_cell})=5,{digit_checks}))"
+
+
+def output_path_for(path, output_format):
+    return f"{os.path.splitext(path)[0]}.{output_format}"
+
+
+def output_format_of(path):
+    """Format output dari ekstensi `path` (".csv" -> "csv"); None jika bukan salah satu OUTPUT_FORMATS."""
+    output_format = os.path.splitext(path)[1].lstrip(".").lower()
+    return output_format if output_format in OUTPUT_FORMATS else None
+
+
+def _rows_for_excel(df):
+    # NaN/None/NA -> sel kosong (seperti to_excel); nilai lain apa adanya
+    values = df.astype(object).where(df.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+def write_excel(df, path, postal_code_col=None, sheet_name=DEFAULT_SHEET_NAME):
+    columns = [str(col) for col in df.columns]
+    highlight_formula = highlight_range = None
+    if postal_code_col is not None and postal_code_col in df.columns and len(df):
+        postal_code_letter = column_letter(list(df.columns).index(postal_code_col))
+        highlight_formula = invalid_postal_code_formula(f"${postal_code_letter}2")
+        highlight_range = f"A2:{column_letter(len(columns) - 1)}{len(df) + 1}"
+    writer = _write_excel_xlsxwriter if XLSXWRITER_AVAILABLE else _write_excel_openpyxl
+    _save_atomic(path, lambda tmp_path: writer(df, tmp_path, columns, sheet_name, highlight_formula, highlight_range))
+
+
+def _write_excel_xlsxwriter(df, path, columns, sheet_name, highlight_formula, highlight_range):
+    import xlsxwriter
+
+    # constant_memory: setiap baris langsung ditulis ke file sementara; teks apa adanya (bukan URL/rumus)
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "strings_to_urls": False,
+                                          "strings_to_formulas": False, "strings_to_numbers": False})
+    try:
+        sheet = workbook.add_worksheet(sheet_name)
+        if highlight_formula:
+            sheet.conditional_format(highlight_range, {
+                "type": "formula", "criteria": f"={highlight_formula}",
+                "format": workbook.add_format({"bg_color": f"#{INVALID_FILL_COLOR}"})})
+        sheet.freeze_panes(1, 0)
+        sheet.write_row(0, 0, columns, workbook.add_format({"bold": True}))
+        for row_no, row in enumerate(_rows_for_excel(df), 1):
+            sheet.write_row(row_no, 0, row)
+    finally:
+        workbook.close()
+
+
+def _write_excel_openpyxl(df, path, columns, sheet_name, highlight_formula, highlight_range):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.formatting.rule import FormulaRule
+    from openpyxl.styles import Font, PatternFill
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    if highlight_formula:
+        # Aturan harus didaftarkan sebelum baris ditulis: mode write-only tidak bisa kembali ke sheet
+        fill = PatternFill(start_color=INVALID_FILL_COLOR, end_color=INVALID_FILL_COLOR, fill_type="solid")
+        sheet.conditional_formatting.add(highlight_range, FormulaRule(formula=[highlight_formula], fill=fill))
+    sheet.freeze_panes = "A2"
+    header_font = Font(bold=True)
+    header = []
+    for col in columns:
+        cell = WriteOnlyCell(sheet, value=col)
+        cell.font = header_font
+        header.append(cell)
+    sheet.append(header)
+    for row in _rows_for_excel(df):
+        sheet.append(row)
+    workbook.save(path)
+
+
+def write_parquet(df, path):
+    # Kolom object campuran (mis. ID Desa angka & teks) disimpan sebagai teks supaya skema Parquet konsisten
+    frame = df.copy()
+    for col in frame.columns:
+        if frame[col].dtype == object: frame[col] = frame[col].astype("string")
+    _save_atomic(path, lambda tmp_path: frame.to_parquet(tmp_path, index=False))
+
+
+def write_csv(df, path):
+    _save_atomic(path, lambda tmp_path: df.to_csv(tmp_path, index=False))
+
+
+def _save_atomic(path, save):
+    # Tulis ke file sementara lalu ganti: file lama tetap utuh kalau penulisan gagal di tengah jalan
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        save(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path): os.remove(tmp_path)
+
+
+def write_output(df, path, formats=("xlsx",), postal_code_col=None):
+    """Tulis df ke setiap format di `formats` (nama file = `path` dengan ekstensi format).
+
+    Mengembalikan {path file: None jika berhasil, atau exception-nya}; satu format gagal tidak menghentikan
+    format lain.
+    """
+    results = {}
+    for output_format in formats:
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Format output tidak dikenal: {output_format} (pilihan: {', '.join(OUTPUT_FORMATS)})")
+        target = output_path_for(path, output_format)
+        try:
+            if output_format == "xlsx":
+                write_excel(df, target, postal_code_col)
+            elif output_format == "parquet":
+                write_parquet(df, target)
+            else:
+                write_csv(df, target)
+            results[target] = None
+        except Exception as e:
+            results[target] = e
+    return results
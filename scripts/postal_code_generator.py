@@ -1,23 +1,60 @@
-import pandas as pd
+"""Scraping kode pos desa dari nomor.net.
+
+Bisa dijalankan sebagai skrip (lihat `python postal_code_generator.py --help`) atau diimpor sebagai modul:
+
+    import postal_code_generator as pcg
+    pcg.configure(data_dir="data", base_url="https://www.nomor.net")
+    pcg.lookup_village("Lamtui", "Kuta Cot Glie", "Kab. Aceh Besar", id_desa="1108012001")
+
+Dependensi berat (pandas, BeautifulSoup, tqdm, cloudscraper) baru diimpor saat benar-benar dipakai, jadi
+pencarian satu desa (`--mode lookup`) tidak memuat pandas maupun file Excel.
+"""
 import os
-import requests  # Masih dipakai untuk requests.utils.quote
-from bs4 import BeautifulSoup
 import time
-from tqdm import tqdm
-# openpyxl tidak lagi diimpor langsung untuk styling, tapi pandas .style.to_excel butuh terinstal
 import re
 import random  # Import modul random untuk jeda acak
+import socket
+import argparse
+import glob
+import subprocess
+import sys
+import json
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from urllib.parse import quote, urlparse  # quote sama persis dengan requests.utils.quote
 
-try:
-    import cloudscraper
+from nomor_cache import REAL_HOST as NOMOR_NET_REAL_HOST, NomorCache
+from nomor_extract import extract_postal_code
+from output_writer import OUTPUT_FORMATS as OUTPUT_WRITER_FORMATS, output_format_of, write_output
+from lookup_status import ALL_STATUSES, DEFAULT_RETRY_BUDGETS, NEGATIVE_CACHE_STATUSES, RETRYABLE_STATUSES, \
+    STATUS_BLOCKED, STATUS_ERROR, STATUS_INVALID_INPUT, STATUS_PARSE_MISS, STATUS_SUCCESS, STATUS_TIMEOUT, \
+    classify_result_text, combine_statuses, status_from_http
+from postal_index import PROVENANCE_PREFIX as INDEX_PROVENANCE_PREFIX, PostalCodeIndex
+from village_input import VillageInput, file_sha256
+from work_queue import LeaseRenewer, WorkQueue
+from run_metrics import RunMetrics
+from rate_control import AdaptiveRateController, OUTCOME_BLOCKED, OUTCOME_ERROR, OUTCOME_TIMEOUT, \
+    outcome_from_status
 
-    CLOUDSCAPER_AVAILABLE = True
-except ImportError:
-    CLOUDSCAPER_AVAILABLE = False
-    # Menggunakan simbol untuk peringatan
-    print(
-        "⚠️ --- PERINGATAN: Library cloudscraper tidak terinstal. Scraping nomor.net akan menggunakan requests biasa (kemungkinan gagal karena Cloudflare). ---")
-    print("--- Untuk mencoba melewati Cloudflare di nomor.net, jalankan: pip install cloudscraper ---")
+cloudscraper = None
+CLOUDSCAPER_AVAILABLE = None  # None = belum dicek; cloudscraper baru diimpor saat request pertama
+
+
+def load_cloudscraper():
+    global cloudscraper, CLOUDSCAPER_AVAILABLE
+    if CLOUDSCAPER_AVAILABLE is None:
+        try:
+            import cloudscraper
+
+            CLOUDSCAPER_AVAILABLE = True
+        except ImportError:
+            CLOUDSCAPER_AVAILABLE = False
+            # Menggunakan simbol untuk peringatan
+            logger.warning(
+                "⚠️ --- PERINGATAN: Library cloudscraper tidak terinstal. Scraping nomor.net akan menggunakan requests biasa (kemungkinan gagal karena Cloudflare). ---")
+            logger.warning("--- Untuk mencoba melewati Cloudflare di nomor.net, jalankan: pip install cloudscraper ---")
+    return CLOUDSCAPER_AVAILABLE
 
 # Inisialisasi Colorama untuk output berwarna di konsol (opsional, jika ingin warna juga)
 # Jika tidak pakai colorama, simbol saja yang akan tampil.
@@ -62,6 +99,8 @@ except NameError:
 
 data_folder_path = os.path.join(base_dir, "../data")
 input_file = os.path.join(data_folder_path, "need_to_fix_part1.xlsx")  # Sesuai input Chief
+NOMOR_NET_BASE_URL = "https://www.nomor.net"  # Bisa diarahkan ke server tiruan (benchmarks/mock_nomor_server.py)
+DEFAULT_DATA_FOLDER_PATH = data_folder_path
 
 # --- KONFIGURASI PENGGUNA UNTUK MANUAL CHUNKING ---
 MY_PROCESS_ID = "vincent"  # Sesuai kode user
@@ -69,70 +108,148 @@ MY_START_ROW_ABSOLUTE = 118
 MY_END_ROW_EXCLUSIVE_ABSOLUTE = 998
 # -------------------------------------------------
 
-BATCH_SIZE = 20
-MAX_RETRIES_NOMOR_NET = 2
-RETRY_DELAY_NOMOR_NET_MIN = 5
-RETRY_DELAY_NOMOR_NET_MAX = 10
+BATCH_SIZE = 20  # Journal checkpoint di-fsync ke disk setiap BATCH_SIZE baris
+MAX_CONCURRENT_REQUESTS = 4  # Jumlah baris yang di-scrape bersamaan (thread pool)
+MAX_RETRIES_NOMOR_NET = 2  # Percobaan halaman daftar kecamatan (URL per baris memakai RETRY_BUDGETS)
+
+# --- STATUS HASIL & RETRY PER STATUS (lihat lookup_status.py) ---
+RETRY_BUDGETS = dict(DEFAULT_RETRY_BUDGETS)  # Percobaan maksimum satu URL per status gagal (blocked, timeout, ...)
+ENABLE_NEGATIVE_CACHE = True  # URL 404 / tanpa kode pos tidak diminta ulang selama NEGATIVE_CACHE_TTL_DAYS
+NEGATIVE_CACHE_TTL_DAYS = 7
+REPAIR_STATUSES = list(RETRYABLE_STATUSES)  # Status yang diproses ulang oleh --mode repair
+
+# --- HEDGED LOOKUP: URL detail ikut dikirim jika URL kodewil belum memberi kode pos valid ---
+ENABLE_HEDGED_LOOKUP = True
+HEDGE_DELAY_SECONDS = 3.0  # Tunggu hasil URL kodewil selama ini sebelum URL detail dikirim paralel (0 = langsung)
+
+# --- PENGATUR LAJU REQUEST ADAPTIF & CIRCUIT BREAKER (lihat rate_control.py) ---
+RATE_INITIAL_DELAY = 1.0  # Jeda awal antar request ke nomor.net (detik, berlaku untuk semua thread)
+RATE_MIN_DELAY = 0.3  # Batas bawah jeda saat respons bersih
+RATE_MAX_DELAY = 30.0  # Batas atas jeda saat banyak blokir/timeout
+BREAKER_WINDOW = 20  # Jumlah respons terakhir yang diamati circuit breaker
+BREAKER_THRESHOLD = 8  # Breaker terbuka jika >= sekian respons 403/429 dalam jendela tsb
+BREAKER_COOLDOWN_SECONDS = 300  # Lama semua worker berhenti saat breaker terbuka
+
+# --- MODE COORDINATOR/WORKER (antrian unit kerja bersama, lihat work_queue.py) ---
+WORK_UNIT_SIZE = 100  # Jumlah baris per unit kerja
+WORK_LEASE_SECONDS = 600  # Unit dianggap ditinggal (worker mati) jika lease tidak diperpanjang selama ini
+WORK_POLL_SECONDS = 30  # Jeda coordinator saat menunggu worker selesai
+
+RUN_MODE = "manual"  # Diatur lewat configure() / --mode
+REPAIR_SOURCE = None  # (mode repair) File output v15 yang diperbaiki, diatur lewat --repair-from
+INPUT_ID = None  # Identitas isi file yang sedang diproses (16 hex pertama sha256), dicatat di setiap record journal
+queue_dir = os.path.join(data_folder_path, "queue_v15")
+
 
-# --- Nama File Output & Folder Batch ---
-output_file_suffix = f"_part_{MY_PROCESS_ID}_{MY_START_ROW_ABSOLUTE + 1}-{MY_END_ROW_EXCLUSIVE_ABSOLUTE}"
-# Versi dinaikkan untuk menandai perubahan simbol debug dan penghapusan simpan HTML
-output_file = os.path.join(data_folder_path, f"village_postal_code_v15{output_file_suffix}.xlsx")
-batches_dir = os.path.join(data_folder_path, f"batches_v15{output_file_suffix}")
-# debug_html_storage_dir dihapus
+# --- Nama File Output & Journal Checkpoint (dihitung ulang oleh configure()) ---
+def derive_paths():
+    global output_file_suffix, output_file, journal_file, queue_file, CACHE_FILE, BREAKER_STATE_FILE, INPUT_CACHE_DIR, \
+        TRACE_FILE, METRICS_FILE
+    output_file_suffix = f"_part_{MY_PROCESS_ID}_{MY_START_ROW_ABSOLUTE + 1}-{MY_END_ROW_EXCLUSIVE_ABSOLUTE}"
+    # Versi dinaikkan untuk menandai perubahan simbol debug dan penghapusan simpan HTML
+    output_file = os.path.join(data_folder_path, f"village_postal_code_v15{output_file_suffix}.xlsx")
+    # Journal append-only (JSONL, satu record per baris selesai) menggantikan folder batch kumulatif
+    journal_file = os.path.join(data_folder_path, f"journal_v15{output_file_suffix}.jsonl")
+    # Trace JSON-lines & snapshot metrik Prometheus (lihat run_metrics.py)
+    TRACE_FILE = os.path.join(data_folder_path, f"trace_v15{output_file_suffix}.jsonl")
+    METRICS_FILE = os.path.join(data_folder_path, f"metrics_v15{output_file_suffix}.prom")
+    queue_file = os.path.join(queue_dir, "work_queue.sqlite3")
+    if RUN_MODE not in ("manual", "lookup"):
+        # Mode antrian: tiap worker punya journal sendiri di queue_dir, hasil gabungan jadi satu file
+        input_name = os.path.splitext(os.path.basename(input_file))[0]
+        output_file = os.path.join(data_folder_path, f"village_postal_code_v15_merged_{input_name}.xlsx")
+        journal_file = os.path.join(queue_dir, f"journal_v15_worker_{MY_PROCESS_ID}.jsonl")
+        TRACE_FILE = os.path.join(data_folder_path, f"trace_v15_worker_{MY_PROCESS_ID}.jsonl")
+        METRICS_FILE = os.path.join(data_folder_path, f"metrics_v15_worker_{MY_PROCESS_ID}.prom")
+    if RUN_MODE == "repair" and REPAIR_SOURCE:
+        # Mode repair: hasil ditulis kembali ke file yang diperbaiki (formatnya, lihat run_output_formats);
+        # journal di luar pola journal_v15_*
+        repair_name = os.path.splitext(os.path.basename(REPAIR_SOURCE))[0]
+        output_file = REPAIR_SOURCE
+        journal_file = os.path.join(data_folder_path, f"repair_journal_{repair_name}.jsonl")
+        TRACE_FILE = os.path.join(data_folder_path, f"trace_repair_{repair_name}.jsonl")
+        METRICS_FILE = os.path.join(data_folder_path, f"metrics_repair_{repair_name}.prom")
+    # debug_html_storage_dir dihapus
+    CACHE_FILE = os.path.join(data_folder_path, "nomor_cache.sqlite3")  # Dipakai bersama oleh semua chunk/run
+    INPUT_CACHE_DIR = os.path.join(data_folder_path, "input_cache")  # Cache kolumnar sheet villages (village_input.py)
+    # File bersama: worker lain (proses/host lain) ikut berhenti saat breaker terbuka
+    BREAKER_STATE_FILE = os.path.join(data_folder_path, "nomor_circuit_breaker.json")
+
+
+derive_paths()
+
+# --- FORMAT FILE HASIL (lihat output_writer.py): "xlsx", "parquet" (butuh pyarrow), "csv" ---
+OUTPUT_FORMATS = ["xlsx"]  # Nama file sama dengan output_file, hanya ekstensinya yang berbeda
+
+# --- CACHE LOKAL HASIL SCRAPING (invalidasi: python nomor_cache.py invalidate --help) ---
+ENABLE_CACHE = True
+ENABLE_INPUT_CACHE = True  # False = sheet villages di-parse dari XLSX setiap run (tanpa INPUT_CACHE_DIR)
+CACHE_TTL_DAYS = 30
+CACHE_STORE_HTML = False  # True = simpan juga HTML respons (terkompresi) di cache
+nomor_cache = None  # Dibuka oleh configure()
+
+# --- EKSTRAKSI KODE POS DARI HTML (lihat nomor_extract.py) ---
+EXTRACTOR_BACKEND = "fast"  # "fast" (scan <a class="ktw"> dulu), "bs4" (logika asli) atau "lxml"
+
+# --- PLANNER PER KECAMATAN: satu halaman daftar desa per kecamatan untuk banyak baris sekaligus ---
+ENABLE_DISTRICT_PLANNER = True
+DISTRICT_PLANNER_MIN_ROWS = 2  # Kecamatan dengan baris lebih sedikit dari ini langsung di-scrape per baris
+
+# --- INDEKS KODE POS OFFLINE: isi kode pos dari hasil yang sudah diketahui (lihat postal_index.py) ---
+ENABLE_POSTAL_INDEX = True
+INDEX_MIN_SUPPORT = 3  # Minimal desa yang sudah diketahui di satu kecamatan sebelum kodenya dipakai desa lain
+INDEX_MIN_AGREEMENT = 1.0  # Porsi desa kecamatan tsb yang harus sepakat (1.0 = semua)
+INDEX_FUZZY_CUTOFF = 0.92  # Kemiripan minimal nama desa (difflib) di kecamatan yang sama
+INDEX_FROM_OUTPUTS = False  # Indeks juga membaca file output v15 sebelumnya (default: journal & cache SQLite saja)
+postal_index = None  # Dibangun oleh load_postal_index()
+
+# --- METRIK & TRACE (lihat run_metrics.py): ke mana waktu satu run habis ---
+ENABLE_TRACE = True  # Trace JSON-lines per request/parse/baris di TRACE_FILE
+ENABLE_METRICS_FILE = True  # Snapshot textfile Prometheus di METRICS_FILE
+METRICS_SNAPSHOT_SECONDS = 30  # Snapshot (dan flush trace) paling sering setiap sekian detik
+metrics = RunMetrics()  # Hanya di memori sampai open_metrics() dipanggil run_manual/run_worker
 
 # --- NAMA KOLOM DARI FILE INPUT (Pastikan sesuai dengan file Excel Chief) ---
 COL_ID_DESA = 'ID Desa (Village ID)'
 COL_NAMA_DESA = 'Nama Desa (Village Name)'
 COL_KECAMATAN = 'Kecamatan (District)'
 COL_KABUPATEN = 'Kabupaten (Regency)'
+REQUIRED_INPUT_COLUMNS = [COL_ID_DESA, COL_NAMA_DESA, COL_KECAMATAN, COL_KABUPATEN]
+INPUT_COLUMNS = None  # Kolom input yang ikut ke file hasil; None = semua kolom sheet villages (seperti versi lama)
 
 # --- DEBUGGING FLAG ---
 DEBUG_TARGET_VILLAGE = "Lamtui"
 DEBUG_TARGET_DISTRICT = "Kuta Cot Glie"
-ENABLE_DETAILED_DEBUG = True  # Tetap True untuk log konsol dengan simbol
+ENABLE_DETAILED_DEBUG = True  # Tetap True untuk log konsol dengan simbol (level DEBUG)
+LOG_LEVEL = None  # "DEBUG"/"INFO"/"WARNING"/"ERROR"; None = DEBUG jika ENABLE_DETAILED_DEBUG, selain itu INFO
+logger = logging.getLogger("postal_code_generator")
 
-print(f"{SYM_INFO} --- DEBUG: Base directory (lokasi skrip): {base_dir} ---")
-print(f"{SYM_INFO} --- DEBUG: Data directory: {data_folder_path} ---")
-print(f"{SYM_INFO} --- DEBUG: Target input file: {input_file} ---")
-print(f"{SYM_INFO} --- DEBUG (ID: {MY_PROCESS_ID}): Target output file: {output_file} ---")
-print(f"{SYM_INFO} --- DEBUG (ID: {MY_PROCESS_ID}): Target batches directory: {batches_dir} ---")
-# Print untuk debug_html_storage_dir dihapus
 
-# Membuat folder batches jika belum ada
-try:
-    if not os.path.exists(batches_dir):
-        os.makedirs(batches_dir);
-        print(f"{SYM_SUCCESS} Folder {batches_dir} telah berhasil dibuat.")
-    else:
-        print(f"{SYM_INFO} Folder {batches_dir} sudah ada.")
-except Exception as e:
-    print(f"{SYM_ERROR} --- ERROR: Gagal membuat folder batches: {batches_dir} - Error: {e} ---");
-    exit(1)
+# Log konsol (stdout, pesan apa adanya dengan simbol). Blok debug di jalur panas dijaga ENABLE_DETAILED_DEBUG,
+# yang di sini disamakan dengan level logger, jadi tidak ada f-string yang dibangun saat level di atas DEBUG.
+def setup_logging(level=None):
+    global ENABLE_DETAILED_DEBUG
+    level = level or LOG_LEVEL or ("DEBUG" if ENABLE_DETAILED_DEBUG else "INFO")
+    logger.setLevel(level.upper())
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+    ENABLE_DETAILED_DEBUG = logger.isEnabledFor(logging.DEBUG)
 
-try:
-    df_full = pd.read_excel(input_file, sheet_name="villages")
-    print(f"{SYM_INFO} File {input_file} berhasil dibaca. Jumlah baris total di Excel: {len(df_full)}")
-    actual_start_row = max(0, MY_START_ROW_ABSOLUTE);
-    actual_end_row = min(len(df_full), MY_END_ROW_EXCLUSIVE_ABSOLUTE)
-    if actual_start_row < actual_end_row:
-        print(
-            f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): Proses baris {actual_start_row} hingga {actual_end_row - 1} ---")
-        df = df_full.iloc[actual_start_row:actual_end_row].reset_index(drop=True)
-        print(f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): Jumlah baris diproses: {len(df)} ---")
-    else:
-        df = pd.DataFrame();
-        print(f"{SYM_WARNING} --- INFO (ID: {MY_PROCESS_ID}): Rentang baris tidak valid/kosong. ---")
-except Exception as e:
-    print(f"{SYM_ERROR} Error baca Excel/chunk: {e}");
-    exit(1)
 
-if df.empty: print(f"{SYM_WARNING} Tidak ada data diproses (ID: {MY_PROCESS_ID}). Skrip berhenti."); exit(0)
+# Pengganti pd.isna untuk satu nilai sel, supaya modul ini tidak perlu mengimpor pandas
+def is_missing(value):
+    if value is None: return True
+    if isinstance(value, float): return value != value  # NaN (termasuk numpy.float64)
+    pd_module = sys.modules.get("pandas")
+    return pd_module is not None and (value is pd_module.NA or value is pd_module.NaT)
 
 
 # Fungsi format ID Desa ke format Kode Wilayah (XX.XX.XX.XXXX)
 def format_id_desa_to_kode_wilayah(id_desa_val):
-    if pd.isna(id_desa_val): return None
+    if is_missing(id_desa_val): return None
     id_desa_str = str(id_desa_val).strip()
     if id_desa_str.endswith(".0"): id_desa_str = id_desa_str[:-2]
     if len(id_desa_str) == 10 and id_desa_str.isdigit():
@@ -142,42 +259,56 @@ def format_id_desa_to_kode_wilayah(id_desa_val):
     return None
 
 
-# Fungsi buat generate URL nomor.net (FORMAT DETAIL BARU - REVISED)
-def generate_nomor_url_detailed(row):
-    vil_original = str(row.get(COL_NAMA_DESA, "")).strip()
-    dist_original = str(row.get(COL_KECAMATAN, "")).strip()
-    reg_original = str(row.get(COL_KABUPATEN, "")).strip()
+# Nama kecamatan yang di nomor.net ditulis berbeda (kunci: nama kecamatan huruf kecil)
+DISTRICT_ALIASES = {
+    "kuta cot glie": "Kuta Cot Glie (Kota Cot Glie)",
+}
+URL_TEMPLATE_DETAIL = "{base}/_kodepos.php?_i=desa-kodepos&sby=010000&daerah={daerah}&jobs={jobs}"
+URL_TEMPLATE_KODEWIL = "{base}/_kodepos.php?_i=cari-kodepos&jobs={jobs}&urut=8&sby=010000&no1a=2&no2a=&perhal=0&kk=0"
+URL_DETAIL_NOT_CREATED = "URL (detail) tidak dibuat (data kurang)"
+URL_KODEWIL_NOT_CREATED = "URL (kode wilayah) tidak dibuat (ID Desa tidak valid/kosong)"
 
-    if not vil_original or not dist_original or not reg_original:
-        return "URL (detail) tidak dibuat (data kurang)"
 
+# Parameter `daerah` nomor.net untuk satu kecamatan: "Desa-<Kecamatan>-Kab.-<Kabupaten>"
+def build_daerah_string(dist_original, reg_original, log_alias=True):
     reg_cleaned = reg_original
     if reg_original.lower().startswith("kab. "):
         reg_cleaned = reg_original[5:].strip()
     elif reg_original.lower().startswith("kota "):
         reg_cleaned = reg_original[5:].strip()
 
-    dist_for_daerah = dist_original
-    if dist_original.lower() == "kuta cot glie":
-        dist_for_daerah = "Kuta Cot Glie (Kota Cot Glie)"
-        if ENABLE_DETAILED_DEBUG: print(
+    dist_for_daerah = DISTRICT_ALIASES.get(dist_original.lower(), dist_original)
+    if dist_for_daerah != dist_original and log_alias:
+        if ENABLE_DETAILED_DEBUG: logger.debug(
             f"{SYM_INFO} DEBUG (generate_nomor_url_detailed): Penyesuaian nama kecamatan untuk '{dist_original}' menjadi '{dist_for_daerah}'")
 
-    daerah_str = f"Desa-{dist_for_daerah}-Kab.-{reg_cleaned}"
-    daerah_encoded = requests.utils.quote(daerah_str)
-    jobs_encoded = requests.utils.quote(vil_original)
+    return f"Desa-{dist_for_daerah}-Kab.-{reg_cleaned}"
+
+
+# Fungsi buat generate URL nomor.net (FORMAT DETAIL BARU - REVISED)
+def generate_nomor_url_detailed(row):
+    vil_original = str(row.get(COL_NAMA_DESA, "")).strip()
+    dist_original = str(row.get(COL_KECAMATAN, "")).strip()
+    reg_original = str(row.get(COL_KABUPATEN, "")).strip()
+
+    if not vil_original or not dist_original or not reg_original:
+        return URL_DETAIL_NOT_CREATED
+
+    daerah_str = build_daerah_string(dist_original, reg_original)
+    daerah_encoded = quote(daerah_str)
+    jobs_encoded = quote(vil_original)
 
-    generated_url = f"https://www.nomor.net/_kodepos.php?_i=desa-kodepos&sby=010000&daerah={daerah_encoded}&jobs={jobs_encoded}"
+    generated_url = URL_TEMPLATE_DETAIL.format(base=NOMOR_NET_BASE_URL, daerah=daerah_encoded, jobs=jobs_encoded)
 
     if ENABLE_DETAILED_DEBUG:
         if (DEBUG_TARGET_VILLAGE and DEBUG_TARGET_VILLAGE.lower() in vil_original.lower()) or \
                 (DEBUG_TARGET_DISTRICT and DEBUG_TARGET_DISTRICT.lower() in dist_original.lower()):
-            print(
+            logger.debug(
                 f"\n{SYM_INFO} --- DEBUG: generate_nomor_url_detailed untuk '{vil_original}, {dist_original}, {reg_original}' ---")
-            print(f"   Daerah String (sebelum encode): '{daerah_str}'")
-            print(f"   Jobs String (sebelum encode): '{vil_original}'")
-            print(f"   Generated URL: {generated_url}")
-            print(f"-----------------------------------------------------------------------\n")
+            logger.debug(f"   Daerah String (sebelum encode): '{daerah_str}'")
+            logger.debug(f"   Jobs String (sebelum encode): '{vil_original}'")
+            logger.debug(f"   Generated URL: {generated_url}")
+            logger.debug("-----------------------------------------------------------------------\n")
     return generated_url
 
 
@@ -186,240 +317,1386 @@ def generate_nomor_url_by_kode_wilayah(row):
     id_desa_val = row.get(COL_ID_DESA)
     kode_wilayah_formatted = format_id_desa_to_kode_wilayah(id_desa_val)
     if not kode_wilayah_formatted:
-        return "URL (kode wilayah) tidak dibuat (ID Desa tidak valid/kosong)"
-    jobs_encoded = requests.utils.quote(kode_wilayah_formatted)
-    return f"https://www.nomor.net/_kodepos.php?_i=cari-kodepos&jobs={jobs_encoded}&urut=8&sby=010000&no1a=2&no2a=&perhal=0&kk=0"
+        return URL_KODEWIL_NOT_CREATED
+    jobs_encoded = quote(kode_wilayah_formatted)
+    return URL_TEMPLATE_KODEWIL.format(base=NOMOR_NET_BASE_URL, jobs=jobs_encoded)
+
+
+# --- VERSI VEKTOR (satu DataFrame sekaligus, dipakai prepare_chunk) ---
+# Hasilnya identik byte-per-byte dengan fungsi per baris di atas (cek: python benchmarks/bench_url_generation.py).
+# Kolom nama desa & ID Desa diproses dengan ufunc numpy.strings (numpy >= 2); kecamatan/kabupaten hanya punya
+# beberapa ribu nilai unik, jadi string `daerah` dihitung sekali per pasangan unik lalu disebar ke semua baris.
+QUOTE_TABLE_MAX_WIDTH = 64  # Nama lebih panjang dari ini di-quote per baris (matriks kode karakter tetap kecil)
+_quote_passthrough_table = None
+
+
+def text_array(series):
+    # Sama dengan str(nilai) per sel (NaN -> "nan", None -> "None"), seperti row.get() di df.apply
+    from numpy.dtypes import StringDType
+    return series.to_numpy(dtype=object).astype(StringDType())
+
+
+def quote_array(text):
+    """quote() untuk array numpy StringDType."""
+    global _quote_passthrough_table
+    import numpy as np
+    if _quote_passthrough_table is None:
+        # Indeks = kode karakter (128 = semua non-ASCII); True = tidak diubah quote() (spasi nanti jadi %20)
+        table = np.zeros(129, dtype=bool)
+        table[[ord(c) for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_.-~/ "]] = True
+        _quote_passthrough_table = table
+    lengths = np.strings.str_len(text)
+    passthrough = np.zeros(len(text), dtype=bool)
+    short = lengths <= QUOTE_TABLE_MAX_WIDTH
+    if short.any():
+        width = max(1, int(lengths[short].max()))
+        char_codes = text[short].astype(f"U{width}").view(np.uint32).reshape(-1, width)
+        padding = np.arange(width) >= lengths[short][:, None]
+        passthrough[short] = (_quote_passthrough_table[np.minimum(char_codes, 128)] | padding).all(axis=1)
+    quoted = np.strings.replace(text, " ", "%20")
+    for idx in np.flatnonzero(~passthrough): quoted[idx] = quote(str(text[idx]))
+    return quoted
+
+
+def format_kode_wilayah_array(id_desa_series):
+    """format_id_desa_to_kode_wilayah untuk satu kolom: array kode wilayah (None kalau ID Desa tidak valid)."""
+    import numpy as np
+    id_desa_values = id_desa_series.to_numpy(dtype=object)
+    text = np.strings.strip(text_array(id_desa_series))
+    lengths = np.strings.str_len(text)
+    kode_wilayah = np.full(len(text), None, dtype=object)
+    # ID Desa ASCII dipotong ke matriks kode karakter (lebar 15 = "XX.XX.XX.XXXX.0"); sisanya per baris
+    fits = lengths <= 15
+    char_codes = text[fits].astype("U15").view(np.uint32).reshape(-1, 15)
+    lengths_fit = lengths[fits]
+    in_text = np.arange(15) < lengths_fit[:, None]
+    is_ascii = ((char_codes < 128) | ~in_text).all(axis=1)
+    rows = np.arange(len(char_codes))
+    has_suffix = ((lengths_fit >= 2) & (char_codes[rows, np.maximum(lengths_fit - 2, 0)] == ord("."))
+                  & (char_codes[rows, np.maximum(lengths_fit - 1, 0)] == ord("0")))
+    lengths_fit = np.where(has_suffix, lengths_fit - 2, lengths_fit)
+    is_digit = (char_codes >= ord("0")) & (char_codes <= ord("9"))
+    digits10 = (lengths_fit == 10) & is_digit[:, :10].all(axis=1)
+    dot_columns = [2, 5, 8]
+    digit_columns = [c for c in range(13) if c not in dot_columns]
+    dotted = ((lengths_fit == 13) & (char_codes[:, dot_columns] == ord(".")).all(axis=1)
+              & is_digit[:, digit_columns].all(axis=1))
+    formatted = np.where(digits10[:, None], char_codes[:, [0, 1, 0, 2, 3, 0, 4, 5, 0, 6, 7, 8, 9]], char_codes[:, :13])
+    formatted[np.ix_(digits10, dot_columns)] = ord(".")
+    valid = (digits10 | dotted) & is_ascii
+    fit_rows = np.flatnonzero(fits)
+    kode_wilayah[fit_rows[valid]] = np.ascontiguousarray(formatted[valid]).view("U13").ravel().astype(object)
+    # Non-ASCII ("١١٠٨...", "...²...") & teks panjang: aturan isdigit()/regex \d persis seperti per baris
+    for idx in np.concatenate([np.flatnonzero(~fits), fit_rows[~is_ascii]]):
+        kode_wilayah[idx] = format_id_desa_to_kode_wilayah(id_desa_values[idx])
+    kode_wilayah[id_desa_series.isna().to_numpy()] = None
+    return kode_wilayah
+
+
+def generate_nomor_urls(df):
+    """(kolom URL detail, kolom URL kodewil) untuk seluruh df; identik dengan df.apply(generate_nomor_url_*)."""
+    import numpy as np
+    import pandas as pd
+    if not hasattr(np, "strings"):  # numpy < 2 (tanpa StringDType): pakai versi per baris
+        return (df.apply(generate_nomor_url_detailed, axis=1, result_type="reduce"),
+                df.apply(generate_nomor_url_by_kode_wilayah, axis=1, result_type="reduce"))
+    from numpy.dtypes import StringDType
+    n_rows = len(df)
+
+    detail_urls = np.full(n_rows, URL_DETAIL_NOT_CREATED, dtype=object)
+    dist_texts = []
+    if all(col in df.columns for col in (COL_NAMA_DESA, COL_KECAMATAN, COL_KABUPATEN)):
+        vil = np.strings.strip(text_array(df[COL_NAMA_DESA]))
+        # Faktorisasi teks str() (bukan nilai mentah) supaya NaN/None/angka diperlakukan persis seperti per baris
+        dist_codes, dist_uniques = pd.factorize(text_array(df[COL_KECAMATAN]).astype(object))
+        reg_codes, reg_uniques = pd.factorize(text_array(df[COL_KABUPATEN]).astype(object))
+        dist_texts = [v.strip() for v in dist_uniques]
+        reg_texts = [v.strip() for v in reg_uniques]
+        pair_codes, pair_uniques = pd.factorize(dist_codes * len(reg_uniques) + reg_codes)
+        daerah_by_pair, pair_usable = [], []
+        for pair in pair_uniques:
+            dist_text, reg_text = dist_texts[pair // len(reg_uniques)], reg_texts[pair % len(reg_uniques)]
+            pair_usable.append(bool(dist_text and reg_text))
+            daerah_by_pair.append(build_daerah_string(dist_text, reg_text, log_alias=False))
+        prefix, middle, suffix = URL_TEMPLATE_DETAIL.format(base=NOMOR_NET_BASE_URL, daerah="\0", jobs="\0").split("\0")
+        usable = np.array(pair_usable or [False], dtype=bool)[pair_codes] & (np.strings.str_len(vil) > 0)
+        url_head_by_pair = prefix + quote_array(np.array(daerah_by_pair or [""], dtype=StringDType())) + middle
+        detail_urls[usable] = url_head_by_pair[pair_codes[usable]] + quote_array(vil[usable]) + suffix
+
+    kodewil_urls = np.full(n_rows, URL_KODEWIL_NOT_CREATED, dtype=object)
+    if COL_ID_DESA in df.columns:
+        kode_wilayah = format_kode_wilayah_array(df[COL_ID_DESA])
+        has_kode = kode_wilayah != None  # noqa: E711 (perbandingan elemen array object)
+        prefix, suffix = URL_TEMPLATE_KODEWIL.format(base=NOMOR_NET_BASE_URL, jobs="\0").split("\0")
+        kodewil_urls[has_kode] = prefix + quote_array(kode_wilayah[has_kode].astype(StringDType())) + suffix
+
+    if ENABLE_DETAILED_DEBUG and dist_texts:
+        for dist_text in dict.fromkeys(dist_texts):
+            if DISTRICT_ALIASES.get(dist_text.lower(), dist_text) != dist_text:
+                logger.debug(
+                    f"{SYM_INFO} DEBUG (generate_nomor_urls): Penyesuaian nama kecamatan untuk '{dist_text}' menjadi '{DISTRICT_ALIASES[dist_text.lower()]}'")
+        debug_rows = np.zeros(n_rows, dtype=bool)
+        if DEBUG_TARGET_VILLAGE:
+            debug_rows |= np.strings.find(np.strings.lower(vil), DEBUG_TARGET_VILLAGE.lower()) >= 0
+        if DEBUG_TARGET_DISTRICT:
+            debug_rows |= np.array([DEBUG_TARGET_DISTRICT.lower() in t.lower() for t in dist_texts])[dist_codes]
+        for idx in np.flatnonzero(debug_rows & (detail_urls != URL_DETAIL_NOT_CREATED)):
+            logger.debug(f"\n{SYM_INFO} --- DEBUG: generate_nomor_urls untuk baris {idx} ---")
+            logger.debug(f"   Generated URL: {detail_urls[idx]}")
+            logger.debug("-----------------------------------------------------------------------\n")
+    return pd.Series(detail_urls, index=df.index), pd.Series(kodewil_urls, index=df.index)
+
+
+# Pool sesi cloudscraper per User-Agent. Sesi (koneksi TCP/TLS, cookie & clearance Cloudflare)
+# dipakai ulang antar baris; sesi yang kena 403 dibuang dan diganti sesi baru.
+class ScraperSessionPool:
+    def __init__(self, user_agents):
+        self._idle_sessions = {ua: [] for ua in user_agents}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def acquire(self, user_agent):
+        with self._lock:
+            idle = self._idle_sessions.setdefault(user_agent, [])
+            if idle:
+                self.hits += 1
+                return idle.pop()
+            self.misses += 1
+        return cloudscraper.create_scraper(browser={'custom': user_agent})
+
+    def release(self, user_agent, scraper):
+        with self._lock:
+            self._idle_sessions.setdefault(user_agent, []).append(scraper)
+
+    def refresh(self, user_agent, scraper):
+        # Clearance sesi ini sudah tidak berlaku: tutup, sesi baru dibuat saat acquire berikutnya
+        with self._lock:
+            self.refreshes += 1
+        try:
+            scraper.close()
+        except Exception:
+            pass
+
+    def close_all(self):
+        with self._lock:
+            sessions = [s for idle in self._idle_sessions.values() for s in idle]
+            for idle in self._idle_sessions.values(): idle.clear()
+        for scraper in sessions:
+            try:
+                scraper.close()
+            except Exception:
+                pass
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            hit_rate = (self.hits / total * 100) if total else 0.0
+            return f"hit: {self.hits}, miss: {self.misses}, refresh (403): {self.refreshes}, hit rate: {hit_rate:.1f}%"
+
+
+def create_rate_controller():
+    return AdaptiveRateController(
+        initial_delay=RATE_INITIAL_DELAY, min_delay=RATE_MIN_DELAY, max_delay=RATE_MAX_DELAY,
+        breaker_window=BREAKER_WINDOW, breaker_threshold=BREAKER_THRESHOLD,
+        breaker_cooldown=BREAKER_COOLDOWN_SECONDS, state_file=BREAKER_STATE_FILE)
+
+
+scraper_pool = ScraperSessionPool(USER_AGENTS)
+rate_controller = create_rate_controller()  # Dibuat ulang oleh configure() (path state breaker & jeda bisa berubah)
+
+
+def record_rate_outcome(url, outcome, retry_after=None):
+    if rate_controller.record(url, outcome, retry_after=retry_after):
+        logger.warning(
+            f"{SYM_WARNING} --- PERINGATAN (ID: {MY_PROCESS_ID}): Terlalu banyak blokir dari nomor.net, semua request dihentikan {BREAKER_COOLDOWN_SECONDS} dtk ---")
+
+
+def parse_retry_after(response):
+    value = response.headers.get("Retry-After") if response.headers else None
+    return float(value) if value and value.strip().isdigit() else None
+
+
+# Satu percobaan request ke nomor.net (jeda dari rate controller, sesi dari pool). HTTPError dilempar ke pemanggil.
+# Mengembalikan None jika cancel_event di-set selama menunggu giliran (lookup yang kalah di hedged lookup); slot
+# rate controller-nya dikembalikan. dispatched_event di-set begitu request keluar dari antrian rate controller.
+def fetch_nomor_once(url, url_type, current_village_name, attempt, cancel_event=None, dispatched_event=None):
+    import requests
+    load_cloudscraper()
+    t_start = time.perf_counter()
+    waited = rate_controller.acquire(url, cancel_event=cancel_event)
+    t_slept = time.perf_counter()
+    sleep_s = t_slept - t_start
+    metrics.observe("sleep", sleep_s, url_type=url_type)
+    if waited is None or (cancel_event is not None and cancel_event.is_set()):
+        metrics.incr("requests", url_type=url_type, status="cancelled")
+        return None
+    if dispatched_event is not None: dispatched_event.set()
+    chosen_ua = random.choice(USER_AGENTS);
+    scraper = scraper_pool.acquire(chosen_ua)
+    t_session = time.perf_counter()
+    session_s = t_session - t_slept
+    metrics.observe("session", session_s, url_type=url_type)
+    session_blocked = False
+    status = "error"
+    if ENABLE_DETAILED_DEBUG:
+        logger.debug(
+            f"\n{SYM_INFO} --- DEBUG: scrape_nomor ({url_type}, UA: {chosen_ua}, Percobaan {attempt + 1}) ---")
+        logger.debug(f"Mencoba scrape dari URL: {url} untuk Desa: {current_village_name}")
+    try:
+        try:
+            response = scraper.get(url, timeout=30)
+        except requests.exceptions.Timeout:
+            status = "timeout"
+            record_rate_outcome(url, OUTCOME_TIMEOUT);
+            raise
+        except Exception as e:
+            # Exception dari cloudscraper sendiri = gagal lolos challenge Cloudflare, dianggap blokir
+            is_challenge_error = type(e).__module__.startswith("cloudscraper")
+            session_blocked = is_challenge_error
+            status = "challenge" if is_challenge_error else "error"
+            record_rate_outcome(url, OUTCOME_BLOCKED if is_challenge_error else OUTCOME_ERROR);
+            raise
+        status = response.status_code
+        if ENABLE_DETAILED_DEBUG: logger.debug(
+            f"{SYM_INFO} DEBUG (scrape_nomor {url_type} - cloudscraper): Status Code: {response.status_code} untuk {url}")
+        record_rate_outcome(url, outcome_from_status(response.status_code), retry_after=parse_retry_after(response))
+        session_blocked = response.status_code == 403
+        if nomor_cache: nomor_cache.put_response(url, response.status_code, response.text)
+        response.raise_for_status()
+        return response
+    finally:
+        network_s = time.perf_counter() - t_session
+        metrics.observe("network", network_s, url_type=url_type)
+        metrics.incr("requests", url_type=url_type, status=status)
+        metrics.trace("request", url_type=url_type, status=status, attempt=attempt + 1, sleep_s=round(sleep_s, 4),
+                      session_s=round(session_s, 4), network_s=round(network_s, 4), url=url)
+        if session_blocked:
+            scraper_pool.refresh(chosen_ua, scraper)
+        else:
+            scraper_pool.release(chosen_ua, scraper)
 
 
 # Fungsi buat scraping kode pos dari nomor.net (MENGGUNAKAN cloudscraper dengan retry)
-def scrape_nomor(url, url_type="detail", is_debug_target=False, current_village_name=""):
+# Mengembalikan (kode pos atau pesan gagal, status dari lookup_status.py). (None, None) = dibatalkan (hedged lookup).
+# Setiap status gagal punya jatah percobaan sendiri (RETRY_BUDGETS); 404 & halaman tanpa kode pos di-cache negatif.
+def scrape_nomor(url, url_type="detail", is_debug_target=False, current_village_name="", cancel_event=None,
+                 dispatched_event=None):
+    import requests
     if not url or not isinstance(url, str) or not url.startswith("http") or "URL tidak dapat dibuat" in url:
-        if ENABLE_DETAILED_DEBUG: print(
+        if ENABLE_DETAILED_DEBUG: logger.debug(
             f"{SYM_WARNING} DEBUG (scrape_nomor {url_type}): URL tidak valid, skipping: {url}")
-        return None
-    if not CLOUDSCAPER_AVAILABLE:
-        if ENABLE_DETAILED_DEBUG: print(
+        return None, STATUS_INVALID_INPUT
+    if nomor_cache:
+        cached_code = nomor_cache.get_by_url(url)
+        if cached_code:
+            if ENABLE_DETAILED_DEBUG: logger.debug(
+                f"{SYM_SUCCESS} DEBUG (scrape_nomor {url_type}): Cache hit (URL) u/ {current_village_name}: {cached_code}")
+            return cached_code, STATUS_SUCCESS
+        negative = nomor_cache.get_negative(url) if ENABLE_NEGATIVE_CACHE else None
+        if negative:
+            metrics.incr("negative_cache_hits", url_type=url_type, status=negative[0])
+            if ENABLE_DETAILED_DEBUG: logger.debug(
+                f"{SYM_WARNING} DEBUG (scrape_nomor {url_type}): Cache negatif ({negative[0]}) u/ {current_village_name}")
+            return negative[1] or negative[0], negative[0]
+    if not load_cloudscraper():
+        if ENABLE_DETAILED_DEBUG: logger.debug(
             f"{SYM_ERROR} DEBUG (scrape_nomor {url_type}): cloudscraper tidak tersedia untuk URL: {url}")
-        return "Error: cloudscraper N/A"
+        return "Error: cloudscraper N/A", STATUS_ERROR
 
     last_error_message = f"Gagal setelah beberapa percobaan ({url_type} - nomor.net)"
-    for attempt in range(MAX_RETRIES_NOMOR_NET):
-        chosen_ua = random.choice(USER_AGENTS);
-        scraper = cloudscraper.create_scraper(browser={'custom': chosen_ua})
-        time.sleep(random.uniform(1.5, 4.0))
-        if ENABLE_DETAILED_DEBUG:
-            print(
-                f"\n{SYM_INFO} --- DEBUG: scrape_nomor ({url_type}, UA: {chosen_ua}, Percobaan {attempt + 1}/{MAX_RETRIES_NOMOR_NET}) ---")
-            print(f"Mencoba scrape dari URL: {url} untuk Desa: {current_village_name}")
+    last_status = STATUS_ERROR
+    attempts_by_status = {}
+    for attempt in range(max(RETRY_BUDGETS.values())):
+        if cancel_event is not None and cancel_event.is_set(): return None, None
         try:
-            response = scraper.get(url, timeout=30)
-            if ENABLE_DETAILED_DEBUG: print(
-                f"{SYM_INFO} DEBUG (scrape_nomor {url_type} - cloudscraper): Status Code: {response.status_code} untuk {url}")
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            # Blok penyimpanan HTML dihapus
-            # if ENABLE_DETAILED_DEBUG:
-            #     try:
-            #         ... (kode simpan HTML) ...
-            #     except Exception as e_html:
-            #         ...
-
-            response.raise_for_status()
-            code_found_this_attempt = None;
-            postal_code_tag = soup.find("a", class_="ktw")
-            if postal_code_tag and postal_code_tag.string:
-                code = postal_code_tag.string.strip()
-                if ENABLE_DETAILED_DEBUG: print(
-                    f"{SYM_INFO} DEBUG (scrape_nomor {url_type} - cloudscraper): Tag <a class='ktw'>: '{code}'")
-                if code.isdigit() and len(code) == 5:
-                    code_found_this_attempt = code
-                elif ENABLE_DETAILED_DEBUG:
-                    print(
-                        f"{SYM_WARNING} DEBUG (scrape_nomor {url_type} - cloudscraper): Kode dari ktw tdk valid: '{code}'")
-            if not code_found_this_attempt:
-                if ENABLE_DETAILED_DEBUG: print(
-                    f"{SYM_INFO} DEBUG (scrape_nomor {url_type} - cloudscraper): Tag <a class='ktw'> tdk ada/valid. Fallback teks 5 digit...")
-                all_text_nodes = soup.find_all(string=True)
-                for text_node in all_text_nodes:
-                    stripped_text = str(text_node).strip()
-                    if stripped_text.isdigit() and len(stripped_text) == 5:
-                        is_valid_context_fallback = True
-                        if url_type == "detail":
-                            parent_context_fallback = text_node.parent.get_text(separator=" ",
-                                                                                strip=True).lower() if text_node.parent else ""
-                            village_name_lower_fallback = current_village_name.lower()
-                            if not (
-                                    village_name_lower_fallback in parent_context_fallback or "kodepos" in parent_context_fallback or "kode pos" in parent_context_fallback):
-                                is_valid_context_fallback = False
-                        if is_valid_context_fallback:
-                            if ENABLE_DETAILED_DEBUG: print(
-                                f"{SYM_SUCCESS} DEBUG (scrape_nomor {url_type} - cloudscraper): Fallback - kode pos teks: {stripped_text}")
-                            code_found_this_attempt = stripped_text;
-                            break
-            if code_found_this_attempt: print(
-                f"{SYM_SUCCESS} Sukses ({url_type}): {current_village_name} -> {code_found_this_attempt}"); return code_found_this_attempt
+            response = fetch_nomor_once(url, url_type, current_village_name, attempt, cancel_event=cancel_event,
+                                        dispatched_event=dispatched_event)
+            if response is None:
+                if ENABLE_DETAILED_DEBUG: logger.debug(
+                    f"{SYM_INFO} DEBUG (scrape_nomor {url_type}): Dibatalkan (URL lain sudah memberi hasil) u/ {current_village_name}")
+                return None, None
+            t_parse = time.perf_counter()
+            code_found_this_attempt, extract_method = extract_postal_code(
+                response.text, url_type=url_type, village_name=current_village_name, backend=EXTRACTOR_BACKEND)
+            parse_s = time.perf_counter() - t_parse
+            # Tanpa <a class="ktw"> yang jelas, waktu parse didominasi scan fallback (parser HTML penuh)
+            metrics.observe("parse" if extract_method == "ktw" else "fallback_scan", parse_s, url_type=url_type)
+            metrics.incr("extract", url_type=url_type, method=extract_method or "none")
+            metrics.trace("parse", url_type=url_type, method=extract_method, parse_s=round(parse_s, 4))
+            if ENABLE_DETAILED_DEBUG:
+                if extract_method == "ktw":
+                    logger.debug(
+                        f"{SYM_INFO} DEBUG (scrape_nomor {url_type} - {EXTRACTOR_BACKEND}): Tag <a class='ktw'>: '{code_found_this_attempt}'")
+                elif extract_method == "fallback":
+                    logger.debug(
+                        f"{SYM_SUCCESS} DEBUG (scrape_nomor {url_type} - {EXTRACTOR_BACKEND}): Tag <a class='ktw'> tdk ada/valid. Fallback - kode pos teks: {code_found_this_attempt}")
+            if code_found_this_attempt:
+                if nomor_cache: nomor_cache.put_postal_code(code_found_this_attempt, url=url)
+                logger.info(f"{SYM_SUCCESS} Sukses ({url_type}): {current_village_name} -> {code_found_this_attempt}");
+                return code_found_this_attempt, STATUS_SUCCESS
             last_error_message = f"Tidak ditemukan kode pos ({url_type} - setelah parse)"
-            if ENABLE_DETAILED_DEBUG: print(
-                f"{SYM_WARNING} DEBUG (scrape_nomor {url_type}, Att {attempt + 1}): {last_error_message} u/ {current_village_name}")
+            last_status = STATUS_PARSE_MISS
         except requests.exceptions.HTTPError as http_err:
+            last_status = status_from_http(http_err.response.status_code)
             last_error_message = f"Error HTTP ({http_err.response.status_code}) ({url_type})"
             if http_err.response.status_code == 403:
                 last_error_message = f"Error 403 (Cloudflare block) ({url_type})"
             elif http_err.response.status_code == 404:
-                if ENABLE_DETAILED_DEBUG: print(
-                    f"{SYM_ERROR} DEBUG (scrape_nomor {url_type} - cloudscraper): HTTPError 404 untuk {url}. Tidak coba lagi.")
-                return f"Halaman tidak ditemukan (404) ({url_type})"
-            if ENABLE_DETAILED_DEBUG: print(
-                f"{SYM_ERROR} DEBUG (scrape_nomor {url_type}, Att {attempt + 1}): HTTPError: {http_err} u/ {current_village_name}")
+                last_error_message = f"Halaman tidak ditemukan (404) ({url_type})"
+        except requests.exceptions.Timeout:
+            last_status, last_error_message = STATUS_TIMEOUT, f"Error timeout ({url_type})"
         except Exception as e:
-            last_error_message = f"Error Lainnya (cloudscraper) ({url_type})"
-            if ENABLE_DETAILED_DEBUG: print(
-                f"{SYM_ERROR} DEBUG (scrape_nomor {url_type}, Att {attempt + 1}): Exception: {e} u/ {current_village_name}")
-        if attempt < MAX_RETRIES_NOMOR_NET - 1:
-            current_retry_delay = random.uniform(RETRY_DELAY_NOMOR_NET_MIN, RETRY_DELAY_NOMOR_NET_MAX)
-            if ENABLE_DETAILED_DEBUG: print(
-                f"{SYM_WARNING} DEBUG (scrape_nomor {url_type}): Att {attempt + 1} gagal ({last_error_message}). Jeda {current_retry_delay:.2f} dtk...")
-            time.sleep(current_retry_delay)
-        else:
-            print(f"{SYM_ERROR} Gagal ({url_type}): {current_village_name} - {last_error_message}")
-            return last_error_message
-    return last_error_message
+            # Exception dari cloudscraper sendiri = gagal lolos challenge Cloudflare
+            if type(e).__module__.startswith("cloudscraper"):
+                last_status, last_error_message = STATUS_BLOCKED, f"Error challenge Cloudflare ({url_type})"
+            else:
+                last_status, last_error_message = STATUS_ERROR, f"Error Lainnya (cloudscraper) ({url_type})"
+        if ENABLE_DETAILED_DEBUG: logger.debug(
+            f"{SYM_ERROR} DEBUG (scrape_nomor {url_type}, Att {attempt + 1}): {last_status}: {last_error_message} u/ {current_village_name}")
+        attempts_by_status[last_status] = attempts_by_status.get(last_status, 0) + 1
+        if attempts_by_status[last_status] >= RETRY_BUDGETS.get(last_status, 1): break
+        # Tidak ada jeda tetap: percobaan berikutnya menunggu giliran di rate controller
+        if ENABLE_DETAILED_DEBUG: logger.debug(
+            f"{SYM_WARNING} DEBUG (scrape_nomor {url_type}): Att {attempt + 1} gagal ({last_error_message}). Jeda berikutnya ~{rate_controller.current_delay(url):.2f} dtk...")
+    metrics.incr("url_failures", url_type=url_type, status=last_status)
+    if nomor_cache and last_status in NEGATIVE_CACHE_STATUSES:
+        nomor_cache.put_negative(url, last_status, last_error_message)
+    logger.warning(f"{SYM_ERROR} Gagal ({url_type}): {current_village_name} - {last_error_message}")
+    return last_error_message, last_status
+
+
+def normalize_name(value):
+    return " ".join(str(value).lower().split())
+
+
+# URL daftar semua desa dalam satu kecamatan (URL detail tanpa filter `jobs`)
+def generate_district_listing_url(dist_original, reg_original):
+    daerah_encoded = quote(build_daerah_string(dist_original, reg_original))
+    return f"{NOMOR_NET_BASE_URL}/_kodepos.php?_i=desa-kodepos&sby=010000&daerah={daerah_encoded}&perhal=0"
+
+
+# Parse tabel daftar desa: {nama desa ternormalisasi: kode pos} dan {"kw:<kode wilayah>": kode pos}.
+# Hanya baris tabel yang menyebut kecamatan yang dicari yang dipakai; nama desa dengan >1 kode pos dibuang.
+def parse_district_listing(html, district_name):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    district_norm = normalize_name(district_name)
+    listing = {}
+    ambiguous = set()
+    for tr in soup.find_all("tr"):
+        cells = [normalize_name(td.get_text(" ", strip=True)) for td in tr.find_all(["td", "th"], recursive=False)]
+        if not any(c == district_norm or c.startswith(district_norm + " (") for c in cells): continue
+        codes = [c for c in cells if c.isdigit() and len(c) == 5]
+        if len(codes) != 1: continue
+        for cell in cells:
+            if not cell or cell == codes[0] or cell.isdigit(): continue
+            key = f"kw:{cell}" if re.fullmatch(r"\d{2}\.\d{2}\.\d{2}\.\d{4}", cell) else cell
+            if listing.get(key, codes[0]) != codes[0]: ambiguous.add(key)
+            listing[key] = codes[0]
+    for key in ambiguous: listing.pop(key, None)
+    return listing
+
+
+def fetch_district_listing(url, label):
+    import requests
+    for attempt in range(MAX_RETRIES_NOMOR_NET):
+        try:
+            return fetch_nomor_once(url, "kecamatan", label, attempt).text
+        except requests.exceptions.HTTPError as http_err:
+            if ENABLE_DETAILED_DEBUG: logger.debug(
+                f"{SYM_ERROR} DEBUG (daftar kecamatan, Att {attempt + 1}): HTTPError: {http_err} u/ {label}")
+            if http_err.response.status_code == 404: return None
+        except Exception as e:
+            if ENABLE_DETAILED_DEBUG: logger.debug(
+                f"{SYM_ERROR} DEBUG (daftar kecamatan, Att {attempt + 1}): Exception: {e} u/ {label}")
+    return None
+
+
+# Kelompokkan baris per (Kecamatan, Kabupaten). Baris yang sudah ada di cache tidak perlu halaman daftar.
+def plan_district_groups(row_indices, rows):
+    groups = {}
+    for i in row_indices:
+        row = rows[i]
+        if is_missing(row.get(COL_KECAMATAN)) or is_missing(row.get(COL_KABUPATEN)): continue
+        dist = str(row.get(COL_KECAMATAN)).strip();
+        reg = str(row.get(COL_KABUPATEN)).strip()
+        if not dist or not reg: continue
+        if nomor_cache and nomor_cache.get_by_kode_wilayah(format_id_desa_to_kode_wilayah(row.get(COL_ID_DESA))):
+            continue
+        groups.setdefault((dist.lower(), reg.lower()), (dist, reg, []))[2].append(i)
+    return [group for group in groups.values() if len(group[2]) >= DISTRICT_PLANNER_MIN_ROWS]
+
+
+# Ambil halaman daftar satu kecamatan sekali, lalu bagikan kode posnya ke semua baris yang cocok
+def resolve_district_group(dist, reg, row_indices, rows):
+    html = fetch_district_listing(generate_district_listing_url(dist, reg), f"Kec. {dist}, {reg}")
+    if not html: return {}
+    t_parse = time.perf_counter()
+    listing = parse_district_listing(html, dist)
+    metrics.observe("parse", time.perf_counter() - t_parse, url_type="kecamatan")
+    resolved = {}
+    for i in row_indices:
+        kode_wilayah_row = format_id_desa_to_kode_wilayah(rows[i].get(COL_ID_DESA))
+        code = listing.get(f"kw:{kode_wilayah_row}") if kode_wilayah_row else None
+        if not code and not is_missing(rows[i].get(COL_NAMA_DESA)):
+            code = listing.get(normalize_name(rows[i].get(COL_NAMA_DESA)))
+        if code:
+            resolved[i] = code
+            if nomor_cache and kode_wilayah_row: nomor_cache.put_postal_code(code, kode_wilayah=kode_wilayah_row)
+    if ENABLE_DETAILED_DEBUG: logger.debug(
+        f"{SYM_INFO} DEBUG (daftar kecamatan): Kec. {dist}, {reg}: {len(resolved)}/{len(row_indices)} baris cocok")
+    return resolved
 
 
 KODE_POS_RESULT_COL = "Kode Pos (Postal Code)"
+PROVENANCE_COL = "Sumber Kode Pos (Provenance)"
+PROVENANCE_NOMOR_NET = "nomor.net"  # Scrape per baris (termasuk cache hit dari scrape sebelumnya)
+PROVENANCE_DISTRICT_LISTING = "nomor.net (daftar kecamatan)"
+STATUS_COL = "Status Kode Pos (Status)"  # Kode dari lookup_status.py: success, not_found, blocked, timeout, ...
+
+
+# Record journal/baris output versi lama belum punya status: tebak dari teks hasilnya
+def status_of_record(record):
+    return record.get("status") or classify_result_text(record.get("result")) or STATUS_ERROR
+
 
+# Indeks dibangun dari hasil yang sudah ada: journal (semua run/worker), cache SQLite, dan (INDEX_FROM_OUTPUTS)
+# file output v15 sebelumnya. Hasil yang berasal dari indeks sendiri tidak dimasukkan lagi (hindari menguatkan
+# tebakan sendiri).
+def add_known_result(index, row, code, provenance=None):
+    if not is_valid_postal_code(code) or str(provenance or "").startswith(INDEX_PROVENANCE_PREFIX): return
+    index.add(code, kode_wilayah=format_id_desa_to_kode_wilayah(row.get(COL_ID_DESA)), village=row.get(COL_NAMA_DESA),
+              district=row.get(COL_KECAMATAN), regency=row.get(COL_KABUPATEN))
 
-def highlight_invalid_rows(row_series):
-    kode_pos_value = str(row_series.get(KODE_POS_RESULT_COL, ""));
-    is_invalid = False
-    if not (kode_pos_value.isdigit() and len(kode_pos_value) == 5): is_invalid = True
-    if is_invalid:
-        return ['background-color: yellow'] * len(row_series)
+
+def load_postal_index():
+    global postal_index
+    postal_index = None
+    if not ENABLE_POSTAL_INDEX: return None
+    start = time.time()
+    index = PostalCodeIndex(min_support=INDEX_MIN_SUPPORT, min_agreement=INDEX_MIN_AGREEMENT,
+                            fuzzy_cutoff=INDEX_FUZZY_CUTOFF)
+    # Record journal membawa ID Desa & nama wilayahnya sendiri (journal_row_fields): langsung masuk indeks, dari
+    # file input mana pun, tanpa dicocokkan dengan nomor baris file input sekarang. Journal versi lama (tanpa
+    # identitas input & nama) dilewati.
+    journal_paths = sorted(set(glob.glob(os.path.join(data_folder_path, "journal_v15_*.jsonl")) +
+                               glob.glob(os.path.join(queue_dir, "journal_v15_*.jsonl"))))
+    records = {}
+    for path in journal_paths:
+        for record in iter_journal(path):
+            key = (record.get("input"), record.get("row"))
+            if key[0] is not None and (key not in records or record.get("ts", 0) >= records[key].get("ts", 0)):
+                records[key] = record
+    for record in records.values():
+        row = {COL_ID_DESA: record.get("id_desa"), COL_NAMA_DESA: record.get("desa"),
+               COL_KECAMATAN: record.get("kecamatan"), COL_KABUPATEN: record.get("kabupaten")}
+        add_known_result(index, row, record.get("result"), record.get("provenance"))
+    # File output sebelumnya hanya jika diminta: setiap run/worker harus mem-parse semuanya (xlsx lambat)
+    output_paths = {}
+    previous_outputs = glob.glob(os.path.join(data_folder_path, "village_postal_code_v15*")) if INDEX_FROM_OUTPUTS else []
+    for path in previous_outputs:
+        stem, ext = os.path.splitext(path)
+        if ext in (".csv", ".parquet", ".xlsx") and (stem not in output_paths or ext != ".xlsx"):
+            output_paths[stem] = path  # File yang sama dalam format csv/parquet lebih cepat dibaca daripada xlsx
+    for path in sorted(output_paths.values()):
+        try:
+            for row in read_previous_output(path):
+                add_known_result(index, row, row.get(KODE_POS_RESULT_COL), row.get(PROVENANCE_COL))
+        except Exception as e:
+            logger.warning(f"{SYM_WARNING} --- PERINGATAN: Output {path} tidak bisa dibaca untuk indeks: {e} ---")
+    if nomor_cache:
+        for key_type, key, code in nomor_cache.iter_postal_codes(): index.add_cache_entry(key_type, key, code)
+    postal_index = index
+    logger.info(f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): Indeks kode pos dibangun dalam {time.time() - start:.1f} dtk "
+                f"({len(journal_paths)} journal, {len(output_paths)} file output, cache): {index.stats()} ---")
+    return index
+
+
+def read_previous_output(path):
+    import pandas as pd
+    columns = [COL_ID_DESA, COL_NAMA_DESA, COL_KECAMATAN, COL_KABUPATEN, KODE_POS_RESULT_COL, PROVENANCE_COL]
+    wanted = lambda col: col in columns
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        df = pd.read_parquet(path, columns=[c for c in pq.read_schema(path).names if wanted(c)])
+    elif path.endswith(".csv"):
+        df = pd.read_csv(path, usecols=wanted, dtype=str, keep_default_na=False)
     else:
-        return [''] * len(row_series)
+        df = pd.read_excel(path, usecols=wanted, dtype={KODE_POS_RESULT_COL: str, COL_ID_DESA: str})
+    return df.to_dict("records")
 
 
-def save_batch_data(df_slice_to_save, batch_number_val):
-    batch_file = os.path.join(batches_dir, f"villages_batch_{batch_number_val}.xlsx")
-    try:
-        styled_df_slice = df_slice_to_save.style.apply(highlight_invalid_rows, axis=1)
-        styled_df_slice.to_excel(batch_file, index=False, engine='openpyxl')
-        print(
-            f"{SYM_SUCCESS} Batch {batch_number_val} (kumulatif u/ chunk {MY_PROCESS_ID}) disimpan & di-style di {batch_file}")
-    except Exception as e:
-        print(f"{SYM_ERROR}--- ERROR (save_batch_data): Gagal simpan/style batch {batch_file}: {e} ---")
+# Isi baris yang kode posnya bisa ditebak yakin dari indeks; mengembalikan baris yang masih perlu di-scrape
+def fill_from_index(row_indices, rows, record_row_result):
+    if postal_index is None: return row_indices
+    remaining = []
+    for i in row_indices:
+        row = rows[i]
+        code, provenance = postal_index.infer(format_id_desa_to_kode_wilayah(row.get(COL_ID_DESA)),
+                                              row.get(COL_NAMA_DESA), row.get(COL_KECAMATAN), row.get(COL_KABUPATEN))
+        if code:
+            record_row_result(i, code, 0.0, provenance)
+        else:
+            remaining.append(i)
+    if len(remaining) < len(row_indices):
+        logger.info(
+            f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): {len(row_indices) - len(remaining)} baris diisi dari indeks kode pos (tanpa request), sisa {len(remaining)} ---")
+    return remaining
+
+
+# Journal checkpoint: satu record JSON per baris yang sudah selesai, ditulis append-only
+def iter_journal(path):
+    if not os.path.exists(path): return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue  # Baris terakhir bisa terpotong kalau proses mati saat menulis
+
+
+def load_journal(path, input_id=None):
+    # input_id: hanya record dari file input tsb (record file lain / journal versi lama tanpa "input" diabaikan)
+    records, skipped = {}, 0
+    for record in iter_journal(path):
+        if input_id is not None and record.get("input") != input_id:
+            skipped += 1
+            continue
+        records[record["row"]] = record
+    if skipped:
+        logger.warning(f"{SYM_WARNING} --- PERINGATAN: {skipped} record di {path} bukan dari file input ini, diabaikan ---")
+    return records
+
+
+def cell_text(value):
+    return None if is_missing(value) else str(value)
+
+
+# Identitas baris di record journal: file input, ID Desa (None jika kosong, tidak pernah "nan") dan nama wilayah.
+# Hasil dari journal hanya dipakai untuk baris yang semuanya sama, jadi baris tanpa ID Desa di file input lain
+# dengan nomor baris yang sama tidak ikut terisi.
+def journal_row_fields(row):
+    return {"input": INPUT_ID, "id_desa": cell_text(row.get(COL_ID_DESA)), "desa": cell_text(row.get(COL_NAMA_DESA)),
+            "kecamatan": cell_text(row.get(COL_KECAMATAN)), "kabupaten": cell_text(row.get(COL_KABUPATEN))}
+
+
+def journal_record_matches(record, row):
+    if record is None or INPUT_ID is None: return False
+    return all(record.get(key) == value for key, value in journal_row_fields(row).items())
+
+
+class CheckpointJournal:
+    def __init__(self, path, fsync_every):
+        needs_newline = False
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        self._file = open(path, "a", encoding="utf-8")
+        if needs_newline: self._file.write("\n")  # Tutup baris terpotong dari run sebelumnya
+        self._fsync_every = max(1, fsync_every)
+        self._pending = 0
+
+    def append(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._pending += 1
+        if self._pending >= self._fsync_every:
+            os.fsync(self._file.fileno());
+            self._pending = 0
+
+    def close(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
 
 
 # --- BAGIAN UTAMA SKRIP ---
 URL_NOMOR_COL_DETAIL = "URL nomor.net (Detail)"
 URL_NOMOR_COL_KODEWIL = "URL nomor.net (KodeWil)"
+batch_size_val = int(BATCH_SIZE) if str(BATCH_SIZE).isdigit() else 20;
 
-df[URL_NOMOR_COL_DETAIL] = df.apply(generate_nomor_url_detailed, axis=1)
-df[URL_NOMOR_COL_KODEWIL] = df.apply(generate_nomor_url_by_kode_wilayah, axis=1)
-if KODE_POS_RESULT_COL not in df.columns:
-    df[KODE_POS_RESULT_COL] = ""
-else:
-    df[KODE_POS_RESULT_COL] = ""
 
-print(f"\n{SYM_INFO} Contoh URL nomor.net (Detail - 5 pertama dari chunk {MY_PROCESS_ID}):");
-print(df[URL_NOMOR_COL_DETAIL].head().tolist());
-print(f"\n{SYM_INFO} Contoh URL nomor.net (KodeWil - 5 pertama dari chunk {MY_PROCESS_ID}):");
-print(df[URL_NOMOR_COL_KODEWIL].head().tolist());
-print("-" * 30)
-batch_size_val = int(BATCH_SIZE) if str(BATCH_SIZE).isdigit() else 20;
-batch_number = 1
-print(
-    f"\n{SYM_INFO} Memulai scraping (ID: {MY_PROCESS_ID}, Jatah: {MY_START_ROW_ABSOLUTE} s.d. {MY_END_ROW_EXCLUSIVE_ABSOLUTE - 1})...")
+def is_valid_postal_code(value):
+    return bool(value) and isinstance(value, str) and value.isdigit() and len(value) == 5
+
+
+hedge_executor = None
+_hedge_executor_lock = threading.Lock()
 
-for i in tqdm(range(len(df)), desc=f"Scraping Progress (ID: {MY_PROCESS_ID})"):
-    url_detail_current = df.at[i, URL_NOMOR_COL_DETAIL]
-    url_kodewil_current = df.at[i, URL_NOMOR_COL_KODEWIL]
-    current_village_name_for_debug = str(df.at[i, COL_NAMA_DESA]) if COL_NAMA_DESA in df.columns else f"baris_index_{i}"
 
-    final_result_this_row = None;
+def get_hedge_executor():
+    # Pool terpisah dari pool baris: tugas hedge dibuat dari dalam thread baris, memakai pool yang sama bisa deadlock
+    global hedge_executor
+    with _hedge_executor_lock:
+        if hedge_executor is None:
+            hedge_executor = ThreadPoolExecutor(max_workers=2 * max(1, int(MAX_CONCURRENT_REQUESTS)),
+                                                thread_name_prefix="hedge")
+        return hedge_executor
+
+
+# URL kodewil dikirim dulu; jika belum memberi kode pos valid dalam HEDGE_DELAY_SECONDS (atau sudah gagal),
+# URL detail dikirim paralel. Hasil valid pertama menang dan lookup yang kalah dibatalkan (hasilnya (None, None)).
+# HEDGE_DELAY_SECONDS dihitung sejak request kodewil keluar dari antrian rate controller: waktu antri bukan tanda
+# server lambat, dan hedge yang dikirim saat antrian penuh hanya memperpanjang antrian untuk baris lain.
+# Mengembalikan (hasil kodewil, hasil detail), masing-masing (nilai, status) seperti scrape_nomor.
+def hedged_lookup(url_kodewil, url_detail, current_village_name, is_debug_target=False):
+    executor = get_hedge_executor()
+    cancel_events = {"kodewil": threading.Event(), "detail": threading.Event()}
+    kodewil_sent = threading.Event()
+    kodewil_future = executor.submit(scrape_nomor, url_kodewil, "kodewil", is_debug_target, current_village_name,
+                                     cancel_events["kodewil"], kodewil_sent)
+    kodewil_future.add_done_callback(lambda _: kodewil_sent.set())  # Cache hit / URL tidak valid: tanpa request
+    kodewil_sent.wait()
+    done, _ = wait([kodewil_future], timeout=max(0.0, HEDGE_DELAY_SECONDS))
+    if done and kodewil_future.result()[1] == STATUS_SUCCESS:
+        return kodewil_future.result(), (None, None)
+    if ENABLE_DETAILED_DEBUG: logger.debug(
+        f"{SYM_INFO} DEBUG (hedged lookup): URL KodeWil {'gagal' if done else 'belum selesai'} u/ {current_village_name}, URL Detail dikirim")
+    futures = {kodewil_future: "kodewil",
+               executor.submit(scrape_nomor, url_detail, "detail", is_debug_target, current_village_name,
+                               cancel_events["detail"]): "detail"}
+    results = {"kodewil": (None, None), "detail": (None, None)}
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in sorted(done, key=lambda f: futures[f] != "kodewil"):  # Kodewil menang jika selesai bersamaan
+            results[futures[future]] = future.result()
+            if results[futures[future]][1] == STATUS_SUCCESS:
+                for loser in pending: cancel_events[futures[loser]].set()
+                return results["kodewil"], results["detail"]
+    return results["kodewil"], results["detail"]
+
+
+def process_row(i, row, start_row=MY_START_ROW_ABSOLUTE):
+    # Dijalankan di thread pool: hanya membaca dari `row` (dict), tidak menulis ke df
+    url_detail_current = row.get(URL_NOMOR_COL_DETAIL)
+    url_kodewil_current = row.get(URL_NOMOR_COL_KODEWIL)
+    current_village_name_for_debug = str(row.get(COL_NAMA_DESA)) if COL_NAMA_DESA in row else f"baris_index_{i}"
+
+    final_result_this_row, final_status = None, None
     is_current_row_debug_target = False
     if ENABLE_DETAILED_DEBUG:
-        try:
-            vil_check = str(df.at[i, COL_NAMA_DESA]).lower().strip() if COL_NAMA_DESA in df.columns and pd.notna(
-                df.at[i, COL_NAMA_DESA]) else ""
-            dist_check = str(df.at[i, COL_KECAMATAN]).lower().strip() if COL_KECAMATAN in df.columns and pd.notna(
-                df.at[i, COL_KECAMATAN]) else ""
-            is_current_row_debug_target = (DEBUG_TARGET_VILLAGE and DEBUG_TARGET_VILLAGE.lower() in vil_check) and \
-                                          (not DEBUG_TARGET_DISTRICT or (
-                                                      DEBUG_TARGET_DISTRICT and DEBUG_TARGET_DISTRICT.lower() in dist_check))
-        except KeyError:
-            is_current_row_debug_target = False
+        vil_check = str(row.get(COL_NAMA_DESA)).lower().strip() if not is_missing(row.get(COL_NAMA_DESA)) else ""
+        dist_check = str(row.get(COL_KECAMATAN)).lower().strip() if not is_missing(row.get(COL_KECAMATAN)) else ""
+        is_current_row_debug_target = (DEBUG_TARGET_VILLAGE and DEBUG_TARGET_VILLAGE.lower() in vil_check) and \
+                                      (not DEBUG_TARGET_DISTRICT or (
+                                              DEBUG_TARGET_DISTRICT and DEBUG_TARGET_DISTRICT.lower() in dist_check))
 
     if is_current_row_debug_target and ENABLE_DETAILED_DEBUG:
-        original_idx_debug = MY_START_ROW_ABSOLUTE + i
-        print(
+        original_idx_debug = start_row + i
+        logger.debug(
             f"\n{SYM_INFO} --- PROCESSING DEBUG TARGET ROW (ID: {MY_PROCESS_ID}, Indeks Asli: {original_idx_debug + 1}, Slice: {i}) ---")
-        print(f"Desa: {current_village_name_for_debug}");
-        print(f"URL Detail: {url_detail_current}");
-        print(f"URL KodeWil: {url_kodewil_current}")
+        logger.debug(f"Desa: {current_village_name_for_debug}");
+        logger.debug(f"URL Detail: {url_detail_current}");
+        logger.debug(f"URL KodeWil: {url_kodewil_current}")
+
+    id_desa_present_for_row = not is_missing(row.get(COL_ID_DESA)) and str(row.get(COL_ID_DESA)).strip() != ""
+    kode_wilayah_row = format_id_desa_to_kode_wilayah(row.get(COL_ID_DESA))
 
-    id_desa_present_for_row = pd.notna(df.at[i, COL_ID_DESA]) and str(df.at[i, COL_ID_DESA]).strip() != ""
+    if nomor_cache and kode_wilayah_row:
+        cached_code = nomor_cache.get_by_kode_wilayah(kode_wilayah_row)
+        if cached_code:
+            if ENABLE_DETAILED_DEBUG: logger.debug(
+                f"{SYM_SUCCESS} DEBUG (baris {i}, Desa: {current_village_name_for_debug}): Cache hit (kode wilayah {kode_wilayah_row}): {cached_code}")
+            return cached_code, STATUS_SUCCESS
 
-    if id_desa_present_for_row and url_kodewil_current and "URL tidak dapat dibuat" not in url_kodewil_current:
-        if ENABLE_DETAILED_DEBUG: print(
+    kodewil_usable = id_desa_present_for_row and url_kodewil_current and "URL tidak dapat dibuat" not in url_kodewil_current
+    kodewil_res, detail_res, detail_done = (None, None), (None, None), False
+    if kodewil_usable:
+        if ENABLE_DETAILED_DEBUG: logger.debug(
             f"{SYM_INFO} DEBUG (baris {i}, Desa: {current_village_name_for_debug}): Mencoba URL Kode Wilayah dulu: {url_kodewil_current}")
-        kodewil_res = scrape_nomor(url_kodewil_current, is_debug_target=is_current_row_debug_target,
-                                   current_village_name=current_village_name_for_debug, url_type="kodewil")
-        if kodewil_res and isinstance(kodewil_res, str) and kodewil_res.isdigit() and len(kodewil_res) == 5:
-            final_result_this_row = kodewil_res
+        if ENABLE_HEDGED_LOOKUP and isinstance(url_detail_current, str) and url_detail_current.startswith("http"):
+            kodewil_res, detail_res = hedged_lookup(url_kodewil_current, url_detail_current,
+                                                    current_village_name_for_debug, is_current_row_debug_target)
+            detail_done = kodewil_res[1] != STATUS_SUCCESS  # URL detail sudah dicoba (atau sudah menang)
         else:
-            final_result_this_row = kodewil_res
-            if ENABLE_DETAILED_DEBUG: print(
-                f"{SYM_WARNING} DEBUG (baris {i}, Desa: {current_village_name_for_debug}): Hasil URL KodeWil: {kodewil_res}. Akan mencoba URL Detail...")
-
-    if not (final_result_this_row and isinstance(final_result_this_row,
-                                                 str) and final_result_this_row.isdigit() and len(
-            final_result_this_row) == 5):
-        error_from_kodewil = final_result_this_row
-        if ENABLE_DETAILED_DEBUG and not (
-                id_desa_present_for_row and url_kodewil_current and "URL tidak dapat dibuat" not in url_kodewil_current):
-            print(
+            kodewil_res = scrape_nomor(url_kodewil_current, is_debug_target=is_current_row_debug_target,
+                                       current_village_name=current_village_name_for_debug, url_type="kodewil")
+        final_result_this_row, final_status = kodewil_res
+        if final_status != STATUS_SUCCESS and ENABLE_DETAILED_DEBUG: logger.debug(
+            f"{SYM_WARNING} DEBUG (baris {i}, Desa: {current_village_name_for_debug}): Hasil URL KodeWil: {final_result_this_row} ({final_status}). Akan mencoba URL Detail...")
+
+    if final_status != STATUS_SUCCESS:
+        if ENABLE_DETAILED_DEBUG and not kodewil_usable:
+            logger.debug(
                 f"{SYM_INFO} DEBUG (baris {i}, Desa: {current_village_name_for_debug}): URL Kode Wilayah tidak dicoba/tidak valid. Mencoba URL Detail: {url_detail_current}")
-        detail_res = scrape_nomor(url_detail_current, is_debug_target=is_current_row_debug_target,
-                                  current_village_name=current_village_name_for_debug, url_type="detail")
-        if detail_res and isinstance(detail_res, str) and detail_res.isdigit() and len(detail_res) == 5:
-            final_result_this_row = detail_res
-        elif detail_res:
-            final_result_this_row = detail_res
-        elif error_from_kodewil:
-            final_result_this_row = error_from_kodewil
-        else:
-            final_result_this_row = "Invalid Data (kedua URL nomor.net gagal)"
-    df.loc[i, KODE_POS_RESULT_COL] = final_result_this_row
+        if not detail_done:
+            detail_res = scrape_nomor(url_detail_current, is_debug_target=is_current_row_debug_target,
+                                      current_village_name=current_village_name_for_debug, url_type="detail")
+        # Status baris: yang masih bisa berhasil jika diulang menang (mis. kodewil diblokir, detail 404 -> blocked)
+        final_status = combine_statuses(kodewil_res[1], detail_res[1])
+        messages = [value for value, status in (detail_res, kodewil_res) if value and status == final_status]
+        final_result_this_row = messages[0] if messages else "Invalid Data (kedua URL nomor.net gagal)"
 
     if is_current_row_debug_target and ENABLE_DETAILED_DEBUG:
-        if final_result_this_row and isinstance(final_result_this_row, str) and final_result_this_row.isdigit() and len(
-                final_result_this_row) == 5:
-            print(f"{SYM_SUCCESS} Hasil Kode Pos u/ Target Debug (Slice {i}): {df.loc[i, KODE_POS_RESULT_COL]}");
-            print(f"--- END DEBUG TARGET ROW ---\n")
+        if is_valid_postal_code(final_result_this_row):
+            logger.debug(f"{SYM_SUCCESS} Hasil Kode Pos u/ Target Debug (Slice {i}): {final_result_this_row}");
+            logger.debug("--- END DEBUG TARGET ROW ---\n")
         else:
-            print(f"{SYM_ERROR} Hasil Kode Pos u/ Target Debug (Slice {i}): {df.loc[i, KODE_POS_RESULT_COL]}");
-            print(f"--- END DEBUG TARGET ROW ---\n")
-
-    if (i + 1) % batch_size_val == 0 or ((i + 1) == len(df) and len(df) > 0):
-        start_idx_cumulative_slice = 0;
-        end_idx_cumulative_slice = i + 1
-        df_cumulative_slice_to_save = df.iloc[start_idx_cumulative_slice:end_idx_cumulative_slice].copy()
-        if not df_cumulative_slice_to_save.empty: save_batch_data(df_cumulative_slice_to_save, batch_number)
-        batch_number += 1
-print(f"\n{SYM_INFO} Menyimpan hasil ID: {MY_PROCESS_ID} ({len(df)} baris) ke {output_file}...")
-try:
-    styled_df = df.style.apply(highlight_invalid_rows, axis=1);
-    styled_df.to_excel(output_file, index=False, engine='openpyxl')
-    print(f"{SYM_SUCCESS} Selesai! Hasil ID: {MY_PROCESS_ID} disimpan di {output_file}");
-    print(f"{SYM_INFO} PERHATIAN: File ini hanya berisi data untuk jatah ID: {MY_PROCESS_ID}.");
-    print(f"{SYM_INFO} Gabungkan dengan hasil chunk lain jika sudah semua.")
-except Exception as e:
-    print(f"{SYM_ERROR} Error simpan file Excel final ID: {MY_PROCESS_ID}: {e}");
-    print(f"{SYM_WARNING} Mencoba simpan sbg CSV biasa...")
+            logger.debug(f"{SYM_ERROR} Hasil Kode Pos u/ Target Debug (Slice {i}): {final_result_this_row}");
+            logger.debug("--- END DEBUG TARGET ROW ---\n")
+    if nomor_cache and kode_wilayah_row and final_status == STATUS_SUCCESS:
+        nomor_cache.put_postal_code(final_result_this_row, kode_wilayah=kode_wilayah_row)
+    return final_result_this_row, final_status
+
+
+# Semua kolom input (atau INPUT_COLUMNS + 4 kolom wajib) ikut ke file hasil; rentang baris lewat villages.read()
+def load_villages():
+    global INPUT_ID
+    columns = None
+    if INPUT_COLUMNS is not None:
+        columns = REQUIRED_INPUT_COLUMNS + [col for col in INPUT_COLUMNS if col not in REQUIRED_INPUT_COLUMNS]
+    try:
+        villages = VillageInput(input_file, columns, cache_dir=INPUT_CACHE_DIR if ENABLE_INPUT_CACHE else None)
+        missing = [col for col in REQUIRED_INPUT_COLUMNS if col not in villages.column_names]
+        if missing: raise ValueError(f"kolom tidak ada di sheet villages: {', '.join(missing)}")
+        INPUT_ID = villages.source_sha256[:16]
+        if villages.cache_error:
+            logger.warning(f"{SYM_WARNING} --- PERINGATAN: Cache input tidak bisa dipakai ({villages.cache_error}), baca langsung dari Excel ---")
+        source = "cache " + villages.cache_path if villages.from_cache else "Excel"
+        logger.info(f"{SYM_INFO} File {input_file} berhasil dibaca (dari {source}). Jumlah baris total di Excel: {len(villages)}")
+        return villages
+    except Exception as e:
+        logger.error(f"{SYM_ERROR} Error baca Excel/chunk: {e}");
+        sys.exit(1)
+
+
+def prepare_chunk(villages, start_row, end_row):
+    df = villages.read(start_row, end_row)
+    df[URL_NOMOR_COL_DETAIL], df[URL_NOMOR_COL_KODEWIL] = generate_nomor_urls(df)
+    df[KODE_POS_RESULT_COL] = ""
+    df[PROVENANCE_COL] = ""
+    df[STATUS_COL] = ""
+    return df
+
+
+# Journal semua worker di queue_dir (termasuk worker yang sudah mati) untuk resume & merge. Dibaca bertahap:
+# refresh() hanya membaca byte yang ditambahkan sejak refresh sebelumnya, jadi worker tidak mem-parse ulang
+# semua journal setiap mengambil unit.
+class QueueJournals:
+    def __init__(self, directory, input_id):
+        self.directory = directory
+        self.input_id = input_id
+        self.records = {}
+        self._offsets = {}
+
+    def refresh(self):
+        skipped = 0
+        for path in sorted(glob.glob(os.path.join(self.directory, "journal_v15_*.jsonl"))):
+            offset = self._offsets.get(path, 0)
+            if os.path.getsize(path) < offset: offset = 0  # File diganti/dipotong: baca dari awal
+            with open(path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+            complete = data.rfind(b"\n") + 1  # Baris terakhir yang belum selesai ditulis dibaca di refresh berikutnya
+            self._offsets[path] = offset + complete
+            for line in data[:complete].splitlines():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("input") != self.input_id:
+                    skipped += 1
+                    continue
+                row_abs = record["row"]
+                if row_abs not in self.records or record.get("ts", 0) >= self.records[row_abs].get("ts", 0):
+                    self.records[row_abs] = record
+        if skipped:
+            logger.warning(f"{SYM_WARNING} --- PERINGATAN: {skipped} record journal di {self.directory} bukan dari file input ini, diabaikan ---")
+        return self.records
+
+
+def load_queue_journals():
+    return QueueJournals(queue_dir, INPUT_ID).refresh()
+
+
+def run_timed(func, *args):
+    start = time.perf_counter()
+    return func(*args), time.perf_counter() - start
+
+
+def run_chunk(df, start_row, journal_records, on_row_done=None, row_numbers=None):
+    # row_numbers: nomor baris (kunci journal) tiap baris df jika tidak berurutan dari start_row (mode repair)
+    row_number = (lambda i: row_numbers[i]) if row_numbers is not None else (lambda i: start_row + i)
+    # Lanjutkan dari journal: baris yang sudah tercatat (file input, ID Desa & nama sama) tidak di-scrape lagi
+    rows_all = df.to_dict("records")
+    pending_rows = []
+    for i, row in enumerate(rows_all):
+        record = journal_records.get(row_number(i))
+        if journal_record_matches(record, row):
+            df.loc[i, KODE_POS_RESULT_COL] = record["result"]
+            df.loc[i, PROVENANCE_COL] = record.get("provenance", PROVENANCE_NOMOR_NET)
+            df.loc[i, STATUS_COL] = status_of_record(record)
+        else:
+            pending_rows.append(i)
+    if len(pending_rows) < len(df):
+        logger.info(
+            f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): Resume dari journal, {len(df) - len(pending_rows)} baris sudah selesai, sisa {len(pending_rows)} ---")
+    if not pending_rows: return df
+
+    from tqdm import tqdm
+    max_workers_val = max(1, int(MAX_CONCURRENT_REQUESTS))
+    logger.info(f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): {max_workers_val} request nomor.net berjalan bersamaan ---")
+    journal = CheckpointJournal(journal_file, batch_size_val)
+
+    def record_row_result(i, final_result_this_row, elapsed_s, provenance=PROVENANCE_NOMOR_NET,
+                          status=STATUS_SUCCESS):
+        df.loc[i, KODE_POS_RESULT_COL] = final_result_this_row
+        df.loc[i, PROVENANCE_COL] = provenance
+        df.loc[i, STATUS_COL] = status
+        t_checkpoint = time.perf_counter()
+        journal.append({"row": row_number(i), **journal_row_fields(rows_all[i]),
+                        "result": final_result_this_row, "status": status, "provenance": provenance,
+                        "ts": round(time.time(), 3), "elapsed_s": round(elapsed_s, 3)})
+        metrics.observe("checkpoint", time.perf_counter() - t_checkpoint)
+        valid = status == STATUS_SUCCESS
+        metrics.incr("rows", source=provenance, status=status)
+        if provenance == PROVENANCE_NOMOR_NET:  # Baris daftar kecamatan berbagi satu waktu (fase district_group)
+            metrics.observe("row", elapsed_s)
+            metrics.trace("row", row=row_number(i), provenance=provenance, status=status,
+                          elapsed_s=round(elapsed_s, 4))
+        else:
+            metrics.trace("row", row=row_number(i), provenance=provenance, status=status)
+        if postal_index is not None and valid:
+            add_known_result(postal_index, rows_all[i], final_result_this_row, provenance)
+        metrics.maybe_snapshot()
+        if on_row_done: on_row_done()
+
+    try:
+        # Tahap 0: baris yang kode posnya sudah bisa dipastikan dari indeks offline
+        pending_rows = fill_from_index(pending_rows, rows_all, record_row_result)
+        executor = ThreadPoolExecutor(max_workers=max_workers_val)
+        try:
+            # Tahap 1: halaman daftar per kecamatan; baris yang tidak cocok lanjut ke tahap 2 (per baris)
+            district_groups = plan_district_groups(pending_rows, rows_all) if ENABLE_DISTRICT_PLANNER else []
+            if district_groups:
+                logger.info(
+                    f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): {len(district_groups)} kecamatan ({sum(len(g[2]) for g in district_groups)} baris) dicoba lewat halaman daftar desa ---")
+                resolved_rows = set()
+                futures = [executor.submit(run_timed, resolve_district_group, dist, reg, row_indices, rows_all)
+                           for dist, reg, row_indices in district_groups]
+                for future in tqdm(as_completed(futures), total=len(futures),
+                                   desc=f"Daftar Kecamatan (ID: {MY_PROCESS_ID})"):
+                    resolved_group, elapsed_s = future.result()
+                    metrics.observe("district_group", elapsed_s)
+                    for i, code in resolved_group.items():
+                        record_row_result(i, code, elapsed_s, PROVENANCE_DISTRICT_LISTING);
+                        resolved_rows.add(i)
+                pending_rows = [i for i in pending_rows if i not in resolved_rows]
+                logger.info(
+                    f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): {len(resolved_rows)} baris selesai dari daftar kecamatan, {len(pending_rows)} baris di-scrape per baris ---")
+                # Hasil daftar kecamatan menambah dukungan prefix kecamatan di indeks
+                pending_rows = fill_from_index(pending_rows, rows_all, record_row_result)
+
+            futures = {executor.submit(run_timed, process_row, i, rows_all[i], start_row): i for i in pending_rows}
+            for future in tqdm(as_completed(futures), total=len(futures),
+                               desc=f"Scraping Progress (ID: {MY_PROCESS_ID})"):
+                (final_result_this_row, final_status), elapsed_s = future.result()
+                record_row_result(futures[future], final_result_this_row, elapsed_s, status=final_status)
+        except BaseException:
+            # Ctrl-C / error di loop ini (kedua tahap): baris yang masih antri dibatalkan. shutdown(wait=True)
+            # bawaan `with` tetap men-scrape semuanya, padahal hasilnya tidak lagi dicatat di journal
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
+    finally:
+        journal.close()
+    return df
+
+
+# Mode repair menulis kembali file sumbernya dalam format yang sama (--output-format tidak dipakai), supaya
+# --repair-from hasil.csv memperbarui hasil.csv, bukan membuat hasil.xlsx baru
+def run_output_formats():
+    if RUN_MODE == "repair" and REPAIR_SOURCE: return [output_format_of(REPAIR_SOURCE) or "xlsx"]
+    return OUTPUT_FORMATS
+
+
+def save_output(df, path):
+    formats = run_output_formats()
+    logger.info(f"\n{SYM_INFO} Menyimpan hasil ID: {MY_PROCESS_ID} ({len(df)} baris, format {', '.join(formats)})...")
+    start = time.time()
+    results = write_output(df, path, formats, postal_code_col=KODE_POS_RESULT_COL)
+    for target, error in results.items():
+        if error is None:
+            logger.info(f"{SYM_SUCCESS} Selesai! Hasil ID: {MY_PROCESS_ID} disimpan di {target}")
+        else:
+            logger.error(f"{SYM_ERROR} Error simpan {target} (ID: {MY_PROCESS_ID}): {error}")
+    logger.info(f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): Penyimpanan selesai dalam {time.time() - start:.1f} dtk ---")
+    if all(error is None for error in results.values()): return True
+    if any(error is None for error in results.values()): return False
+    logger.warning(f"{SYM_WARNING} Mencoba simpan sbg CSV biasa...")
     try:
-        csv_output_file = output_file.replace(".xlsx", "_plain.csv"); df.to_csv(csv_output_file, index=False); print(
+        csv_output_file = os.path.splitext(path)[0] + "_plain.csv"; df.to_csv(csv_output_file, index=False); logger.info(
             f"{SYM_SUCCESS} Berhasil simpan sbg CSV ke: {csv_output_file}")
     except Exception as e_csv:
-        print(f"{SYM_ERROR} Gagal simpan sbg CSV juga: {e_csv}")
+        logger.error(f"{SYM_ERROR} Gagal simpan sbg CSV juga: {e_csv}")
+    return False
+
+
+# Gauge tambahan di snapshot Prometheus: jeda rate controller, hit rate cache & indeks
+def metrics_gauges():
+    gauges = {"rate_delay_seconds": rate_controller.current_delay(NOMOR_NET_BASE_URL)}
+    if nomor_cache:
+        lookups = nomor_cache.hits + nomor_cache.misses
+        gauges.update(cache_hits=nomor_cache.hits, cache_misses=nomor_cache.misses,
+                      cache_hit_ratio=nomor_cache.hits / lookups if lookups else 0.0)
+    rows_by_source = metrics.counter_totals("rows", "source")
+    rows_total = sum(rows_by_source.values())
+    index_rows = sum(n for source, n in rows_by_source.items() if source.startswith(INDEX_PROVENANCE_PREFIX))
+    gauges["index_hit_ratio"] = index_rows / rows_total if rows_total else 0.0
+    return gauges
+
+
+def open_metrics():
+    global metrics
+    metrics.close()
+    metrics = RunMetrics(trace_path=TRACE_FILE if ENABLE_TRACE else None,
+                         prometheus_path=METRICS_FILE if ENABLE_METRICS_FILE else None,
+                         const_labels={"process_id": MY_PROCESS_ID}, snapshot_interval=METRICS_SNAPSHOT_SECONDS,
+                         gauge_provider=metrics_gauges)
+    metrics.trace("run", mode=RUN_MODE, process_id=MY_PROCESS_ID, concurrency=MAX_CONCURRENT_REQUESTS,
+                  hedged=ENABLE_HEDGED_LOOKUP, planner=ENABLE_DISTRICT_PLANNER, index=ENABLE_POSTAL_INDEX,
+                  extractor=EXTRACTOR_BACKEND)
+    return metrics
+
+
+def print_run_stats():
+    scraper_pool.close_all()
+    metrics.write_prometheus()
+    logger.info(f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): Metrik run: {metrics.summary()} ---")
+    if ENABLE_TRACE or ENABLE_METRICS_FILE:
+        logger.info(f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): Trace: {TRACE_FILE if ENABLE_TRACE else '(nonaktif)'}, "
+                    f"metrik Prometheus: {METRICS_FILE if ENABLE_METRICS_FILE else '(nonaktif)'} ---")
+    if nomor_cache:
+        logger.info(f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): Statistik cache: {nomor_cache.stats()} ---")
+    if postal_index is not None:
+        logger.info(f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): Statistik indeks kode pos: {postal_index.stats()} ---")
+    logger.info(f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): Statistik sesi cloudscraper: {scraper_pool.stats()} ---")
+    logger.info(f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): Statistik rate controller: {rate_controller.stats()} ---")
+
+
+def run_manual():
+    open_metrics()
+    villages = load_villages()
+    actual_start_row = max(0, MY_START_ROW_ABSOLUTE);
+    actual_end_row = min(len(villages), MY_END_ROW_EXCLUSIVE_ABSOLUTE)
+    if actual_start_row >= actual_end_row:
+        logger.warning(f"{SYM_WARNING} --- INFO (ID: {MY_PROCESS_ID}): Rentang baris tidak valid/kosong. ---")
+        logger.warning(f"{SYM_WARNING} Tidak ada data diproses (ID: {MY_PROCESS_ID}). Skrip berhenti.");
+        sys.exit(0)
+    logger.info(f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): Proses baris {actual_start_row} hingga {actual_end_row - 1} ---")
+    df = prepare_chunk(villages, actual_start_row, actual_end_row)
+    logger.info(f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): Jumlah baris diproses: {len(df)} ---")
+    load_postal_index()
+
+    logger.debug(f"\n{SYM_INFO} Contoh URL nomor.net (Detail - 5 pertama dari chunk {MY_PROCESS_ID}):");
+    logger.debug(df[URL_NOMOR_COL_DETAIL].head().tolist());
+    logger.debug(f"\n{SYM_INFO} Contoh URL nomor.net (KodeWil - 5 pertama dari chunk {MY_PROCESS_ID}):");
+    logger.debug(df[URL_NOMOR_COL_KODEWIL].head().tolist());
+    logger.debug("-" * 30)
+    logger.info(
+        f"\n{SYM_INFO} Memulai scraping (ID: {MY_PROCESS_ID}, Jatah: {MY_START_ROW_ABSOLUTE} s.d. {MY_END_ROW_EXCLUSIVE_ABSOLUTE - 1})...")
+    run_chunk(df, actual_start_row, load_journal(journal_file, INPUT_ID))
+    print_run_stats()
+    if save_output(df, output_file):
+        logger.info(f"{SYM_INFO} PERHATIAN: File ini hanya berisi data untuk jatah ID: {MY_PROCESS_ID}.");
+        logger.info(f"{SYM_INFO} Gabungkan dengan hasil chunk lain jika sudah semua.")
+
+
+# Antrian dibuat untuk satu file input (isi, lihat INPUT_ID) dan satu rentang baris; dipakai ulang hanya jika sama
+def queue_mismatch(work_queue, start_row=None, end_row=None):
+    expected = {"input_id": INPUT_ID, "start_row": start_row, "end_row": end_row}
+    stored = {key: work_queue.get_meta(key) for key in expected}
+    mismatched = [f"{key} {stored[key]} != {value}" for key, value in expected.items()
+                  if value is not None and stored[key] != str(value)]
+    if not mismatched: return None
+    return (f"antrian {queue_file} dibuat untuk {work_queue.get_meta('input_file', '?')} ({', '.join(mismatched)}); "
+            f"pakai --queue-dir lain atau hapus folder antrian tsb")
+
+
+def run_worker():
+    if not os.path.exists(queue_file):
+        logger.error(f"{SYM_ERROR} Antrian belum dibuat: {queue_file}. Jalankan dulu --mode coordinator.");
+        sys.exit(1)
+    open_metrics()
+    villages = load_villages()
+    work_queue = WorkQueue(queue_file, lease_seconds=WORK_LEASE_SECONDS)
+    mismatch = queue_mismatch(work_queue)
+    if mismatch:
+        logger.error(f"{SYM_ERROR} File input {input_file} tidak cocok dengan {mismatch}");
+        sys.exit(1)
+    load_postal_index()
+    units_done = 0
+    queue_journals = QueueJournals(queue_dir, INPUT_ID)
+    while True:
+        unit = work_queue.lease(MY_PROCESS_ID)
+        if unit is None: break
+        unit_id, unit_start, unit_end = unit
+        logger.info(f"\n{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): Ambil unit {unit_id} (baris {unit_start} s.d. {unit_end - 1}) ---")
+
+        def lease_lost(unit_id=unit_id):
+            logger.warning(f"{SYM_WARNING} --- PERINGATAN (ID: {MY_PROCESS_ID}): Lease unit {unit_id} sudah diambil worker lain ---")
+
+        df = prepare_chunk(villages, unit_start, unit_end)
+        # Lease diperpanjang oleh timer, juga selama menunggu cooldown circuit breaker (bisa > WORK_LEASE_SECONDS)
+        with LeaseRenewer(queue_file, unit_id, MY_PROCESS_ID, WORK_LEASE_SECONDS, on_lost=lease_lost):
+            run_chunk(df, unit_start, queue_journals.refresh())
+        work_queue.complete(unit_id, MY_PROCESS_ID)
+        units_done += 1
+        logger.info(f"{SYM_SUCCESS} Unit {unit_id} selesai (ID: {MY_PROCESS_ID}). Progres antrian: {work_queue.progress()}")
+    logger.info(f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): Tidak ada unit tersisa, worker berhenti setelah {units_done} unit ---")
+    work_queue.close()
+    print_run_stats()
+
+
+def run_merge(villages=None):
+    if not os.path.exists(queue_file):
+        logger.error(f"{SYM_ERROR} Antrian tidak ditemukan: {queue_file}");
+        sys.exit(1)
+    if villages is None: villages = load_villages()
+    work_queue = WorkQueue(queue_file, lease_seconds=WORK_LEASE_SECONDS)
+    mismatch = queue_mismatch(work_queue)
+    if mismatch:
+        logger.error(f"{SYM_ERROR} File input {input_file} tidak cocok dengan {mismatch}");
+        sys.exit(1)
+    merge_start = int(work_queue.get_meta("start_row", 0))
+    merge_end = int(work_queue.get_meta("end_row", 0))
+    if not work_queue.all_done():
+        logger.warning(f"{SYM_WARNING} --- PERINGATAN: Antrian belum selesai ({work_queue.progress()}), hasil gabungan belum lengkap ---")
+    work_queue.close()
+    df = prepare_chunk(villages, merge_start, merge_end)
+    journal_records = load_queue_journals()
+    missing_rows = 0
+    for i, row in enumerate(df.to_dict("records")):
+        record = journal_records.get(merge_start + i)
+        if journal_record_matches(record, row):
+            df.loc[i, KODE_POS_RESULT_COL] = record["result"]
+            df.loc[i, PROVENANCE_COL] = record.get("provenance", PROVENANCE_NOMOR_NET)
+            df.loc[i, STATUS_COL] = status_of_record(record)
+        else:
+            missing_rows += 1
+    if missing_rows: logger.warning(f"{SYM_WARNING} --- PERINGATAN: {missing_rows} baris belum ada di journal worker manapun ---")
+    save_output(df, output_file)
+
+
+def read_output_for_repair(path):
+    import pandas as pd
+    text_cols = [KODE_POS_RESULT_COL, PROVENANCE_COL, STATUS_COL]
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path)
+    elif path.endswith(".csv"):
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    else:
+        df = pd.read_excel(path, dtype={col: str for col in text_cols})
+    missing = [col for col in (COL_ID_DESA, COL_NAMA_DESA, COL_KECAMATAN, COL_KABUPATEN, KODE_POS_RESULT_COL)
+               if col not in df.columns]
+    if missing: raise ValueError(f"kolom tidak ada di {path}: {', '.join(missing)}")
+    for col in text_cols:
+        df[col] = df[col].fillna("").astype(object) if col in df.columns else ""
+    return df
+
+
+# Proses ulang hanya baris gagal yang masih mungkin berhasil (REPAIR_STATUSES) dari file output v15 yang sudah ada.
+# Baris lain (sukses, 404, halaman tanpa kode pos, data kurang) tidak disentuh; hasil ditulis kembali ke file yang sama.
+def run_repair():
+    global ENABLE_NEGATIVE_CACHE, INPUT_ID
+    from collections import Counter
+    open_metrics()
+    try:
+        out = read_output_for_repair(REPAIR_SOURCE)
+        INPUT_ID = file_sha256(REPAIR_SOURCE)[:16]  # File sumber baru ditimpa setelah repair selesai
+    except Exception as e:
+        logger.error(f"{SYM_ERROR} Error baca file output {REPAIR_SOURCE}: {e}");
+        sys.exit(1)
+    # Output lama belum punya kolom status: tebak dari teks hasil; kosong = baris belum pernah diproses
+    statuses = [status or classify_result_text(result) for status, result in
+                zip(out[STATUS_COL], out[KODE_POS_RESULT_COL])]
+    out[STATUS_COL] = [status or "" for status in statuses]
+    repair_rows = [n for n, status in enumerate(statuses) if status is None or status in REPAIR_STATUSES]
+    counts = ", ".join(f"{status or 'kosong'}: {n}" for status, n in Counter(statuses).most_common())
+    logger.info(f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): {REPAIR_SOURCE}: {len(out)} baris [{counts}] ---")
+    logger.info(f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): {len(repair_rows)} baris diproses ulang (status: {', '.join(REPAIR_STATUSES)}, kosong) ---")
+    if not repair_rows:
+        logger.info(f"{SYM_SUCCESS} Tidak ada baris yang perlu diperbaiki di {REPAIR_SOURCE}")
+        return
+    if set(REPAIR_STATUSES) & set(NEGATIVE_CACHE_STATUSES) and ENABLE_NEGATIVE_CACHE:
+        ENABLE_NEGATIVE_CACHE = False  # Status yang di-cache negatif diminta ulang: jangan jawab dari cache negatif
+        logger.info(f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): Cache negatif tidak dibaca (status {', '.join(NEGATIVE_CACHE_STATUSES)} ikut diulang) ---")
+    df = out.loc[repair_rows, [COL_ID_DESA, COL_NAMA_DESA, COL_KECAMATAN, COL_KABUPATEN]].reset_index(drop=True)
+    df[URL_NOMOR_COL_DETAIL], df[URL_NOMOR_COL_KODEWIL] = generate_nomor_urls(df)
+    df[KODE_POS_RESULT_COL] = ""
+    df[PROVENANCE_COL] = ""
+    df[STATUS_COL] = ""
+    load_postal_index()
+    run_chunk(df, 0, load_journal(journal_file, INPUT_ID), row_numbers=repair_rows)
+    result_cols = [KODE_POS_RESULT_COL, PROVENANCE_COL, STATUS_COL]
+    for col in result_cols:
+        out.loc[repair_rows, col] = df[col].to_numpy()
+    repaired = sum(1 for status in df[STATUS_COL] if status == STATUS_SUCCESS)
+    logger.info(f"{SYM_INFO} --- INFO (ID: {MY_PROCESS_ID}): {repaired}/{len(repair_rows)} baris berhasil diperbaiki ---")
+    print_run_stats()
+    if save_output(out, output_file) and os.path.exists(journal_file):
+        os.remove(journal_file)  # Baris yang masih gagal harus dicoba lagi di pass repair berikutnya
+
+
+def run_coordinator(start_row=None, end_row=None, spawn_workers=0):
+    os.makedirs(queue_dir, exist_ok=True)
+    villages = load_villages()
+    coord_start = max(0, start_row or 0)
+    coord_end = min(len(villages), end_row if end_row is not None else len(villages))
+    work_queue = WorkQueue(queue_file, lease_seconds=WORK_LEASE_SECONDS)
+    if work_queue.is_initialized():
+        mismatch = queue_mismatch(work_queue, coord_start, coord_end)
+        if mismatch:
+            logger.error(f"{SYM_ERROR} File input {input_file} (baris {coord_start} s.d. {coord_end - 1}) tidak cocok "
+                         f"dengan {mismatch}");
+            sys.exit(1)
+        logger.info(f"{SYM_INFO} Antrian sudah ada, lanjutkan: {work_queue.progress()}")
+    else:
+        work_queue.initialize(coord_start, coord_end, WORK_UNIT_SIZE,
+                              meta={"input_file": input_file, "input_id": INPUT_ID, "start_row": coord_start,
+                                    "end_row": coord_end})
+        logger.info(f"{SYM_SUCCESS} Antrian dibuat: baris {coord_start} s.d. {coord_end - 1}, {work_queue.progress()['pending']} unit")
+
+    worker_processes = []
+    for n in range(spawn_workers):
+        worker_cmd = [sys.executable, os.path.abspath(__file__), "--mode", "worker",
+                      "--process-id", f"{MY_PROCESS_ID}-w{n + 1}", "--input", input_file, "--queue-dir", queue_dir,
+                      "--data-dir", data_folder_path, "--base-url", NOMOR_NET_BASE_URL,
+                      "--concurrency", str(MAX_CONCURRENT_REQUESTS),
+                      "--rate-initial-delay", str(RATE_INITIAL_DELAY), "--rate-min-delay", str(RATE_MIN_DELAY),
+                      "--hedge-delay", str(HEDGE_DELAY_SECONDS)] + ([] if ENABLE_HEDGED_LOOKUP else ["--no-hedge"]) \
+                     + ([] if ENABLE_INPUT_CACHE else ["--no-input-cache"]) \
+                     + ([] if ENABLE_POSTAL_INDEX else ["--no-index"]) \
+                     + (["--index-from-outputs"] if INDEX_FROM_OUTPUTS else []) \
+                     + ([] if ENABLE_TRACE else ["--no-trace"]) + ([] if ENABLE_METRICS_FILE else ["--no-metrics"]) \
+                     + ([] if ENABLE_NEGATIVE_CACHE else ["--no-negative-cache"]) \
+                     + ["--log-level", logging.getLevelName(logger.getEffectiveLevel())]
+        worker_processes.append(subprocess.Popen(worker_cmd))
+    if worker_processes: logger.info(f"{SYM_INFO} {len(worker_processes)} worker lokal dijalankan")
+    if not worker_processes:
+        logger.info(f"{SYM_INFO} Jalankan worker (di host ini atau host lain dengan folder yang sama):")
+        logger.info(f"   python {os.path.basename(__file__)} --mode worker --queue-dir {queue_dir}")
+        logger.info("   (tanpa --process-id, ID worker = <hostname>-<pid>; ID yang diberikan harus unik per worker)")
+
+    while not work_queue.all_done():
+        if worker_processes and all(p.poll() is not None for p in worker_processes):
+            logger.warning(f"{SYM_WARNING} Semua worker lokal berhenti tapi antrian belum selesai: {work_queue.progress()}")
+            break
+        time.sleep(WORK_POLL_SECONDS)
+        logger.info(f"{SYM_INFO} Progres antrian: {work_queue.progress()}")
+    work_queue.close()
+    run_merge(villages)
+
+
+def open_cache():
+    global nomor_cache
+    if nomor_cache: nomor_cache.close()
+    nomor_cache = None
+    if not ENABLE_CACHE: return None
+    try:
+        # host: kode pos dari server tiruan (--base-url lain) tidak tercampur dengan hasil nomor.net asli
+        nomor_cache = NomorCache(CACHE_FILE, ttl_days=CACHE_TTL_DAYS, store_html=CACHE_STORE_HTML,
+                                 negative_ttl_days=NEGATIVE_CACHE_TTL_DAYS, host=urlparse(NOMOR_NET_BASE_URL).netloc)
+        if RUN_MODE != "lookup": logger.info(f"{SYM_INFO} Cache dibuka: {nomor_cache.stats()}")
+    except Exception as e:
+        logger.warning(f"{SYM_WARNING} --- PERINGATAN: Gagal membuka cache {CACHE_FILE}: {e}. Lanjut tanpa cache. ---")
+    return nomor_cache
+
+
+def configure(mode=None, process_id=None, data_dir=None, input_path=None, start_row=None, end_row=None,
+              queue_path=None, base_url=None, concurrency=None, rate_initial_delay=None, rate_min_delay=None,
+              hedge_delay=None, hedged=None, output_formats=None, input_cache=None, use_index=None, index_outputs=None,
+              trace=None, metrics_file=None, log_level=None, repair_source=None, repair_statuses=None,
+              negative_cache=None, use_cache=True):
+    """Atur konfigurasi modul (argumen CLI, atau langsung saat dipakai sebagai library) lalu buka cache.
+
+    Argumen bernilai None membiarkan konfigurasi yang sekarang. start_row/end_row adalah baris absolut
+    (0-based, end eksklusif) untuk mode manual.
+    """
+    global RUN_MODE, MY_PROCESS_ID, data_folder_path, input_file, queue_dir, NOMOR_NET_BASE_URL, \
+        MAX_CONCURRENT_REQUESTS, RATE_INITIAL_DELAY, RATE_MIN_DELAY, MY_START_ROW_ABSOLUTE, \
+        MY_END_ROW_EXCLUSIVE_ABSOLUTE, rate_controller, HEDGE_DELAY_SECONDS, ENABLE_HEDGED_LOOKUP, OUTPUT_FORMATS, \
+        ENABLE_INPUT_CACHE, ENABLE_POSTAL_INDEX, ENABLE_TRACE, ENABLE_METRICS_FILE, REPAIR_SOURCE, REPAIR_STATUSES, \
+        ENABLE_NEGATIVE_CACHE, INDEX_FROM_OUTPUTS
+    if mode is not None: RUN_MODE = mode
+    if process_id is not None: MY_PROCESS_ID = process_id
+    if data_dir is not None and data_dir != data_folder_path:
+        if os.path.normpath(queue_dir) == os.path.normpath(os.path.join(data_folder_path, "queue_v15")):
+            queue_dir = os.path.join(data_dir, "queue_v15")
+        data_folder_path = data_dir
+        input_file = os.path.join(data_folder_path, os.path.basename(input_file))
+    if input_path: input_file = input_path
+    if queue_path: queue_dir = queue_path
+    if base_url: NOMOR_NET_BASE_URL = base_url.rstrip("/")
+    if concurrency is not None: MAX_CONCURRENT_REQUESTS = concurrency
+    if rate_initial_delay is not None: RATE_INITIAL_DELAY = rate_initial_delay
+    if rate_min_delay is not None: RATE_MIN_DELAY = rate_min_delay
+    RATE_MIN_DELAY = min(RATE_MIN_DELAY, RATE_INITIAL_DELAY)
+    if hedge_delay is not None: HEDGE_DELAY_SECONDS = hedge_delay
+    if hedged is not None: ENABLE_HEDGED_LOOKUP = hedged
+    if output_formats: OUTPUT_FORMATS = list(output_formats)
+    if input_cache is not None: ENABLE_INPUT_CACHE = input_cache
+    if use_index is not None: ENABLE_POSTAL_INDEX = use_index
+    if index_outputs is not None: INDEX_FROM_OUTPUTS = index_outputs
+    if trace is not None: ENABLE_TRACE = trace
+    if metrics_file is not None: ENABLE_METRICS_FILE = metrics_file
+    if repair_source: REPAIR_SOURCE = repair_source
+    if repair_statuses: REPAIR_STATUSES = list(repair_statuses)
+    if negative_cache is not None: ENABLE_NEGATIVE_CACHE = negative_cache
+    setup_logging(log_level)
+    if start_row is not None: MY_START_ROW_ABSOLUTE = start_row
+    if end_row is not None: MY_END_ROW_EXCLUSIVE_ABSOLUTE = end_row
+    derive_paths()
+    rate_controller = create_rate_controller()
+    if use_cache: open_cache()
+
+
+def print_config():
+    logger.debug(f"{SYM_INFO} --- DEBUG: Base directory (lokasi skrip): {base_dir} ---")
+    logger.debug(f"{SYM_INFO} --- DEBUG: Data directory: {data_folder_path} ---")
+    logger.debug(f"{SYM_INFO} --- DEBUG: Target input file: {input_file} ---")
+    logger.debug(f"{SYM_INFO} --- DEBUG (ID: {MY_PROCESS_ID}): Target output file: {output_file} (format: {', '.join(run_output_formats())}) ---")
+    logger.debug(f"{SYM_INFO} --- DEBUG (ID: {MY_PROCESS_ID}): Journal checkpoint: {journal_file} ---")
+    logger.debug(f"{SYM_INFO} --- DEBUG: Cache file: {CACHE_FILE if ENABLE_CACHE else '(nonaktif)'} ---")
+    logger.debug(f"{SYM_INFO} --- DEBUG: Cache input: {INPUT_CACHE_DIR if ENABLE_INPUT_CACHE else '(nonaktif)'} ---")
+    logger.debug(f"{SYM_INFO} --- DEBUG: Indeks kode pos offline: "
+                 f"{('aktif' + (' (+ file output)' if INDEX_FROM_OUTPUTS else '')) if ENABLE_POSTAL_INDEX else '(nonaktif)'} ---")
+    logger.debug(f"{SYM_INFO} --- DEBUG (ID: {MY_PROCESS_ID}): Trace: {TRACE_FILE if ENABLE_TRACE else '(nonaktif)'}, "
+                 f"metrik: {METRICS_FILE if ENABLE_METRICS_FILE else '(nonaktif)'}, level log: "
+                 f"{logging.getLevelName(logger.getEffectiveLevel())} ---")
+    if urlparse(NOMOR_NET_BASE_URL).netloc != NOMOR_NET_REAL_HOST and \
+            os.path.normpath(data_folder_path) == os.path.normpath(DEFAULT_DATA_FOLDER_PATH):
+        # Cache dipisah per host, tapi journal & output di folder ini tetap dibaca indeks kode pos run berikutnya
+        logger.warning(f"{SYM_WARNING} --- PERINGATAN: --base-url {NOMOR_NET_BASE_URL} bukan nomor.net asli tapi --data-dir "
+                       f"masih folder data utama; pakai folder terpisah untuk server tiruan ---")
+    if RUN_MODE == "repair":
+        logger.debug(f"{SYM_INFO} --- DEBUG (ID: {MY_PROCESS_ID}): Mode repair: {REPAIR_SOURCE} (status: {', '.join(REPAIR_STATUSES)}) ---")
+    elif RUN_MODE != "manual":
+        logger.debug(f"{SYM_INFO} --- DEBUG (ID: {MY_PROCESS_ID}): Mode {RUN_MODE}, antrian: {queue_file} ---")
+
+
+# Cari kode pos satu desa tanpa membaca file Excel (jalur yang sama dengan satu baris di run_chunk)
+def lookup_village(village_name, district, regency, id_desa=None):
+    row = {COL_ID_DESA: id_desa, COL_NAMA_DESA: village_name, COL_KECAMATAN: district, COL_KABUPATEN: regency}
+    row[URL_NOMOR_COL_DETAIL] = generate_nomor_url_detailed(row)
+    row[URL_NOMOR_COL_KODEWIL] = generate_nomor_url_by_kode_wilayah(row)
+    return process_row(0, row, start_row=0)[0]
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def build_arg_parser():
+    arg_parser = argparse.ArgumentParser(description="Scraping kode pos desa dari nomor.net")
+    arg_parser.add_argument("--mode", choices=["manual", "coordinator", "worker", "merge", "lookup", "repair"],
+                            default="manual",
+                            help="manual: rentang baris tetap (default); coordinator: buat antrian & gabungkan hasil; "
+                                 "worker: ambil unit dari antrian; merge: gabungkan hasil worker; "
+                                 "lookup: cari satu desa (--village, --district, --regency); "
+                                 "repair: proses ulang baris gagal sementara dari file output (--repair-from)")
+    arg_parser.add_argument("--process-id", default=None,
+                            help=f"ID proses di nama file & lease antrian (default: {MY_PROCESS_ID}; "
+                                 f"mode worker: <hostname>-<pid>, supaya tiap worker unik)")
+    arg_parser.add_argument("--data-dir", default=data_folder_path, help="Folder output, journal, cache")
+    arg_parser.add_argument("--input", default=None, help="File Excel input (sheet 'villages')")
+    arg_parser.add_argument("--start-row", type=int, default=None, help="Baris awal absolut (0-based)")
+    arg_parser.add_argument("--end-row", type=int, default=None, help="Baris akhir absolut (eksklusif)")
+    arg_parser.add_argument("--queue-dir", default=None, help="Folder antrian & journal worker (bisa di share)")
+    arg_parser.add_argument("--spawn-workers", type=int, default=0,
+                            help="(coordinator) jalankan N proses worker lokal sekaligus")
+    arg_parser.add_argument("--base-url", default=NOMOR_NET_BASE_URL, help="Base URL nomor.net")
+    arg_parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENT_REQUESTS)
+    arg_parser.add_argument("--rate-initial-delay", type=float, default=RATE_INITIAL_DELAY)
+    arg_parser.add_argument("--rate-min-delay", type=float, default=RATE_MIN_DELAY)
+    arg_parser.add_argument("--hedge-delay", type=float, default=HEDGE_DELAY_SECONDS,
+                            help="Detik menunggu URL kodewil sebelum URL detail ikut dikirim (0 = langsung paralel)")
+    arg_parser.add_argument("--no-hedge", action="store_true", help="URL detail baru dicoba setelah URL kodewil gagal")
+    arg_parser.add_argument("--no-input-cache", action="store_true",
+                            help="Selalu parse file Excel input (tanpa cache kolumnar di <data-dir>/input_cache)")
+    arg_parser.add_argument("--no-index", action="store_true",
+                            help="Jangan isi kode pos dari indeks offline (journal & cache sebelumnya)")
+    arg_parser.add_argument("--index-from-outputs", action="store_true",
+                            help="Indeks offline juga membaca file output village_postal_code_v15* di --data-dir")
+    arg_parser.add_argument("--no-trace", action="store_true", help="Jangan tulis trace JSON-lines (trace_v15*.jsonl)")
+    arg_parser.add_argument("--no-metrics", action="store_true",
+                            help="Jangan tulis snapshot metrik Prometheus (metrics_v15*.prom)")
+    arg_parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], type=str.upper,
+                            default=None, help="Level log konsol (default: DEBUG, atau INFO dengan --quiet)")
+    arg_parser.add_argument("--output-format", default=",".join(OUTPUT_FORMATS),
+                            help="Format file hasil, dipisah koma: xlsx, parquet, csv (mis. xlsx,parquet); "
+                                 "mode repair selalu memakai format file --repair-from")
+    arg_parser.add_argument("--repair-from", help="(repair) File output village_postal_code_v15_* (xlsx/csv/parquet)")
+    arg_parser.add_argument("--repair-statuses", default=",".join(REPAIR_STATUSES),
+                            help=f"(repair) Status yang diproses ulang, dipisah koma: {', '.join(ALL_STATUSES)}")
+    arg_parser.add_argument("--no-negative-cache", action="store_true",
+                            help="Tetap request URL yang sebelumnya 404 / tanpa kode pos (cache negatif tidak dibaca)")
+    arg_parser.add_argument("--village", help="(lookup) Nama desa")
+    arg_parser.add_argument("--district", help="(lookup) Kecamatan")
+    arg_parser.add_argument("--regency", help="(lookup) Kabupaten/Kota, mis. 'Kab. Aceh Besar'")
+    arg_parser.add_argument("--id-desa", help="(lookup) ID Desa / kode wilayah, opsional")
+    arg_parser.add_argument("--quiet", action="store_true", help="Matikan log debug detail")
+    return arg_parser
+
+
+def main(argv=None):
+    global ENABLE_DETAILED_DEBUG
+    arg_parser = build_arg_parser()
+    cli_args = arg_parser.parse_args(argv)
+    if cli_args.mode == "lookup" and not (cli_args.village and cli_args.district and cli_args.regency):
+        arg_parser.error("--mode lookup butuh --village, --district dan --regency")
+    if cli_args.mode == "repair" and not cli_args.repair_from:
+        arg_parser.error("--mode repair butuh --repair-from <file output v15>")
+    repair_statuses = [s.strip().lower() for s in cli_args.repair_statuses.split(",") if s.strip()]
+    if any(s not in ALL_STATUSES for s in repair_statuses):
+        arg_parser.error(f"--repair-statuses harus berisi: {', '.join(ALL_STATUSES)}")
+    if cli_args.quiet: ENABLE_DETAILED_DEBUG = False
+    output_formats = [f.strip().lower() for f in cli_args.output_format.split(",") if f.strip()]
+    if not output_formats or any(f not in OUTPUT_WRITER_FORMATS for f in output_formats):
+        arg_parser.error(f"--output-format harus berisi: {', '.join(OUTPUT_WRITER_FORMATS)}")
+    is_manual = cli_args.mode == "manual"
+    process_id = cli_args.process_id
+    if process_id is None and cli_args.mode == "worker":
+        # Worker tanpa --process-id tidak boleh berbagi lease & journal dengan worker lain
+        process_id = default_worker_id()
+    configure(mode=cli_args.mode, process_id=process_id, data_dir=cli_args.data_dir,
+              input_path=cli_args.input, queue_path=cli_args.queue_dir, base_url=cli_args.base_url,
+              concurrency=cli_args.concurrency, rate_initial_delay=cli_args.rate_initial_delay,
+              rate_min_delay=cli_args.rate_min_delay, hedge_delay=cli_args.hedge_delay,
+              hedged=False if cli_args.no_hedge else None, output_formats=output_formats,
+              input_cache=False if cli_args.no_input_cache else None, use_index=False if cli_args.no_index else None,
+              index_outputs=True if cli_args.index_from_outputs else None,
+              trace=False if cli_args.no_trace else None, metrics_file=False if cli_args.no_metrics else None,
+              log_level=cli_args.log_level, repair_source=cli_args.repair_from, repair_statuses=repair_statuses,
+              negative_cache=False if cli_args.no_negative_cache else None,
+              start_row=cli_args.start_row if is_manual else None, end_row=cli_args.end_row if is_manual else None)
+    try:
+        if RUN_MODE == "lookup":
+            result = lookup_village(cli_args.village, cli_args.district, cli_args.regency, id_desa=cli_args.id_desa)
+            print(result)
+            return 0 if is_valid_postal_code(result) else 1
+        print_config()
+        if RUN_MODE == "coordinator":
+            run_coordinator(cli_args.start_row, cli_args.end_row, cli_args.spawn_workers)
+        elif RUN_MODE == "worker":
+            run_worker()
+        elif RUN_MODE == "merge":
+            run_merge()
+        elif RUN_MODE == "repair":
+            run_repair()
+        else:
+            run_manual()
+        return 0
+    finally:
+        if hedge_executor: hedge_executor.shutdown(wait=False, cancel_futures=True)
+        scraper_pool.close_all()
+        if nomor_cache: nomor_cache.close()
+        metrics.close()
+
 
+if __name__ == "__main__":
+    sys.exit(main())
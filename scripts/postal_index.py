@@ -0,0 +1,151 @@
+"""Indeks kode pos offline: isi kode pos dari hasil yang sudah diketahui, tanpa request ke nomor.net.
+
+Kode pos mengikuti hierarki wilayah: desa-desa dalam satu kecamatan (kode wilayah XX.XX.XX, yaitu 6 digit
+pertama ID Desa) hampir selalu berbagi satu kode pos. Indeks diisi dari hasil yang sudah ditemukan
+(journal, cache SQLite, opsional file output sebelumnya) lalu menjawab, berurutan dari yang paling kuat:
+
+1. kode wilayah desa persis                       -> kode pos desa itu
+2. nama desa + kecamatan + kabupaten persis       -> kode pos desa itu
+3. nama desa mirip (difflib) di kecamatan yang sama -> kode pos desa yang mirip itu; hanya variasi tulis
+   (salah ketik, spasi). Nama yang beda angka/angka romawi ("Sukamaju I" vs "Sukamaju II", "Kampung Baru 2")
+   atau beda satu kata utuh ("Sukamaju Utara" vs "Sukamaju Timur") dianggap desa lain
+4. prefix kecamatan dari kode wilayah             -> kode pos yang disepakati desa lain di kecamatan tsb
+5. nama kecamatan + kabupaten                     -> idem, untuk baris tanpa ID Desa
+
+Langkah 4 & 5 hanya menjawab jika minimal `min_support` desa sudah diketahui dan minimal `min_agreement`
+(default: semua) memakai kode yang sama. Kode dari jawaban indeks tidak dimasukkan kembali ke indeks.
+infer() mengembalikan (kode_pos, provenance) atau (None, None) jika tidak yakin.
+"""
+import difflib
+import re
+from collections import Counter, defaultdict
+from urllib.parse import parse_qs, urlparse
+
+PROVENANCE_KODE_WILAYAH = "indeks: kode wilayah"
+PROVENANCE_NAMA_DESA = "indeks: nama desa"
+PROVENANCE_NAMA_DESA_MIRIP = "indeks: nama desa mirip"
+PROVENANCE_PREFIX_KECAMATAN = "indeks: prefix kecamatan"
+PROVENANCE_NAMA_KECAMATAN = "indeks: nama kecamatan"
+PROVENANCE_PREFIX = "indeks:"  # Awalan semua provenance di atas
+
+_REGENCY_PREFIX_RE = re.compile(r"^(kab\.|kabupaten|kota)\s*")
+_ALIAS_SUFFIX_RE = re.compile(r"\s*\(.*\)$")  # "Kuta Cot Glie (Kota Cot Glie)" -> "Kuta Cot Glie"
+_KODE_WILAYAH_RE = re.compile(r"\d{2}\.\d{2}\.\d{2}\.\d{4}")
+_ROMAN_NUMERAL_RE = re.compile(r"[ivxlcdm]+")
+_DIGITS_RE = re.compile(r"\d+")
+_TOKEN_TYPO_RATIO = 0.8  # Kemiripan minimal satu kata (difflib) supaya dianggap salah ketik, bukan kata lain
+
+
+def normalize_name(value):
+    if value is None or (isinstance(value, float) and value != value): return ""
+    return " ".join(_ALIAS_SUFFIX_RE.sub("", str(value)).lower().split())
+
+
+def normalize_regency(value):
+    return _REGENCY_PREFIX_RE.sub("", normalize_name(value))
+
+
+def _is_postal_code(value):
+    return isinstance(value, str) and value.isdigit() and len(value) == 5
+
+
+def _is_numeral(token):
+    return token.isdigit() or bool(_ROMAN_NUMERAL_RE.fullmatch(token))
+
+
+def _numerals(name):
+    return sorted(_DIGITS_RE.findall(name)), sorted(t for t in name.split() if _ROMAN_NUMERAL_RE.fullmatch(t))
+
+
+def is_spelling_variant(name, candidate):
+    """True jika `candidate` hanya beda tulis dengan `name` (nama ternormalisasi), bukan desa bernomor/bernama lain."""
+    if _numerals(name) != _numerals(candidate): return False
+    words = [t for t in name.split() if not _is_numeral(t)]
+    candidate_words = [t for t in candidate.split() if not _is_numeral(t)]
+    if "".join(words) == "".join(candidate_words): return True  # Hanya beda spasi: "Lam Tui" vs "Lamtui"
+    if len(words) != len(candidate_words): return False  # Satu kata utuh ditambah/dihapus
+    return all(a == b or difflib.SequenceMatcher(None, a, b).ratio() >= _TOKEN_TYPO_RATIO
+               for a, b in zip(words, candidate_words))
+
+
+class PostalCodeIndex:
+    def __init__(self, min_support=3, min_agreement=1.0, fuzzy_cutoff=0.92):
+        self.min_support = min_support
+        self.min_agreement = min_agreement
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.by_kode_wilayah = {}
+        self.by_village = defaultdict(Counter)  # (desa, kecamatan, kabupaten) -> Counter kode pos
+        self.villages_by_district = defaultdict(dict)  # (kecamatan, kabupaten) -> {desa: kode pos}
+        self.by_prefix = defaultdict(Counter)  # "XX.XX.XX" -> Counter kode pos (satu hitungan per desa)
+        self.by_district = defaultdict(Counter)  # (kecamatan, kabupaten) -> Counter kode pos
+        self._counted = set()  # Desa yang sudah dihitung di by_prefix/by_district (hindari hitung ganda)
+        self.hits = Counter()
+
+    def __len__(self):
+        return len(self._counted)
+
+    def add(self, postal_code, kode_wilayah=None, village=None, district=None, regency=None):
+        if not _is_postal_code(postal_code): return
+        kode_wilayah = kode_wilayah if kode_wilayah and _KODE_WILAYAH_RE.fullmatch(kode_wilayah) else None
+        village, district, regency = normalize_name(village), normalize_name(district), normalize_regency(regency)
+        if kode_wilayah: self.by_kode_wilayah[kode_wilayah] = postal_code
+        district_key = (district, regency) if district and regency else None
+        if village and district_key:
+            self.by_village[(village,) + district_key][postal_code] += 1
+            self.villages_by_district[district_key][village] = postal_code
+        # Satu desa dihitung sekali untuk mayoritas kecamatan, walau muncul di beberapa sumber
+        village_key = kode_wilayah or ((village,) + district_key if village and district_key else None)
+        if village_key is None or village_key in self._counted: return
+        self._counted.add(village_key)
+        if kode_wilayah: self.by_prefix[kode_wilayah[:8]][postal_code] += 1
+        if district_key: self.by_district[district_key][postal_code] += 1
+
+    def add_cache_entry(self, key_type, key, postal_code):
+        """Entri NomorCache: kunci kode wilayah, atau URL nomor.net (kodewil / detail) yang diurai namanya."""
+        if key_type == "kode_wilayah":
+            return self.add(postal_code, kode_wilayah=key)
+        query = parse_qs(urlparse(key).query)
+        kind = query.get("_i", [""])[0]
+        if kind == "cari-kodepos":
+            return self.add(postal_code, kode_wilayah=query.get("jobs", [""])[0].strip())
+        match = re.fullmatch(r"Desa-(.+)-Kab\.-(.+)", query.get("daerah", [""])[0])
+        if kind == "desa-kodepos" and match and query.get("jobs"):
+            self.add(postal_code, village=query["jobs"][0], district=match.group(1), regency=match.group(2))
+
+    def _consensus(self, counter):
+        total = sum(counter.values())
+        if total < self.min_support: return None
+        code, n = counter.most_common(1)[0]
+        return code if n / total >= self.min_agreement else None
+
+    def infer(self, kode_wilayah=None, village=None, district=None, regency=None):
+        village, district, regency = normalize_name(village), normalize_name(district), normalize_regency(regency)
+        district_key = (district, regency) if district and regency else None
+        code, provenance = None, None
+        if kode_wilayah and kode_wilayah in self.by_kode_wilayah:
+            code, provenance = self.by_kode_wilayah[kode_wilayah], PROVENANCE_KODE_WILAYAH
+        elif village and district_key and (village,) + district_key in self.by_village:
+            # Nama persis dikenal: jawab hanya jika kodenya satu; kalau bertentangan, jangan lari ke nama mirip
+            # (nama itu sendiri akan cocok dengan dirinya dan memberi kode yang terakhir ditulis)
+            codes = self.by_village[(village,) + district_key]
+            if len(codes) == 1: code, provenance = next(iter(codes)), PROVENANCE_NAMA_DESA
+        elif village and district_key and district_key in self.villages_by_district:
+            known = self.villages_by_district[district_key]
+            matches = [m for m in difflib.get_close_matches(village, known.keys(), n=3, cutoff=self.fuzzy_cutoff)
+                       if is_spelling_variant(village, m) and len(self.by_village[(m,) + district_key]) == 1]
+            if matches and len({known[m] for m in matches}) == 1:
+                code, provenance = known[matches[0]], PROVENANCE_NAMA_DESA_MIRIP
+        if code is None and kode_wilayah and kode_wilayah[:8] in self.by_prefix:
+            code = self._consensus(self.by_prefix[kode_wilayah[:8]])
+            provenance = PROVENANCE_PREFIX_KECAMATAN if code else None
+        if code is None and district_key in self.by_district:
+            code = self._consensus(self.by_district[district_key])
+            provenance = PROVENANCE_NAMA_KECAMATAN if code else None
+        if code: self.hits[provenance] += 1
+        return code, provenance
+
+    def stats(self):
+        hits = ", ".join(f"{p}: {n}" for p, n in sorted(self.hits.items())) or "-"
+        return (f"desa diketahui: {len(self)}, kode wilayah: {len(self.by_kode_wilayah)}, "
+                f"kecamatan (prefix): {len(self.by_prefix)}, kecamatan (nama): {len(self.by_district)}, "
+                f"terjawab [{hits}]")
@@ -0,0 +1,184 @@
+"""Pengatur laju request adaptif (AIMD) + circuit breaker per host.
+
+Menggantikan jeda acak tetap sebelum setiap request:
+- Setiap host punya jeda minimum antar request (dibagi oleh semua thread).
+- Respons bersih menurunkan jeda sedikit demi sedikit (additive decrease),
+  403/429/timeout menaikkan jeda berlipat (multiplicative increase).
+- Jika blokir (403/429) terlalu sering dalam jendela pengamatan, circuit breaker terbuka dan
+  semua thread berhenti selama masa cooldown. Dengan state_file di folder bersama, worker lain
+  (proses/host lain) ikut berhenti.
+- Request spekulatif (hedged lookup) bisa dibatalkan selama menunggu giliran: slot yang sudah dipesan
+  dikembalikan dan dipakai request berikutnya, jadi request yang batal tidak menghabiskan jatah laju.
+"""
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+OUTCOME_OK = "ok"
+OUTCOME_NOT_FOUND = "not_found"
+OUTCOME_BLOCKED = "blocked"
+OUTCOME_RATE_LIMITED = "rate_limited"
+OUTCOME_TIMEOUT = "timeout"
+OUTCOME_ERROR = "error"
+
+_BLOCK_OUTCOMES = (OUTCOME_BLOCKED, OUTCOME_RATE_LIMITED)
+
+
+def outcome_from_status(status_code):
+    if status_code == 403: return OUTCOME_BLOCKED
+    if status_code == 429: return OUTCOME_RATE_LIMITED
+    if status_code == 404: return OUTCOME_NOT_FOUND
+    if status_code >= 400: return OUTCOME_ERROR
+    return OUTCOME_OK
+
+
+class AdaptiveRateController:
+    def __init__(self, initial_delay=1.0, min_delay=0.2, max_delay=30.0, decrease_step=0.05,
+                 increase_factor=2.0, timeout_factor=1.5, jitter=0.2,
+                 breaker_window=20, breaker_threshold=8, breaker_cooldown=300.0, state_file=None):
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.decrease_step = decrease_step
+        self.increase_factor = increase_factor
+        self.timeout_factor = timeout_factor
+        self.jitter = jitter
+        self.breaker_window = breaker_window
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.state_file = state_file
+        self._lock = threading.Lock()
+        self._delay = {}
+        self._next_slot = {}
+        self._free_slots = {}  # host -> slot yang dikembalikan request yang batal (belum lewat)
+        self._last_slot = {}  # host -> slot terakhir yang dipesan (bisa dikembalikan dengan memundurkan antrian)
+        self._recent = {}
+        self._open_until = 0.0
+        self._state_file_mtime = None
+        self.counts = {}
+        self.breaker_trips = 0
+        self.total_wait = 0.0
+
+    @staticmethod
+    def host_of(url):
+        return urlparse(url).netloc
+
+    def _read_shared_state(self):
+        # Breaker dari proses lain: cukup os.stat, file hanya dibaca ulang kalau berubah
+        if not self.state_file: return
+        try:
+            mtime = os.stat(self.state_file).st_mtime
+        except OSError:
+            return
+        if mtime == self._state_file_mtime: return
+        self._state_file_mtime = mtime
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                self._open_until = max(self._open_until, float(json.load(f).get("open_until", 0)))
+        except (OSError, ValueError):
+            pass
+
+    def _write_shared_state(self):
+        if not self.state_file: return
+        tmp_path = f"{self.state_file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"open_until": self._open_until, "pid": os.getpid()}, f)
+            os.replace(tmp_path, self.state_file)
+        except OSError:
+            pass
+
+    def _reserve(self, host, now):
+        # Slot bekas request yang batal dipakai dulu; slot yang sudah lewat dibuang (jarak ke slot
+        # sesudahnya sudah tidak terjaga)
+        free = sorted(slot for slot in self._free_slots.get(host, ()) if slot >= max(now, self._open_until))
+        if free:
+            self._free_slots[host] = free[1:]
+            return free[0]
+        self._free_slots.pop(host, None)
+        delay = self._delay.setdefault(host, self.initial_delay)
+        delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        slot = max(now, self._open_until, self._next_slot.get(host, 0.0))
+        self._next_slot[host] = slot + delay
+        self._last_slot[host] = slot
+        return slot
+
+    def _release(self, host, slot):
+        if self._last_slot.get(host) == slot:
+            self._next_slot[host] = slot  # Slot terakhir yang dipesan: antrian cukup dimundurkan
+            self._last_slot[host] = None
+        else:
+            self._free_slots.setdefault(host, []).append(slot)
+
+    def acquire(self, url, cancel_event=None):
+        """Blokir sampai boleh mengirim request ke host `url`; mengembalikan lama menunggu (detik).
+
+        Dengan cancel_event: mengembalikan None (tanpa memakai slot) jika event di-set sebelum giliran tiba.
+        """
+        host = self.host_of(url)
+        waited = 0.0
+        while True:
+            with self._lock:
+                if cancel_event is not None and cancel_event.is_set(): return None
+                self._read_shared_state()
+                now = time.time()
+                slot = self._reserve(host, now)
+                wait = slot - now
+            if wait > 0:
+                if cancel_event is None:
+                    time.sleep(wait)
+                elif cancel_event.wait(wait):
+                    with self._lock:
+                        self._release(host, slot)
+                    return None
+            waited += wait
+            # Breaker bisa terbuka selama menunggu (thread/proses lain): tunggu lagi kalau begitu
+            with self._lock:
+                self.total_wait += wait
+                self._read_shared_state()
+                if time.time() >= self._open_until: return waited
+
+    def record(self, url, outcome, retry_after=None):
+        host = self.host_of(url)
+        with self._lock:
+            self.counts[outcome] = self.counts.get(outcome, 0) + 1
+            delay = self._delay.get(host, self.initial_delay)
+            if outcome in _BLOCK_OUTCOMES:
+                delay = min(self.max_delay, delay * self.increase_factor)
+            elif outcome == OUTCOME_TIMEOUT:
+                delay = min(self.max_delay, delay * self.timeout_factor)
+            elif outcome in (OUTCOME_OK, OUTCOME_NOT_FOUND):
+                delay = max(self.min_delay, delay - self.decrease_step)
+            self._delay[host] = delay
+            if retry_after:
+                self._next_slot[host] = max(self._next_slot.get(host, 0.0), time.time() + retry_after)
+
+            recent = self._recent.setdefault(host, deque(maxlen=self.breaker_window))
+            recent.append(outcome in _BLOCK_OUTCOMES)
+            if sum(recent) >= self.breaker_threshold and time.time() >= self._open_until:
+                self._open_until = time.time() + self.breaker_cooldown
+                self.breaker_trips += 1
+                recent.clear()
+                self._write_shared_state()
+                return True  # Breaker baru saja terbuka
+        return False
+
+    def is_open(self):
+        with self._lock:
+            self._read_shared_state()
+            return time.time() < self._open_until
+
+    def current_delay(self, url):
+        with self._lock:
+            return self._delay.get(self.host_of(url), self.initial_delay)
+
+    def stats(self):
+        with self._lock:
+            delays = ", ".join(f"{host}: {delay:.2f}s" for host, delay in self._delay.items()) or "-"
+            counts = ", ".join(f"{outcome}: {n}" for outcome, n in sorted(self.counts.items())) or "-"
+            return (f"jeda sekarang [{delays}], hasil [{counts}], breaker terbuka: {self.breaker_trips}x, "
+                    f"total menunggu: {self.total_wait:.1f} dtk")
@@ -0,0 +1,180 @@
+"""Metrik & trace satu run scraper: ke mana waktunya habis.
+
+RunMetrics mengumpulkan (thread-safe, dipakai bersama oleh thread pool):
+- waktu per fase (mis. session, sleep, network, parse, fallback_scan, checkpoint), dengan label seperti url_type
+- counter (mis. request per url_type & status, baris per sumber kode pos)
+dan menuliskannya ke:
+- trace JSON-lines (satu event per baris: {"ts", "event", ...field}), append-only
+- snapshot textfile format Prometheus (untuk node_exporter textfile collector), ditulis ulang secara atomik
+  paling sering setiap `snapshot_interval` detik lewat maybe_snapshot() (trace ikut di-flush), dan saat close()
+
+Tanpa trace_path/prometheus_path metrik tetap dihitung di memori (untuk summary()) tapi tidak ada file ditulis.
+
+    python run_metrics.py summary data/trace_v15_part_vincent_119-998.jsonl
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+METRIC_PREFIX = "nomor_"
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _escape_label_value(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(label_pairs):
+    if not label_pairs: return ""
+    return "{" + ",".join(f'{k}="{_escape_label_value(v)}"' for k, v in label_pairs) + "}"
+
+
+class RunMetrics:
+    def __init__(self, trace_path=None, prometheus_path=None, const_labels=None, snapshot_interval=30.0,
+                 gauge_provider=None):
+        self.trace_path = trace_path
+        self.prometheus_path = prometheus_path
+        self.const_labels = dict(const_labels or {})
+        self.snapshot_interval = snapshot_interval
+        self.gauge_provider = gauge_provider  # Callable -> {nama: nilai}, dibaca saat snapshot ditulis
+        self.start_time = time.time()
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)  # (nama, label) -> nilai
+        self._timings = {}  # (fase, label) -> [jumlah, total detik, maks detik]
+        self._last_snapshot = 0.0
+        self._trace_file = open(trace_path, "a", encoding="utf-8") if trace_path else None
+
+    def incr(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] += value
+
+    def observe(self, phase, seconds, **labels):
+        key = (phase, _label_key(labels))
+        with self._lock:
+            timing = self._timings.get(key)
+            if timing is None:
+                self._timings[key] = [1, seconds, seconds]
+            else:
+                timing[0] += 1
+                timing[1] += seconds
+                if seconds > timing[2]: timing[2] = seconds
+
+    def trace(self, event, **fields):
+        if self._trace_file is None: return
+        line = json.dumps({"ts": round(time.time(), 3), "event": event, **fields}, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._trace_file.write(line)
+
+    def maybe_snapshot(self):
+        if time.time() - self._last_snapshot < self.snapshot_interval: return
+        self._last_snapshot = time.time()
+        if self._trace_file is not None:
+            with self._lock:
+                self._trace_file.flush()
+        self.write_prometheus()
+
+    def write_prometheus(self):
+        if not self.prometheus_path: return
+        const = _label_key(self.const_labels)
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timings = sorted(self._timings.items())
+        lines = []
+        for name in sorted({name for (name, _), _ in counters}):
+            lines.append(f"# TYPE {METRIC_PREFIX}{name}_total counter")
+            lines += [f"{METRIC_PREFIX}{name}_total{_format_labels(const + labels)} {value:g}"
+                      for (n, labels), value in counters if n == name]
+        if timings:
+            lines.append(f"# TYPE {METRIC_PREFIX}phase_seconds summary")
+            for (phase, labels), (count, total, _) in timings:
+                label_text = _format_labels(const + (("phase", phase),) + labels)
+                lines.append(f"{METRIC_PREFIX}phase_seconds_sum{label_text} {total:.6f}")
+                lines.append(f"{METRIC_PREFIX}phase_seconds_count{label_text} {count}")
+            lines.append(f"# TYPE {METRIC_PREFIX}phase_seconds_max gauge")
+            lines += [f"{METRIC_PREFIX}phase_seconds_max{_format_labels(const + (('phase', phase),) + labels)} {peak:.6f}"
+                      for (phase, labels), (_, _, peak) in timings]
+        gauges = {"run_elapsed_seconds": time.time() - self.start_time}
+        if self.gauge_provider: gauges.update(self.gauge_provider())
+        for name, value in gauges.items():
+            lines.append(f"# TYPE {METRIC_PREFIX}{name} gauge")
+            lines.append(f"{METRIC_PREFIX}{name}{_format_labels(const)} {value:g}")
+        tmp_path = f"{self.prometheus_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.prometheus_path)
+
+    def phase_totals(self):
+        """{fase: (jumlah, total detik)} dijumlahkan lintas label."""
+        totals = {}
+        with self._lock:
+            for (phase, _), (count, total, _) in self._timings.items():
+                prev_count, prev_total = totals.get(phase, (0, 0.0))
+                totals[phase] = (prev_count + count, prev_total + total)
+        return totals
+
+    def counter_totals(self, name, label):
+        """{nilai label: jumlah} untuk satu counter, mis. counter_totals("requests", "status")."""
+        totals = defaultdict(float)
+        with self._lock:
+            for (n, labels), value in self._counters.items():
+                if n == name: totals[dict(labels).get(label, "-")] += value
+        return dict(totals)
+
+    def summary(self):
+        # Total detik per fase dijumlahkan antar thread, jadi bisa lebih besar dari waktu run (wall clock)
+        phases = sorted(self.phase_totals().items(), key=lambda item: -item[1][1])
+        phase_text = ", ".join(f"{phase}: {total:.1f} dtk/{count}x" for phase, (count, total) in phases) or "-"
+        status_text = ", ".join(f"{k}: {v:g}" for k, v in sorted(self.counter_totals("requests", "status").items()))
+        return f"waktu run {time.time() - self.start_time:.1f} dtk; fase [{phase_text}]; status [{status_text or '-'}]"
+
+    def close(self):
+        self.write_prometheus()
+        if self._trace_file is not None:
+            with self._lock:
+                self._trace_file.close()
+                self._trace_file = None
+
+
+def summarize_trace(path):
+    """Ringkas file trace: total detik per fase/url_type dari event request, parse & row."""
+    phases, statuses, sources, rows = defaultdict(float), defaultdict(int), defaultdict(int), 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            for key, value in event.items():
+                if key.endswith("_s") and isinstance(value, (int, float)):
+                    phases[(event["event"], key[:-2], event.get("url_type", "-"))] += value
+            if event["event"] == "request": statuses[(event.get("url_type", "-"), str(event.get("status")))] += 1
+            if event["event"] == "row":
+                rows += 1
+                sources[event.get("provenance", "-")] += 1
+    return phases, statuses, sources, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ringkas file trace JSON-lines dari postal_code_generator.py")
+    parser.add_argument("action", choices=["summary"])
+    parser.add_argument("trace", help="File trace_v15*.jsonl")
+    args = parser.parse_args()
+    phases, statuses, sources, rows = summarize_trace(args.trace)
+    print(f"{rows} baris selesai")
+    for (event, phase, url_type), total in sorted(phases.items(), key=lambda item: -item[1]):
+        print(f"  {event:<8} {phase:<14} {url_type:<8} {total:10.1f} dtk")
+    for (url_type, status), count in sorted(statuses.items()):
+        print(f"  request {url_type:<8} status {status:<8} {count:8d}x")
+    for source, count in sorted(sources.items(), key=lambda item: -item[1]):
+        print(f"  sumber  {source:<32} {count:8d} baris")
+
+
+if __name__ == "__main__":
+    main()
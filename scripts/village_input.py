@@ -0,0 +1,253 @@
+"""Pembaca sheet `villages` dari file Excel input, dengan cache kolumnar di disk.
+
+Semua kolom sheet dibaca (columns=None, dipakai scraper supaya kolom input lain ikut ke file hasil), atau hanya
+daftar kolom tertentu (usecols). Pembacaan pertama mem-parse XLSX sekali (pandas + openpyxl read-only) lalu
+menyimpan tiap kolom sebagai array numpy (.npy) di folder cache. Pembacaan berikutnya, termasuk shard/worker lain
+dengan file input yang sama, membuka array tsb dengan memory map dan hanya men-decode rentang baris yang diminta,
+tanpa parse XLSX sama sekali.
+
+Tata letak per kolom (mirip Arrow):
+- kolom numerik/tanggal: satu array .npy apa adanya
+- kolom teks/campuran  : tag tipe (uint8) + offset (int64, n+1) + byte UTF-8 semua sel disambung
+Nilai hasil read() identik dengan pd.read_excel(...).iloc[start:end] (tipe Python & dtype kolom ikut disimpan).
+Sel dengan tipe lain (mis. jam tanpa tanggal) membuat cache tidak dipakai: sheet dibaca langsung dari XLSX.
+
+Invalidasi: mtime & ukuran file input dicek dulu; kalau berubah, sha256 isinya dihitung dan cache hanya
+dibangun ulang bila isinya memang berbeda. Cache versi lama dihapus setelah cache baru jadi.
+
+    python village_input.py info data/villages.xlsx
+    python village_input.py build data/villages.xlsx --cache-dir data/input_cache
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+
+CACHE_VERSION = 1
+DEFAULT_SHEET_NAME = "villages"
+
+TAG_NAN, TAG_NONE, TAG_NA, TAG_STR, TAG_INT, TAG_FLOAT, TAG_BOOL, TAG_DATETIME = range(8)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_json_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _encode_cell(value):
+    import pandas as pd
+    if value is None: return TAG_NONE, ""
+    if value is pd.NA: return TAG_NA, ""
+    if isinstance(value, bool): return TAG_BOOL, "1" if value else "0"
+    if isinstance(value, str): return TAG_STR, value
+    if isinstance(value, float): return (TAG_NAN, "") if value != value else (TAG_FLOAT, repr(value))
+    if isinstance(value, int): return TAG_INT, str(value)
+    if isinstance(value, datetime): return TAG_DATETIME, pd.Timestamp(value).isoformat()
+    raise TypeError(f"Tipe sel tidak didukung cache: {type(value).__name__}")
+
+
+def _decode_cell(tag, text):
+    import pandas as pd
+    if tag == TAG_STR: return text
+    if tag == TAG_NAN: return float("nan")
+    if tag == TAG_NONE: return None
+    if tag == TAG_NA: return pd.NA
+    if tag == TAG_INT: return int(text)
+    if tag == TAG_FLOAT: return float(text)
+    if tag == TAG_BOOL: return text == "1"
+    return pd.Timestamp(text)
+
+
+class VillageInput:
+    """Tabel desa dari file input; len() = jumlah baris, read(start, end) = DataFrame rentang baris (index 0..).
+
+    columns=None: semua kolom sheet, urutan sesuai file.
+    cache_dir=None: tanpa cache, sheet di-parse penuh dan disimpan di memori (perilaku lama).
+    """
+
+    def __init__(self, path, columns=None, sheet_name=DEFAULT_SHEET_NAME, cache_dir=None):
+        self.path = path
+        self.columns = list(columns) if columns is not None else None
+        self.sheet_name = sheet_name
+        self.cache_dir = cache_dir
+        self.cache_path = None
+        self.from_cache = False  # True = cache sudah ada sebelumnya (XLSX tidak di-parse)
+        self.cache_error = None  # Exception saat membuka/membangun cache (lalu dibaca tanpa cache)
+        self._sha256 = None
+        self._frame = None
+        self._arrays = {}
+        if cache_dir is not None:
+            try:
+                self._open_cache()
+                return
+            except (OSError, ValueError, TypeError) as e:
+                self.cache_error = e
+                self.cache_path = None
+        self._frame = self._parse_excel()
+        self._n_rows = len(self._frame)
+
+    def __len__(self):
+        return self._n_rows
+
+    @property
+    def source_sha256(self):
+        """sha256 isi file input (identitas file untuk journal); tanpa cache dihitung saat pertama diminta."""
+        if self._sha256 is None: self._sha256 = file_sha256(self.path)
+        return self._sha256
+
+    @property
+    def column_names(self):
+        return list(self._frame.columns) if self._frame is not None else list(self._arrays)
+
+    def _parse_excel(self):
+        import pandas as pd
+        if self.columns is None: return pd.read_excel(self.path, sheet_name=self.sheet_name)
+        return pd.read_excel(self.path, sheet_name=self.sheet_name, usecols=self.columns)[self.columns]
+
+    # --- cache ---
+    def _cache_key(self):
+        # Kolom/sheet/versi berbeda = folder cache berbeda
+        key = json.dumps([CACHE_VERSION, self.sheet_name, self.columns], ensure_ascii=False)
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()[:8]
+
+    def _source_sha256(self):
+        # Hash isi hanya dihitung kalau mtime/ukuran berubah sejak terakhir dicatat
+        stat = os.stat(self.path)
+        source_file = os.path.join(self.cache_dir, f"{os.path.basename(self.path)}.source.json")
+        source = _read_json(source_file)
+        if source and source.get("mtime_ns") == stat.st_mtime_ns and source.get("size") == stat.st_size:
+            return source["sha256"]
+        sha256 = file_sha256(self.path)
+        _write_json_atomic(source_file, {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha256})
+        return sha256
+
+    def _open_cache(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        sha256 = self._sha256 = self._source_sha256()
+        base_name = f"{os.path.basename(self.path)}.{self._cache_key()}"
+        self.cache_path = os.path.join(self.cache_dir, f"{base_name}.{sha256[:16]}")
+        meta = _read_json(os.path.join(self.cache_path, "meta.json"))
+        self.from_cache = bool(meta and meta.get("sha256") == sha256)
+        if not self.from_cache:
+            meta = self._build_cache(sha256)
+            for stale_path in glob.glob(os.path.join(self.cache_dir, f"{glob.escape(base_name)}.*")):
+                if stale_path != self.cache_path and not stale_path.endswith(".tmp"):
+                    shutil.rmtree(stale_path, ignore_errors=True)
+        self._map_arrays(meta)
+
+    def _build_cache(self, sha256):
+        import numpy as np
+        frame = self._parse_excel()
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        os.makedirs(tmp_path, exist_ok=True)
+        try:
+            meta_columns = []
+            for n, col in enumerate(frame.columns):
+                series = frame[col]
+                if isinstance(series.dtype, np.dtype) and series.dtype.kind in "biufM":
+                    np.save(os.path.join(tmp_path, f"c{n}.values.npy"), series.to_numpy())
+                    meta_columns.append({"name": col, "kind": "numpy", "dtype": str(series.dtype)})
+                    continue
+                tags, texts = zip(*map(_encode_cell, series.to_numpy(dtype=object))) if len(series) else ((), ())
+                encoded = [text.encode("utf-8") for text in texts]
+                offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+                np.cumsum([len(b) for b in encoded], out=offsets[1:])
+                np.save(os.path.join(tmp_path, f"c{n}.tags.npy"), np.array(tags, dtype=np.uint8))
+                np.save(os.path.join(tmp_path, f"c{n}.offsets.npy"), offsets)
+                np.save(os.path.join(tmp_path, f"c{n}.data.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+                meta_columns.append({"name": col, "kind": "text", "dtype": str(series.dtype)})
+            meta = {"version": CACHE_VERSION, "source": os.path.abspath(self.path), "sha256": sha256,
+                    "sheet_name": self.sheet_name, "rows": len(frame), "columns": meta_columns}
+            _write_json_atomic(os.path.join(tmp_path, "meta.json"), meta)
+            try:
+                os.rename(tmp_path, self.cache_path)
+            except OSError:
+                if not os.path.exists(os.path.join(self.cache_path, "meta.json")): raise
+                # Proses lain (worker lain) lebih dulu selesai membangun cache yang sama
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        return meta
+
+    def _map_arrays(self, meta):
+        import numpy as np
+
+        def load(n, part):
+            return np.load(os.path.join(self.cache_path, f"c{n}.{part}.npy"), mmap_mode="r")
+
+        self._n_rows = meta["rows"]
+        self._arrays = {}
+        for n, column in enumerate(meta["columns"]):
+            parts = ("values",) if column["kind"] == "numpy" else ("tags", "offsets", "data")
+            self._arrays[column["name"]] = (column, {part: load(n, part) for part in parts})
+
+    def _read_column(self, column, arrays, start_row, end_row):
+        import numpy as np
+        import pandas as pd
+        if column["kind"] == "numpy":
+            return pd.Series(np.array(arrays["values"][start_row:end_row]), dtype=column["dtype"])
+        offsets = np.array(arrays["offsets"][start_row:end_row + 1])
+        blob = arrays["data"][offsets[0]:offsets[-1]].tobytes() if len(offsets) else b""
+        offsets = (offsets - offsets[0]).tolist() if len(offsets) else []
+        values = [text if tag == TAG_STR else _decode_cell(tag, text) for tag, text in zip(
+            arrays["tags"][start_row:end_row].tolist(),
+            (blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)))]
+        return pd.Series(values, dtype=column["dtype"])
+
+    def read(self, start_row=0, end_row=None, columns=None):
+        """Rentang baris [start_row, end_row); columns = subset kolom (hanya kolom itu yang di-decode)."""
+        start_row = max(0, min(start_row, self._n_rows))
+        end_row = self._n_rows if end_row is None else max(start_row, min(end_row, self._n_rows))
+        if self._frame is not None:
+            frame = self._frame if columns is None else self._frame[list(columns)]
+            return frame.iloc[start_row:end_row].reset_index(drop=True)
+        import pandas as pd
+        names = list(self._arrays) if columns is None else list(columns)
+        return pd.DataFrame({name: self._read_column(*self._arrays[name], start_row, end_row) for name in names})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache kolumnar sheet villages dari file Excel input")
+    parser.add_argument("action", choices=["info", "build"], help="info: status cache; build: bangun cache (jika perlu)")
+    parser.add_argument("input", help="File Excel input")
+    parser.add_argument("--cache-dir", default=None, help="Folder cache (default: <folder input>/input_cache)")
+    parser.add_argument("--sheet", default=DEFAULT_SHEET_NAME)
+    parser.add_argument("--columns", default=None,
+                        help="Kolom yang dibaca, dipisah koma (default: semua kolom, sama dengan scraper)")
+    args = parser.parse_args()
+    cache_dir = args.cache_dir or os.path.join(os.path.dirname(os.path.abspath(args.input)), "input_cache")
+    if args.action == "info":
+        caches = sorted(p for p in glob.glob(os.path.join(cache_dir, f"{glob.escape(os.path.basename(args.input))}.*"))
+                        if os.path.isdir(p))
+        for cache_path in caches:
+            meta = _read_json(os.path.join(cache_path, "meta.json")) or {}
+            print(f"{cache_path}: {meta.get('rows', '?')} baris, sha256 {meta.get('sha256', '?')[:16]}")
+        if not caches: print(f"Belum ada cache untuk {args.input} di {cache_dir}")
+        return
+    columns = args.columns.split(",") if args.columns else None
+    villages = VillageInput(args.input, columns, sheet_name=args.sheet, cache_dir=cache_dir)
+    print(f"{villages.cache_path}: {len(villages)} baris ({'sudah ada' if villages.from_cache else 'baru dibangun'})")
+
+
+if __name__ == "__main__":
+    main()
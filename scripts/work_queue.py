@@ -0,0 +1,138 @@
+"""Antrian unit kerja (SQLite) untuk mode coordinator/worker postal_code_generator.py.
+
+Coordinator memecah sheet `villages` menjadi unit berisi rentang baris absolut [start_row, end_row).
+Worker (boleh di beberapa host yang berbagi filesystem) mengambil unit dengan sistem lease:
+unit yang lease-nya kedaluwarsa (worker mati/hang) otomatis bisa diambil worker lain.
+File antrian memakai rollback journal (bukan WAL, yang butuh shared memory di satu host) supaya aman dibuka
+dari beberapa host lewat NFS/SMB; perubahan lebih dari satu statement memakai BEGIN IMMEDIATE.
+"""
+import sqlite3
+import threading
+import time
+
+STATUS_PENDING = "pending"
+STATUS_LEASED = "leased"
+STATUS_DONE = "done"
+
+
+class WorkQueue:
+    def __init__(self, path, lease_seconds=600):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        # isolation_level=None: transaksi diatur manual (BEGIN IMMEDIATE) supaya lease atomik antar proses
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=DELETE")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS units ("
+            "unit_id INTEGER PRIMARY KEY, start_row INTEGER NOT NULL, end_row INTEGER NOT NULL, "
+            "status TEXT NOT NULL, worker_id TEXT, lease_expires REAL, attempts INTEGER NOT NULL DEFAULT 0, "
+            "finished_at REAL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def is_initialized(self):
+        return self._conn.execute("SELECT COUNT(*) FROM units").fetchone()[0] > 0
+
+    def initialize(self, start_row, end_row, unit_size, meta=None):
+        """Buat unit kerja untuk [start_row, end_row). Tidak melakukan apa-apa jika antrian sudah berisi."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self._conn.execute("SELECT COUNT(*) FROM units").fetchone()[0] == 0:
+                self._conn.executemany(
+                    "INSERT INTO units (start_row, end_row, status) VALUES (?, ?, ?)",
+                    [(unit_start, min(unit_start + unit_size, end_row), STATUS_PENDING)
+                     for unit_start in range(start_row, end_row, unit_size)])
+                for key, value in (meta or {}).items():
+                    self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(value)))
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def get_meta(self, key, default=None):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def lease(self, worker_id):
+        """Ambil satu unit pending (atau yang lease-nya kedaluwarsa); None jika tidak ada."""
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute(
+                "SELECT unit_id, start_row, end_row FROM units "
+                "WHERE status = ? OR (status = ? AND lease_expires < ?) ORDER BY unit_id LIMIT 1",
+                (STATUS_PENDING, STATUS_LEASED, now)).fetchone()
+            if row:
+                self._conn.execute(
+                    "UPDATE units SET status = ?, worker_id = ?, lease_expires = ?, attempts = attempts + 1 "
+                    "WHERE unit_id = ?", (STATUS_LEASED, worker_id, now + self.lease_seconds, row[0]))
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return row
+
+    def renew(self, unit_id, worker_id):
+        """Perpanjang lease; False jika unit sudah bukan milik worker ini."""
+        cursor = self._conn.execute(
+            "UPDATE units SET lease_expires = ? WHERE unit_id = ? AND worker_id = ? AND status = ?",
+            (time.time() + self.lease_seconds, unit_id, worker_id, STATUS_LEASED))
+        return cursor.rowcount == 1
+
+    def complete(self, unit_id, worker_id):
+        cursor = self._conn.execute(
+            "UPDATE units SET status = ?, finished_at = ?, lease_expires = NULL "
+            "WHERE unit_id = ? AND worker_id = ? AND status = ?",
+            (STATUS_DONE, time.time(), unit_id, worker_id, STATUS_LEASED))
+        return cursor.rowcount == 1
+
+    def progress(self):
+        counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM units GROUP BY status").fetchall())
+        return {status: counts.get(status, 0) for status in (STATUS_PENDING, STATUS_LEASED, STATUS_DONE)}
+
+    def all_done(self):
+        progress = self.progress()
+        return progress[STATUS_PENDING] == 0 and progress[STATUS_LEASED] == 0
+
+    def close(self):
+        self._conn.close()
+
+
+class LeaseRenewer:
+    """Perpanjang lease satu unit secara berkala selama blok `with` berjalan (thread & koneksi SQLite sendiri).
+
+    Tidak bergantung pada baris yang selesai: lease tetap hidup selama worker menunggu lama, mis. saat circuit
+    breaker rate controller terbuka (cooldown bisa lebih lama dari lease_seconds). on_lost dipanggil sekali jika
+    unit ternyata sudah diambil worker lain.
+    """
+
+    def __init__(self, path, unit_id, worker_id, lease_seconds, on_lost=None):
+        self.path = path
+        self.unit_id = unit_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.interval = lease_seconds / 3
+        self.on_lost = on_lost
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{unit_id}", daemon=True)
+
+    def _run(self):
+        queue = WorkQueue(self.path, lease_seconds=self.lease_seconds)
+        try:
+            while not self._stop.wait(self.interval):
+                try:
+                    if queue.renew(self.unit_id, self.worker_id): continue
+                except sqlite3.Error:
+                    continue  # File antrian sedang terkunci lama: coba lagi di giliran berikutnya
+                if self.on_lost: self.on_lost()
+                return
+        finally:
+            queue.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        return False